@@ -0,0 +1,65 @@
+"""
+Benchmark for ReportGenerator.generate_all_reports.
+
+Builds a TransactionProcessor holding N valid rows plus a share of invalid
+and duplicate ones, then writes every report three ways: one generator
+call after another with nothing shared (the old generate_all_reports),
+generate_all_reports(workers=1) with the shared cache, and the default
+thread pool. Per-report timings of the last run are printed.
+
+    python benchmarks/bench_all_reports.py --rows 1000000 --output-dir /tmp/reports
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.report_generator import ReportGenerator
+from bench_json_report import build
+
+
+def one_by_one(generator: ReportGenerator) -> None:
+    generator.generate_json_report()
+    generator.generate_csv_summary()
+    generator.generate_error_report()
+    generator.generate_rollup_json_report()
+    generator.generate_rollup_csv()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--json-format", default="json")
+    parser.add_argument("--output-dir", help="Where reports are written (default: a temporary directory)")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix="bench_reports_")
+    processor = build(args.rows)
+    generator = ReportGenerator(processor, output_dir, json_format=args.json_format)
+    print(f"All reports for {args.rows:,} rows in {output_dir}")
+
+    runs = [
+        ("one by one, nothing shared", lambda: one_by_one(generator)),
+        ("shared cache, workers=1", lambda: generator.generate_all_reports(workers=1)),
+        ("shared cache, thread pool", lambda: generator.generate_all_reports()),
+    ]
+    reports = {}
+    try:
+        for label, run in runs:
+            start = time.perf_counter()
+            reports = run()
+            print(f"  {label:<32} {time.perf_counter() - start:>7.2f}s")
+        print("  " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in reports["timings"].items()))
+    finally:
+        if args.output_dir is None:
+            shutil.rmtree(output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
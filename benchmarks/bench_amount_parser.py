@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for amount parsing.
+
+Checks AmountParser against the original row-by-row rules on a shared
+corpus, then times both on a mostly distinct and a repetitive column of
+realistic amounts: without the cache, with it, and with the choice
+AmountParser.choose_cache makes from a sample of the column.
+
+    python benchmarks/bench_amount_parser.py --rows 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.amount_parser import (
+    AMOUNT_SAMPLE_SIZE, CACHE_SAMPLE_SIZE, COMMA_DECIMAL, DOT_DECIMAL, AmountParser, parse_amount_reference,
+)
+
+CORPUS = [
+    "100.50", "$1200.75", "$1,200.75", "€500.25", "£75", "1,234.56", "1,234,567.89",
+    "1.234,56", "1.234.567,89", "100,50", "1234,5", "12,34,56", "1,2,3.4", "1.2.3,4",
+    "1.234", "1.234.567", "-5", "--5", "-$5", "$-5", "5-", ".5", "5.", ",5", ",", ".", "-",
+    "0", "0.00", "00012", "1e5", "1 000", "USD 1,200.50", "1.200,50 EUR", "abc", "", "   ",
+    "１２３", "١٢٣٫٤", "²", "12.34.56,7,8", "12,345.678,9", "9" * 40, "1_000",
+]
+
+
+def build_column(rows: int, convention: str, distinct: int) -> list:
+    rng = random.Random(42)
+    values = []
+    for _ in range(distinct):
+        whole = rng.randrange(1, 10_000_000)
+        cents = rng.randrange(100)
+        if convention == DOT_DECIMAL:
+            text = f"{whole:,}.{cents:02d}"
+        else:
+            text = f"{whole:,}".replace(",", ".") + f",{cents:02d}"
+        values.append(rng.choice(["", "$", "€", "USD "]) + text)
+    return [rng.choice(values) for _ in range(rows)] + CORPUS
+
+
+def check_corpus(values) -> int:
+    mismatches = 0
+    for convention in (DOT_DECIMAL, COMMA_DECIMAL):
+        parser = AmountParser()
+        parser.convention = convention
+        for value in values:
+            expected = parse_amount_reference(value)
+            actual = parser.parse(value)
+            if expected != actual or str(expected) != str(actual):
+                mismatches += 1
+                print(f"  mismatch ({convention}): {value!r}: expected {expected!r}, got {actual!r}")
+    return mismatches
+
+
+def timed(label: str, func, values, baseline=None) -> float:
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    elapsed = time.perf_counter() - start
+    speedup = f" ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<28} {elapsed:.3f}s  {len(values) / elapsed:>12,.0f} values/s{speedup}")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--distinct", type=int, default=20000, help="Distinct amount strings in the first column")
+    parser.add_argument("--repeated-distinct", type=int, default=500,
+                        help="Distinct amount strings in the repetitive column")
+    args = parser.parse_args()
+
+    mismatches = 0
+    for convention in (DOT_DECIMAL, COMMA_DECIMAL):
+        for distinct in (args.distinct, args.repeated_distinct):
+            values = build_column(args.rows, convention, distinct)
+            mismatches += check_corpus(CORPUS + values[:distinct])
+
+            print(f"{convention}-decimal column: {len(values):,} values, {distinct:,} distinct")
+            baseline = timed("reference rules", parse_amount_reference, values)
+
+            uncached = AmountParser()
+            uncached.detect_convention(values[:AMOUNT_SAMPLE_SIZE])
+            timed("tokenizer, no cache", uncached._parse_uncached, values, baseline)
+
+            cached = AmountParser()
+            cached.detect_convention(values[:AMOUNT_SAMPLE_SIZE])
+            timed("tokenizer + cache", cached.parse, values, baseline)
+            print(f"  cache: {cached.cache.stats()}")
+
+            sampled = AmountParser()
+            sampled.detect_convention(values[:AMOUNT_SAMPLE_SIZE])
+            sampled.choose_cache(values[:CACHE_SAMPLE_SIZE])
+            timed(f"sampled choice (cache {'on' if sampled.use_cache else 'off'})", sampled.parse, values, baseline)
+
+    print("corpus parity: OK" if not mismatches else f"corpus parity: {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
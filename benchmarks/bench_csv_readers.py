@@ -0,0 +1,67 @@
+"""
+Compare the CSVProcessor reader backends on a CSV file.
+
+    python benchmarks/bench_csv_readers.py data/large.csv
+    python benchmarks/bench_csv_readers.py --rows 1000000
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.csv_processor import CSVProcessor, READER_BACKENDS
+
+
+def write_sample_file(path: str, rows: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["transaction_id", "customer_id", "date", "amount", "currency", "status"])
+        for i in range(rows):
+            writer.writerow([f"TXN{i:09d}", f"CUST{i % 5000:05d}", "2025-10-28", f"{i % 10000}.50", "USD", "completed"])
+
+
+def run(file_path: str, backend: str, repeat: int) -> None:
+    processor = CSVProcessor(reader_backend=backend)
+    elapsed = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = sum(1 for _ in processor.iter_csv_file(file_path))
+        elapsed = min(elapsed or float("inf"), time.perf_counter() - start)
+
+    # Memory is measured in a separate pass because tracing slows the reader down
+    tracemalloc.start()
+    for _ in processor.iter_csv_file(file_path):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{backend:>6}: {rows:,} rows in {elapsed:.3f}s "
+          f"({rows / elapsed:,.0f} rows/s, peak traced memory {peak / 1e6:.1f} MB)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_file", nargs="?", help="CSV file to read (a synthetic file is generated if omitted)")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows in the synthetic file")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = args.input_file
+        if file_path is None:
+            file_path = os.path.join(tmp, "bench.csv")
+            write_sample_file(file_path, args.rows)
+
+        for backend in READER_BACKENDS:
+            run(file_path, backend, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
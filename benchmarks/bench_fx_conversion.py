@@ -0,0 +1,104 @@
+"""
+Benchmark for converting transaction totals into a reporting currency.
+
+Builds a year of daily rates and N (currency, date, amount) rows, then
+converts them three ways: one table lookup per row without the memo
+cache, CurrencyConverter.convert_many over the rows, and
+CurrencyConverter.convert_totals over amounts pre-summed per
+(currency, date) the way TransactionProcessor keeps them. All three must
+agree to the cent.
+
+    python benchmarks/bench_fx_conversion.py --rows 2000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_EVEN
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constants.currencies import Currency
+from services.fx_rates import CurrencyConverter, FxRateTable
+from services.summary_aggregates import EXACT_CONTEXT
+
+START = date(2025, 1, 1)
+DAYS = 365
+CENT = Decimal("0.01")
+
+
+def build_rates() -> FxRateTable:
+    rng = random.Random(3)
+    table = FxRateTable(Currency.USD)
+    for currency in Currency:
+        if currency == Currency.USD:
+            continue
+        level = Decimal(str(round(rng.uniform(0.005, 1.5), 6)))
+        for day in range(DAYS):
+            # Weekends have no fixing, so lookups fall back to Friday's rate
+            if (START + timedelta(days=day)).weekday() < 5:
+                drift = Decimal(str(round(rng.uniform(0.98, 1.02), 6)))
+                table.add_rate(currency, START + timedelta(days=day), level * drift)
+    return table
+
+
+def generate(rows: int):
+    rng = random.Random(7)
+    currencies = list(Currency)
+    first = START.toordinal()
+    return [
+        (rng.choice(currencies), first + rng.randrange(DAYS), Decimal(f"{rng.randrange(1, 10_000_000)}.{rng.randrange(100):02d}"))
+        for _ in range(rows)
+    ]
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<34} {time.perf_counter() - start:>7.2f}s")
+    return result
+
+
+def totals_by_currency(rows, converted):
+    totals = {}
+    for (currency, _, _), value in zip(rows, converted):
+        totals[currency] = EXACT_CONTEXT.add(totals.get(currency, Decimal(0)), value)
+    return {currency.value: total.quantize(CENT, rounding=ROUND_HALF_EVEN) for currency, total in totals.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000000)
+    args = parser.parse_args()
+
+    rates = build_rates()
+    converter = CurrencyConverter(rates, Currency.EUR)
+    rows = generate(args.rows)
+    print(f"Converting {args.rows:,} amounts into {converter.reporting_currency.value}")
+
+    def per_row_lookups():
+        return [amount * (rates.rate(currency, ordinal) / rates.rate(Currency.EUR, ordinal))
+                for currency, ordinal, amount in rows]
+
+    def summed_per_date():
+        amounts_by_date = {}
+        for currency, ordinal, amount in rows:
+            key = (currency, ordinal)
+            amounts_by_date[key] = EXACT_CONTEXT.add(amounts_by_date.get(key, Decimal(0)), amount)
+        return converter.convert_totals(amounts_by_date)
+
+    uncached = totals_by_currency(rows, timed("binary search per row, no memo", per_row_lookups))
+    batched = totals_by_currency(rows, timed("convert_many (memoized)", lambda: converter.convert_many(rows)))
+    grouped = timed("convert_totals per (currency, date)", summed_per_date)
+    print(f"  rate cache: {rates.cache_stats()}")
+
+    equal = uncached == batched == grouped["by_currency"]
+    print(f"  consolidated total {grouped['consolidated_total']:,}  per-currency totals equal: {equal}")
+    return 0 if equal else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Memory benchmark for the Bloom-filter duplicate prefilter.
+
+Generates transaction ids on the fly (so only the dedupe structures hold
+memory) and compares the exact set-based duplicate scan with the
+two-pass Bloom prefiltered scan, checking both return the same ids.
+Then compares the processed-id set with PrefilteredIdSet.
+
+    python benchmarks/bench_id_prefilter.py --rows 1000000 --fpr 0.001
+
+tracemalloc only sees Python allocations; SQLite's page cache behind
+PrefilteredIdSet is bounded (about 2 MB by default) and not included.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.data_validator import DataValidator
+from services.id_prefilter import IdSet, PrefilteredIdSet
+
+CHUNK = 10000
+
+
+def id_source(rows: int, duplicate_every: int):
+    def generate():
+        for i in range(rows):
+            # Every duplicate_every-th row replays an earlier id
+            yield f"TXN{i // 3:010d}" if i % duplicate_every == 7 else f"TXN{i:010d}"
+    return generate
+
+
+def measure(label: str, func, rows: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<26} {elapsed:>7.2f}s  peak {peak / 1e6:>8.1f} MB  {peak / rows:>6.1f} B/id")
+    return result, peak
+
+
+def fill(id_set, source) -> int:
+    duplicates = 0
+    chunk = []
+    for transaction_id in source():
+        chunk.append(transaction_id)
+        if len(chunk) == CHUNK:
+            duplicates += len(id_set.contains_many(chunk))
+            id_set.add_many(chunk)
+            chunk = []
+    duplicates += len(id_set.contains_many(chunk))
+    id_set.add_many(chunk)
+    return duplicates
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--fpr", type=float, default=0.001)
+    parser.add_argument("--duplicate-every", type=int, default=1000)
+    args = parser.parse_args()
+    source = id_source(args.rows, args.duplicate_every)
+
+    print(f"Duplicate scan over {args.rows:,} ids")
+    exact_validator = DataValidator()
+    bloom_validator = DataValidator(bloom_false_positive_rate=args.fpr)
+    exact, exact_peak = measure("set", lambda: exact_validator.find_duplicate_ids(source()), args.rows)
+    prefiltered, bloom_peak = measure(
+        "bloom + confirm pass", lambda: bloom_validator.find_duplicate_ids_rescanning(source, args.rows), args.rows
+    )
+    stats = bloom_validator.prefilter_stats
+    print(f"  fill {stats['fill_ratio']:.1%}, estimated FPR {stats['estimated_fpr']:.4%}, "
+          f"{stats['confirm_hits']:,}/{stats['confirm_lookups']:,} candidates confirmed")
+    print(f"  memory {exact_peak / bloom_peak:.1f}x lower, results {'identical' if exact == prefiltered else 'DIFFER'}")
+
+    print(f"Processed ids, {CHUNK:,} per chunk")
+    exact_count, exact_peak = measure("IdSet", lambda: fill(IdSet(), source), args.rows)
+    prefiltered_set = PrefilteredIdSet(args.rows, args.fpr)
+    try:
+        bloom_count, bloom_peak = measure("PrefilteredIdSet", lambda: fill(prefiltered_set, source), args.rows)
+        stats = prefiltered_set.stats()
+    finally:
+        prefiltered_set.close()
+    print(f"  fill {stats['fill_ratio']:.1%}, estimated FPR {stats['estimated_fpr']:.4%}, "
+          f"confirm hit rate {stats['confirm_hit_rate']:.1%}")
+    print(f"  memory {exact_peak / bloom_peak:.1f}x lower, results "
+          f"{'identical' if exact_count == bloom_count else 'DIFFER'}")
+
+    return 0 if exact == prefiltered and exact_count == bloom_count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Benchmark for the streaming JSON report writer.
+
+Builds a TransactionProcessor holding N valid rows plus a share of invalid
+and duplicate ones, then writes the JSON report the old way (one dict of
+lists passed to json.dump with indent=2) and with JsonStreamWriter in each
+format. Time and peak traced memory are reported for each; the streamed
+indented output is compared byte for byte with json.dump.
+
+    python benchmarks/bench_json_report.py --rows 1000000
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constants.currencies import Currency
+from constants.error_codes import ErrorCode
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.transaction_processor import TransactionProcessor
+from utils.json_stream import JSON_FORMATS, JsonStreamWriter
+
+
+def build(rows: int) -> TransactionProcessor:
+    rng = random.Random(5)
+    start = date(2025, 1, 1)
+    currencies = list(Currency)
+    statuses = list(TransactionStatus)
+    processor = TransactionProcessor()
+    for i in range(rows):
+        transaction = Transaction(
+            transaction_id=f"TXN{i}",
+            customer_id=f"CUST{rng.randrange(50000)}",
+            date=start + timedelta(days=rng.randrange(365)),
+            amount=Decimal(rng.randrange(100, 1_000_000)) / 100,
+            currency=rng.choice(currencies),
+            status=rng.choice(statuses),
+        )
+        roll = rng.random()
+        if roll < 0.05:
+            processor.add_invalid_transaction(transaction, int(ErrorCode.INVALID_STATUS | ErrorCode.AMOUNT_OVER_LIMIT))
+        elif roll < 0.07:
+            processor.add_duplicate_transaction(transaction)
+        else:
+            processor.add_transaction(transaction)
+    return processor
+
+
+def sections(processor: TransactionProcessor, materialize: bool):
+    report = {
+        "report_metadata": {"report_type": "transaction_analysis"},
+        "summary": processor.get_summary_statistics(),
+        "valid_transactions": processor.iter_valid_dicts(),
+        "invalid_transactions": iter(processor.get_invalid_transactions()),
+        "duplicate_transactions": (t.to_dict() for t in processor.get_duplicate_transactions()),
+    }
+    if materialize:
+        report = {name: value if isinstance(value, dict) else list(value) for name, value in report.items()}
+    return report
+
+
+class CountingSink(io.TextIOBase):
+    # Keeps the output only when asked to, so memory reflects the writer alone
+    def __init__(self, keep: bool):
+        self.chars = 0
+        self.parts = [] if keep else None
+
+    def write(self, text: str) -> int:
+        self.chars += len(text)
+        if self.parts is not None:
+            self.parts.append(text)
+        return len(text)
+
+
+def measure(label: str, write, trace: bool) -> None:
+    sink = CountingSink(keep=False)
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    write(sink)
+    seconds = time.perf_counter() - start
+    line = f"  {label:<32} {seconds:>7.2f}s {sink.chars / (1 << 20) / seconds:>7.1f} MB/s"
+    if trace:
+        line += f"  peak {tracemalloc.get_traced_memory()[1] / (1 << 20):>8.1f} MB"
+        tracemalloc.stop()
+    print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--check-rows", type=int, default=100000,
+                        help="Rows whose indented output is compared with json.dump")
+    args = parser.parse_args()
+
+    processor = build(args.rows)
+    print(f"Timing {args.rows:,} rows (without tracemalloc, then with it for peak memory)")
+    for trace in (False, True):
+        measure("json.dump(indent=2), one dict", lambda f: json.dump(sections(processor, True), f, indent=2,
+                                                                       default=str), trace=trace)
+        for json_format in JSON_FORMATS:
+            measure(f"JsonStreamWriter {json_format}",
+                    lambda f: JsonStreamWriter(f, json_format).write_document(sections(processor, False)),
+                    trace=trace)
+
+    sample = build(args.check_rows)
+    expected = json.dumps(sections(sample, True), indent=2, default=str)
+    sink = CountingSink(keep=True)
+    JsonStreamWriter(sink).write_document(sections(sample, False))
+    same = "".join(sink.parts) == expected
+    print(f"Indented output identical to json.dump over {args.check_rows:,} rows: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Benchmark for near-duplicate (replay) detection.
+
+Builds N valid transactions over a pool of customers and amounts, with a
+share of them replayed under a new id a few days apart, then times
+NearDuplicateDetector over all rows. A pairwise scan, which compares each
+row with every earlier row of its customer, runs on the first --pairwise-rows
+rows only, and its matches are compared with the detector's.
+
+    python benchmarks/bench_near_duplicates.py --rows 2000000 --window 1
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.near_duplicate_detector import NearDuplicateDetector
+
+
+def generate(rows: int, customers: int, replay_rate: float):
+    rng = random.Random(11)
+    start = date(2025, 1, 1)
+    currencies = list(Currency)
+    amounts = [Decimal(rng.randrange(100, 50000)) / 100 for _ in range(500)]
+    transactions = []
+    while len(transactions) < rows:
+        transaction = Transaction(
+            transaction_id=f"TXN{len(transactions)}",
+            customer_id=f"CUST{rng.randrange(customers)}",
+            date=start + timedelta(days=rng.randrange(365)),
+            amount=rng.choice(amounts),
+            currency=rng.choice(currencies),
+            status=TransactionStatus.COMPLETED,
+        )
+        transactions.append(transaction)
+        if rng.random() < replay_rate:
+            transactions.append(Transaction(
+                transaction_id=f"TXN{len(transactions)}",
+                customer_id=transaction.customer_id,
+                date=transaction.date + timedelta(days=rng.randrange(-3, 4)),
+                amount=transaction.amount,
+                currency=transaction.currency,
+                status=transaction.status,
+            ))
+    return transactions[:rows]
+
+
+def detect(transactions, window: int):
+    detector = NearDuplicateDetector(window)
+    return {t.transaction_id: abs(t.date.toordinal() - match[1])
+            for t in transactions for match in [detector.observe(t)] if match is not None}
+
+
+def pairwise(transactions, window: int):
+    by_customer = {}
+    matches = {}
+    for transaction in transactions:
+        earlier = by_customer.setdefault(transaction.customer_id, [])
+        distances = [abs((other.date - transaction.date).days) for other in earlier
+                     if other.amount == transaction.amount and other.currency == transaction.currency]
+        distances = [distance for distance in distances if distance <= window]
+        if distances:
+            matches[transaction.transaction_id] = min(distances)
+        earlier.append(transaction)
+    return matches
+
+
+def timed(label: str, func):
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<40} {time.perf_counter() - start:>7.3f}s")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--pairwise-rows", type=int, default=100000)
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--replay-rate", type=float, default=0.01)
+    parser.add_argument("--window", type=int, default=1)
+    args = parser.parse_args()
+
+    transactions = generate(args.rows, args.customers, args.replay_rate)
+    sample = transactions[:args.pairwise_rows]
+
+    print(f"First {len(sample):,} rows, window {args.window} days")
+    expected = timed("pairwise scan per customer", lambda: pairwise(sample, args.window))
+    found = timed("NearDuplicateDetector", lambda: detect(sample, args.window))
+    same = found == expected
+    print(f"  {len(found):,} suspects, results identical: {same}")
+
+    print(f"All {len(transactions):,} rows")
+    found = timed("NearDuplicateDetector", lambda: detect(transactions, args.window))
+    print(f"  {len(found):,} suspects")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
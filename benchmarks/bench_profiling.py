@@ -0,0 +1,97 @@
+"""
+Benchmark for the stage profiler's overhead.
+
+Processes a CSV file (serially and streamed in chunks) with the default
+disabled profiler and with an enabled one, alternating runs and keeping
+the best of each, then prints the enabled profile. It also times a
+million no-op stages to show the cost per stage boundary when profiling
+is off.
+
+    python benchmarks/bench_profiling.py data/large.csv
+    python benchmarks/bench_profiling.py --rows 500000 --repeat 5
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.csv_processor import CSVProcessor
+from services.transaction_processor import TransactionProcessor
+from utils.profiling import NULL_PROFILER, StageProfiler
+
+
+def write_sample_file(path: str, rows: int) -> None:
+    rng = random.Random(7)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["transaction_id", "customer_id", "date", "amount", "currency", "status"])
+        for i in range(rows):
+            writer.writerow([
+                f"TXN{i:09d}" if rng.random() > 0.01 else f"TXN{rng.randrange(i + 1):09d}",
+                f"CUST{rng.randrange(50000):05d}",
+                f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                f"{rng.randrange(-100, 1_000_000) / 100:.2f}",
+                rng.choice(["USD", "EUR", "GBP", "usd", "XXX"]),
+                rng.choice(["completed", "pending", "failed", "cancelled"]),
+            ])
+
+
+def run_serial(file_path: str, profiler: StageProfiler, chunk_size: int) -> None:
+    CSVProcessor(profiler=profiler).process_csv_file(file_path)
+
+
+def run_stream(file_path: str, profiler: StageProfiler, chunk_size: int) -> None:
+    processor = TransactionProcessor(retain_transactions=False)
+    for _ in CSVProcessor(profiler=profiler).stream_csv_file(file_path, processor, chunk_size):
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="CSV file to process (default: a generated one)")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows of the generated file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the best is kept")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per chunk when streaming")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_profiling_") as directory:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(directory, "sample.csv")
+            write_sample_file(file_path, args.rows)
+        print(f"{file_path}: {os.path.getsize(file_path) / (1 << 20):.1f} MB")
+
+        profiler = None
+        for label, run in (("serial", run_serial), ("stream", run_stream)):
+            best = {"disabled": float("inf"), "enabled": float("inf")}
+            for _ in range(args.repeat):
+                for variant in best:
+                    profiler = StageProfiler() if variant == "enabled" else NULL_PROFILER
+                    start = time.perf_counter()
+                    run(file_path, profiler, args.chunk_size)
+                    best[variant] = min(best[variant], time.perf_counter() - start)
+            overhead = best["enabled"] / best["disabled"] - 1
+            print(f"  {label:<8} disabled {best['disabled']:>7.2f}s  enabled {best['enabled']:>7.2f}s  "
+                  f"({overhead:+.1%})")
+
+        stages = 1_000_000
+        start = time.perf_counter()
+        for _ in range(stages):
+            with NULL_PROFILER.stage("noop"):
+                pass
+        per_stage = (time.perf_counter() - start) / stages
+        print(f"  disabled stage: {per_stage * 1e9:.0f} ns each")
+
+        print()
+        print(profiler.format_table())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
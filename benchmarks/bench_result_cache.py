@@ -0,0 +1,83 @@
+"""
+Benchmark for the result cache.
+
+Processes a CSV file without a cache, then with an empty ResultCache (the
+run plus writing the entry) and again on a hit. For comparison it also
+round-trips the result through the JSON state used by checkpoints. The
+cache entry size is printed next to the CSV size.
+
+    python benchmarks/bench_result_cache.py data/large.csv
+    python benchmarks/bench_result_cache.py --rows 1000000
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.csv_processor import CSVProcessor
+from services.result_cache import ResultCache
+from services.transaction_processor import TransactionProcessor
+
+
+def write_sample_file(path: str, rows: int) -> None:
+    rng = random.Random(7)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["transaction_id", "customer_id", "date", "amount", "currency", "status"])
+        for i in range(rows):
+            writer.writerow([
+                f"TXN{i:09d}" if rng.random() > 0.01 else f"TXN{rng.randrange(i + 1):09d}",
+                f"CUST{rng.randrange(50000):05d}",
+                f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                f"{rng.randrange(-100, 1_000_000) / 100:.2f}",
+                rng.choice(["USD", "EUR", "GBP", "usd", "XXX"]),
+                rng.choice(["completed", "pending", "failed", "cancelled"]),
+            ])
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<36} {time.perf_counter() - start:>7.2f}s")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="CSV file to process (default: a generated one)")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows of the generated file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_result_cache_") as directory:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(directory, "sample.csv")
+            write_sample_file(file_path, args.rows)
+        cache = ResultCache(os.path.join(directory, "cache"))
+        print(f"{file_path}: {os.path.getsize(file_path) / (1 << 20):.1f} MB")
+
+        processor = timed("no cache", lambda: CSVProcessor().process_csv_file(file_path))
+        timed("empty cache (process and store)",
+              lambda: CSVProcessor(result_cache=cache).process_csv_file(file_path))
+        cached = timed("cache hit", lambda: CSVProcessor(result_cache=cache).process_csv_file(file_path))
+        timed("JSON state round trip, for comparison",
+              lambda: TransactionProcessor.from_state(json.loads(json.dumps(processor.to_state()))))
+
+        print(f"  cache entry {cache.stats()['bytes'] / (1 << 20):.1f} MB, {cache.stats()}")
+        same = cached.get_summary_statistics() == processor.get_summary_statistics() and \
+            cached.transactions == processor.transactions and \
+            cached.invalid_transactions == processor.invalid_transactions and \
+            cached.duplicates == processor.duplicates
+        print(f"Cached result identical to the processed one: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
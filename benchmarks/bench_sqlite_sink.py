@@ -0,0 +1,115 @@
+"""
+Scaling benchmark for the SQLite report sink.
+
+At each size builds a TransactionProcessor holding N rows, most valid plus
+a share of invalid and duplicate ones, and loads it into a fresh database
+with SQLiteSink (indexes dropped and rebuilt), reporting rows per second.
+The run fails if the per-row cost at the largest size is more than
+--max-growth times the cost at the smallest; index builds sort, so a
+slight growth is expected. A run of --append-rows is then appended to the
+largest database (indexes maintained). For comparison it loads the CSV
+summary row by row into an indexed table, one execute() per row, as was
+done by hand before; --baseline-rows limits that part.
+
+Building the processors is not timed. The default sizes take about 6
+minutes and need about 3 GB of memory at 10M rows.
+
+    python benchmarks/bench_sqlite_sink.py
+    python benchmarks/bench_sqlite_sink.py --sizes 100000,1000000 --max-growth 1.5
+"""
+
+import argparse
+import csv
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.report_generator import ReportGenerator
+from services.sqlite_sink import SQLiteSink
+from bench_json_report import build
+
+DEFAULT_SIZES = "100000,1000000,10000000"
+
+
+def row_by_row(csv_path: str, database: str, limit: int) -> int:
+    conn = sqlite3.connect(database)
+    conn.execute("CREATE TABLE transactions (transaction_id TEXT, customer_id TEXT, date TEXT, "
+                 "amount REAL, currency TEXT, status TEXT)")
+    conn.execute("CREATE INDEX transactions_id ON transactions (transaction_id)")
+    conn.execute("CREATE INDEX transactions_customer_date ON transactions (customer_id, date)")
+    rows = 0
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            if rows == limit:
+                break
+            conn.execute("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)", row)
+            conn.commit()
+            rows += 1
+    conn.close()
+    return rows
+
+
+def load(processor, database: str) -> float:
+    start = time.perf_counter()
+    with SQLiteSink(database) as sink:
+        sink.write(processor, processor.get_summary_statistics, source="bench")
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated row counts (default: {DEFAULT_SIZES})")
+    parser.add_argument("--append-rows", type=int, default=100000,
+                        help="Rows appended to the largest database (0 to skip)")
+    parser.add_argument("--baseline-rows", type=int, default=20000)
+    parser.add_argument("--max-growth", type=float, default=2.0,
+                        help="Largest allowed ratio of the per-row cost at the largest size to the smallest")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory(prefix="bench_sqlite_") as directory:
+        print(f"{'rows':>12} {'seconds':>9} {'us/row':>9} {'rows/s':>12}  SQLiteSink, new database")
+        first_per_row = None
+        for rows in sizes:
+            database = os.path.join(directory, f"transactions_{rows}.db")
+            processor = build(rows)
+            seconds = load(processor, database)
+            with sqlite3.connect(database) as conn:
+                loaded = conn.execute("SELECT row_count FROM runs").fetchone()[0]
+            assert loaded == rows, "row count mismatch"
+
+            per_row = seconds / rows * 1e6
+            first_per_row = first_per_row or per_row
+            print(f"{rows:>12,} {seconds:>9.2f} {per_row:>9.2f} {rows / seconds:>12,.0f}")
+            if rows != sizes[-1]:
+                os.remove(database)
+            del processor
+            gc.collect()
+
+        if args.append_rows:
+            seconds = load(build(args.append_rows), database)
+            print(f"  {args.append_rows:,} rows appended to the {sizes[-1]:,} row database: {seconds:.2f}s "
+                  f"({args.append_rows / seconds:,.0f} rows/s)")
+
+        if args.baseline_rows:
+            processor = build(args.baseline_rows)
+            csv_path = ReportGenerator(processor, directory).generate_csv_summary()
+            start = time.perf_counter()
+            rows = row_by_row(csv_path, os.path.join(directory, "by_hand.db"), args.baseline_rows)
+            seconds = time.perf_counter() - start
+            print(f"  CSV summary row by row, {rows:,} rows: {seconds:.2f}s ({rows / seconds:,.0f} rows/s)")
+
+    growth = per_row / first_per_row
+    print(f"per-row cost at largest size is {growth:.2f}x the smallest (1.0 = flat, limit {args.max_growth})")
+    return 0 if growth <= args.max_growth else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Scaling benchmark for TransactionProcessor ingestion.
+
+Adds N transactions (with a share of repeated ids that land in the
+duplicates list) and reports the cost per row at each size. With indexed
+duplicate checks the per-row cost stays flat as N grows; the previous
+implementation rebuilt both id sets on every add and grew linearly per row.
+The run fails if the per-row cost at the largest size is more than
+--max-growth times the cost at the smallest; linear growth would be 1000x
+from 10k to 10M rows, while cache misses alone make the largest sizes
+about 2x slower per row than 10k. The old check is timed separately at
+--legacy-rows, since it is quadratic.
+
+Transactions are built in untimed chunks, so memory is what the processor
+retains: its columnar store and id sets, about 1.5 GB at 10M rows. The
+default sizes take about 5 minutes.
+
+    python benchmarks/bench_transaction_processor.py
+    python benchmarks/bench_transaction_processor.py --sizes 10000,1000000 --max-growth 1.5
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.transaction_processor import TransactionProcessor
+
+DEFAULT_SIZES = "10000,100000,1000000,10000000"
+DUPLICATE_EVERY = 50
+CHUNK_ROWS = 100000
+
+
+def build_transactions(start: int, end: int) -> list:
+    day = date(2025, 1, 1)
+    amount = Decimal("125.50")
+    transactions = []
+    for i in range(start, end):
+        # Every DUPLICATE_EVERY-th row repeats an earlier id
+        transaction_id = f"TXN{i // 2:09d}" if i % DUPLICATE_EVERY == 1 else f"TXN{i:09d}"
+        transactions.append(Transaction(
+            transaction_id=transaction_id,
+            customer_id=f"CUST{i % 5000:05d}",
+            date=day,
+            amount=amount,
+            currency=Currency.USD if i % 2 else Currency.EUR,
+            status=TransactionStatus.COMPLETED,
+        ))
+    return transactions
+
+
+def legacy_is_duplicate(processor: TransactionProcessor, transaction: Transaction) -> bool:
+    existing_ids = {t.transaction_id for t in processor.transactions}
+    duplicate_ids = {t.transaction_id for t in processor.duplicates}
+    return transaction.transaction_id in existing_ids or transaction.transaction_id in duplicate_ids
+
+
+def ingest(rows: int, legacy: bool = False) -> tuple:
+    processor = TransactionProcessor()
+    if legacy:
+        processor._is_duplicate = lambda t: legacy_is_duplicate(processor, t)
+
+    elapsed = 0.0
+    for chunk_start in range(0, rows, CHUNK_ROWS):
+        transactions = build_transactions(chunk_start, min(chunk_start + CHUNK_ROWS, rows))
+        gc.collect()
+        start = time.perf_counter()
+        for transaction in transactions:
+            processor.add_transaction(transaction)
+        elapsed += time.perf_counter() - start
+
+    start = time.perf_counter()
+    views = (processor.get_valid_transactions(), processor.get_duplicate_transactions())
+    view_elapsed = time.perf_counter() - start
+    return processor, elapsed, view_elapsed, views
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated row counts (default: {DEFAULT_SIZES})")
+    parser.add_argument("--legacy-rows", type=int, default=2000,
+                        help="Rows to time the old set-rebuilding check on (0 to skip)")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="Largest allowed ratio of the per-row cost at the largest size to the smallest")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.legacy_rows:
+        _, elapsed, _, _ = ingest(args.legacy_rows)
+        _, legacy_elapsed, _, _ = ingest(args.legacy_rows, legacy=True)
+        print(f"old check at {args.legacy_rows:,} rows: {legacy_elapsed:.2f}s "
+              f"({legacy_elapsed / elapsed:,.0f}x slower)\n")
+
+    print(f"{'rows':>12} {'seconds':>9} {'ns/row':>9} {'rows/s':>14} {'views':>9}")
+    first_per_row = None
+    for rows in sizes:
+        processor, elapsed, view_elapsed, views = ingest(rows)
+
+        expected_duplicates = sum(1 for i in range(rows) if i % DUPLICATE_EVERY == 1)
+        assert len(views[1]) == expected_duplicates, "duplicate count mismatch"
+        assert len(views[0]) + len(views[1]) == rows, "row count mismatch"
+
+        per_row = elapsed / rows * 1e9
+        first_per_row = first_per_row or per_row
+        print(f"{rows:>12,} {elapsed:>9.3f} {per_row:>9.0f} {rows / elapsed:>14,.0f} "
+              f"{view_elapsed * 1e6:>7.1f}us")
+
+        del processor, views
+        gc.collect()
+
+    growth = per_row / first_per_row
+    print(f"per-row cost at largest size is {growth:.2f}x the smallest (1.0 = flat, limit {args.max_growth})")
+    return 0 if growth <= args.max_growth else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Query benchmark for the TransactionStore indexes.
+
+Loads N valid transactions into a TransactionProcessor, then runs the
+same predicate mixes through TransactionProcessor.query and through a
+linear scan over already built Transaction objects, checking both return
+the same transactions. The index is built on the first query; its build
+is timed on its own. "find" is the index lookup alone, without building
+the returned Transaction objects, which dominates large results.
+
+    python benchmarks/bench_transaction_query.py --rows 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.transaction_processor import TransactionProcessor
+from utils.gc_pause import gc_paused
+
+START = date(2025, 1, 1)
+CUSTOMERS = 20000
+
+
+def generate(rows: int):
+    rng = random.Random(7)
+    currencies = list(Currency)
+    statuses = list(TransactionStatus)
+    for i in range(rows):
+        yield Transaction(
+            transaction_id=f"TXN{i:010d}",
+            customer_id=f"CUST{rng.randrange(CUSTOMERS):06d}",
+            date=START + timedelta(days=rng.randrange(365)),
+            amount=Decimal(f"{rng.randrange(1, 10_000_000)}.{rng.randrange(100):02d}"),
+            currency=rng.choice(currencies),
+            status=rng.choice(statuses),
+        )
+
+
+def scan(transactions, customer_id=None, start_date=None, end_date=None, status=None, currency=None):
+    return [
+        t for t in transactions
+        if (customer_id is None or t.customer_id == customer_id)
+        and (start_date is None or t.date >= start_date)
+        and (end_date is None or t.date <= end_date)
+        and (status is None or t.status == status)
+        and (currency is None or t.currency == currency)
+    ]
+
+
+def week(rng) -> dict:
+    first = START + timedelta(days=rng.randrange(358))
+    return {"start_date": first, "end_date": first + timedelta(days=6)}
+
+
+QUERIES = {
+    "customer": lambda rng: {"customer_id": f"CUST{rng.randrange(CUSTOMERS):06d}"},
+    "customer + status": lambda rng: {"customer_id": f"CUST{rng.randrange(CUSTOMERS):06d}",
+                                      "status": TransactionStatus.COMPLETED},
+    "one week": week,
+    "one week + currency": lambda rng: {**week(rng), "currency": Currency.EUR},
+    "status + currency": lambda rng: {"status": TransactionStatus.FAILED, "currency": Currency.USD},
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    processor = TransactionProcessor()
+    start = time.perf_counter()
+    for transaction in generate(args.rows):
+        processor.add_transaction(transaction)
+    print(f"Ingested {args.rows:,} transactions in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    processor.transactions.index
+    print(f"Indexed them in {time.perf_counter() - start:.2f}s")
+
+    rows = list(processor.transactions)
+    all_equal = True
+    for label, make in QUERIES.items():
+        rng = random.Random(label)
+        predicates = [make(rng) for _ in range(args.queries)]
+
+        # Without collections triggered by the results kept for comparison, as timeit does
+        with gc_paused():
+            start = time.perf_counter()
+            for predicate in predicates:
+                processor.transactions.find_rows(**predicate)
+            find_time = (time.perf_counter() - start) / len(predicates)
+            start = time.perf_counter()
+            indexed = [processor.query(**predicate) for predicate in predicates]
+            indexed_time = (time.perf_counter() - start) / len(predicates)
+            start = time.perf_counter()
+            scanned = [scan(rows, **predicate) for predicate in predicates]
+            scan_time = (time.perf_counter() - start) / len(predicates)
+
+        equal = indexed == scanned
+        all_equal &= equal
+        matches = sum(len(result) for result in indexed) / len(predicates)
+        print(f"  {label:<20} {matches:>9.0f} rows  find {find_time * 1e3:>7.2f} ms  "
+              f"indexed {indexed_time * 1e3:>8.2f} ms  scan {scan_time * 1e3:>8.2f} ms  "
+              f"{scan_time / indexed_time:>6.1f}x  equal: {equal}")
+    return 0 if all_equal else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Memory benchmark for the columnar TransactionStore.
+
+Builds N valid transactions the way the CSV path does (fresh strings,
+Decimal amounts and date objects per row) and measures the memory kept
+by a plain list of Transaction objects against TransactionStore, then
+checks both yield the same rows and report dicts. The default store
+indexes its rows as they are ingested, which adds about 8 B per row;
+it fails unless that store takes at least --min-indexed-reduction
+(default 4) times less memory, and unless a store without the index
+(indexed=False, the columns alone) takes at least --min-reduction
+(default 5) times less. Below about 300k rows the 20,000 interned
+customer ids weigh enough per row that the ratios drop.
+
+    python benchmarks/bench_transaction_store.py --rows 500000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.transaction_store import TransactionStore
+
+
+def generate(rows: int):
+    rng = random.Random(7)
+    start = date(2025, 1, 1)
+    currencies = list(Currency)
+    statuses = list(TransactionStatus)
+    for i in range(rows):
+        yield Transaction(
+            transaction_id=f"TXN{i:010d}",
+            customer_id=f"CUST{rng.randrange(20000):06d}",
+            date=start + timedelta(days=rng.randrange(365)),
+            amount=Decimal(f"{rng.randrange(1, 10_000_000)}.{rng.randrange(100):02d}"),
+            currency=rng.choice(currencies),
+            status=rng.choice(statuses),
+        )
+
+
+def retained(label: str, build, rows: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<18} {current / 1e6:>8.1f} MB  {current / rows:>6.1f} B/row  built in {elapsed:.2f}s")
+    return container, current
+
+
+def timed(label: str, func) -> None:
+    start = time.perf_counter()
+    func()
+    print(f"  {label:<32} {time.perf_counter() - start:.2f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--min-reduction", type=float, default=5.0,
+                        help="Fail unless the store without an index uses this many times less memory (default: 5)")
+    parser.add_argument("--min-indexed-reduction", type=float, default=4.0,
+                        help="Fail unless the indexed store uses this many times less memory (default: 4)")
+    args = parser.parse_args()
+
+    print(f"Retained memory for {args.rows:,} valid transactions")
+    objects, object_bytes = retained("list[Transaction]", lambda: list(generate(args.rows)), args.rows)
+
+    def build_store(indexed: bool):
+        store = TransactionStore(indexed=indexed)
+        store.extend(generate(args.rows))
+        return store
+
+    reduced = True
+    for label, indexed, minimum in (("columns only", False, args.min_reduction),
+                                    ("TransactionStore", True, args.min_indexed_reduction)):
+        store, store_bytes = retained(label, lambda: build_store(indexed), args.rows)
+        reduction = object_bytes / store_bytes
+        reduced &= reduction >= minimum
+        print(f"  {reduction:.1f}x less memory (at least {minimum:.1f}x: {reduction >= minimum})")
+
+    same_rows = store == objects
+    same_dicts = all(a == b.to_dict() for a, b in zip(store.iter_dicts(), objects))
+    print(f"  rows identical: {same_rows}, report dicts identical: {same_dicts}")
+
+    timed("to_dict over list[Transaction]", lambda: [t.to_dict() for t in objects])
+    timed("TransactionStore.iter_dicts", lambda: list(store.iter_dicts()))
+    timed("lazy rows from TransactionStore", lambda: sum(1 for _ in store))
+    return 0 if same_rows and same_dicts and reduced else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
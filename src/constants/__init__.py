@@ -1,7 +1,9 @@
 from .currencies import Currency, CURRENCY_MAP, VALID_CURRENCIES
 from .status import TransactionStatus, STATUS_MAP, VALID_STATUSES
+from .error_codes import ErrorCode, ERROR_MESSAGES, describe_errors
 
 __all__ = [
     'Currency', 'CURRENCY_MAP', 'VALID_CURRENCIES',
-    'TransactionStatus', 'STATUS_MAP', 'VALID_STATUSES'
+    'TransactionStatus', 'STATUS_MAP', 'VALID_STATUSES',
+    'ErrorCode', 'ERROR_MESSAGES', 'describe_errors'
 ]
\ No newline at end of file
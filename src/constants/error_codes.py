@@ -0,0 +1,54 @@
+from enum import IntFlag
+from typing import Any, Dict, List, Mapping, Optional
+
+class ErrorCode(IntFlag):
+    MISSING_TRANSACTION_ID = 1 << 0
+    MISSING_CUSTOMER_ID = 1 << 1
+    INVALID_DATE = 1 << 2
+    INVALID_AMOUNT = 1 << 3
+    NON_POSITIVE_AMOUNT = 1 << 4
+    MISSING_CURRENCY = 1 << 5
+    INVALID_CURRENCY = 1 << 6
+    MISSING_STATUS = 1 << 7
+    INVALID_STATUS = 1 << 8
+    AMOUNT_OVER_LIMIT = 1 << 9
+    CUSTOMER_ID_PATTERN = 1 << 10
+    DUPLICATE_TRANSACTION_ID = 1 << 11
+
+# Message templates, formatted with the row's fields when a report is written.
+# Codes are listed in bit order, which is also the order messages appear in.
+ERROR_MESSAGES = {
+    ErrorCode.MISSING_TRANSACTION_ID: "Missing transaction_id",
+    ErrorCode.MISSING_CUSTOMER_ID: "Missing customer_id",
+    ErrorCode.INVALID_DATE: "Invalid date",
+    ErrorCode.INVALID_AMOUNT: "Invalid amount",
+    ErrorCode.NON_POSITIVE_AMOUNT: "Amount must be positive",
+    ErrorCode.MISSING_CURRENCY: "Missing currency",
+    ErrorCode.INVALID_CURRENCY: "Invalid currency: {currency}",
+    ErrorCode.MISSING_STATUS: "Missing status",
+    ErrorCode.INVALID_STATUS: "Invalid status: {status}",
+    ErrorCode.AMOUNT_OVER_LIMIT: "Amount exceeds the {currency} limit",
+    ErrorCode.CUSTOMER_ID_PATTERN: "customer_id does not match the allowed pattern",
+    ErrorCode.DUPLICATE_TRANSACTION_ID: "Duplicate transaction_id",
+}
+
+ERROR_CODES = list(ERROR_MESSAGES)
+
+
+def describe_errors(codes: int, record: Optional[Mapping[str, Any]] = None) -> List[str]:
+    messages = []
+    for code in ERROR_CODES:
+        if codes & code:
+            message = ERROR_MESSAGES[code]
+            if "{" in message:
+                # Enum fields are shown by value, e.g. "USD" rather than "Currency.USD"
+                message = message.format_map({k: getattr(v, "value", v) for k, v in (record or {}).items()})
+            messages.append(message)
+    return messages
+
+
+def count_error_codes(histogram: Dict[ErrorCode, int], codes: int) -> None:
+    while codes:
+        lowest = codes & -codes
+        histogram[ErrorCode(lowest)] = histogram.get(ErrorCode(lowest), 0) + 1
+        codes ^= lowest
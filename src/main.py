@@ -4,19 +4,35 @@ Main CLI script for Acme Payments transaction processing.
 """
 
 import argparse
+import glob
 import logging
 import sys
 import os
+import re
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # Fix the Python path to include the src directory
 sys.path.insert(0, os.path.dirname(__file__))
 
 # Now import using absolute imports
-from services.csv_processor import CSVProcessor
+from services.csv_processor import CSVProcessor, DEFAULT_CHUNK_SIZE, READER_BACKENDS, CLEANERS, estimate_row_count
 from services.report_generator import ReportGenerator
 from services.data_validator import DataValidator
+from services.transaction_processor import TransactionProcessor
+from services.batch_processor import BatchProcessor, expand_inputs
+from services.checkpoint import checkpoint_path_for
+from services.dedupe_index import DedupeIndex
+from services.id_prefilter import IdSet, PrefilteredIdSet
+from services.near_duplicate_detector import NearDuplicateDetector
+from services.sqlite_sink import DEFAULT_DATABASE_NAME
+from services.result_cache import ResultCache, DEFAULT_MAX_BYTES
+from services.fx_rates import CurrencyConverter, FxRateTable
+from constants.currencies import Currency
+from utils.json_stream import JSON_FORMATS
+from utils.profiling import NULL_PROFILER, StageProfiler
+from services.validation_rules import BUILTIN_RULES, Rule, amount_limit_rule, customer_id_pattern_rule
 
 
 def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None) -> None:
@@ -44,21 +60,340 @@ Examples:
   python src/main.py data/sample_transactions.csv -o reports --all-reports
   python src/main.py data/sample_transactions.csv --json --csv --errors
   python src/main.py data/sample_transactions.csv --log-level DEBUG
+  python src/main.py data/sample_transactions.csv --stream --chunk-size 50000 --csv
+  python src/main.py data/sample_transactions.csv --workers 8 --all-reports
+  python src/main.py feeds/today.csv --incremental --all-reports
+  python src/main.py data/ "archive/2025-*.csv" --workers 8 --csv
+  python src/main.py --manifest todays_files.txt --workers 8 --all-reports
+  python src/main.py data/sample_transactions.csv --result-cache .cache --all-reports
         """,
     )
 
-    parser.add_argument("input_file", help="Path to input CSV file containing transaction data")
+    parser.add_argument("inputs", nargs="*", metavar="input",
+                        help="Input CSV file, directory or glob pattern; several may be given")
+    parser.add_argument("--manifest", help="File listing one input path per line")
     parser.add_argument("-o", "--output-dir", default="output", help="Output directory for reports")
     parser.add_argument("--json", action="store_true", help="Generate detailed JSON report")
     parser.add_argument("--csv", action="store_true", help="Generate CSV summary report")
     parser.add_argument("--errors", action="store_true", help="Generate detailed error report")
+    parser.add_argument("--rollups", action="store_true",
+                        help="Generate daily rollup reports (JSON and CSV) by date, currency and status")
+    parser.add_argument("--sqlite", nargs="?", const="", metavar="DB",
+                        help=f"Append valid, invalid and duplicate transactions and the summary to a SQLite "
+                             f"database (default: {DEFAULT_DATABASE_NAME} in the output directory)")
     parser.add_argument("--all-reports", action="store_true", help="Generate all report types")
+    parser.add_argument("--json-format", choices=JSON_FORMATS, default="json",
+                        help="Layout of the JSON and error reports: indented JSON, compact JSON "
+                             "or one JSON object per line (NDJSON)")
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO")
     parser.add_argument("--log-file", help="Optional log file path")
+    parser.add_argument("--stream", action="store_true",
+                        help="Process the file in bounded-memory chunks (valid rows are not kept for the JSON report)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per chunk in streaming mode (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes: byte ranges of a single file, or whole files in batch mode (default: 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process rows appended since the last run, using a checkpoint in the output directory")
+    parser.add_argument("--dedupe-db",
+                        help="SQLite file of transaction ids from earlier runs; replayed ids are reported as duplicates")
+    parser.add_argument("--dedupe-retention-days", type=int,
+                        help="Forget ids in --dedupe-db first seen more than N days ago (default: keep all)")
+    parser.add_argument("--bloom-fpr", type=float,
+                        help="Track seen ids with a Bloom filter at this false positive rate (e.g. 0.001) to bound memory")
+    parser.add_argument("--expected-rows", type=int,
+                        help="Row count used to size the Bloom filters (default: estimated from the input size)")
+    parser.add_argument("--reader", choices=READER_BACKENDS, default="text",
+                        help="CSV reader backend: buffered text file or memory-mapped file (default: text)")
+    parser.add_argument("--cleaner", choices=list(CLEANERS), default="row",
+                        help="Cleaning engine: row-by-row or vectorized column engine (default: row)")
+    parser.add_argument("--amount-limit", action="append", default=[], metavar="CURRENCY=AMOUNT",
+                        help="Reject amounts above AMOUNT in CURRENCY (repeatable, e.g. --amount-limit USD=10000)")
+    parser.add_argument("--customer-id-pattern", metavar="REGEX",
+                        help="Reject customer ids that do not fully match REGEX")
+    parser.add_argument("--near-duplicate-window", type=int, metavar="DAYS",
+                        help="Flag valid rows repeating another row's customer, amount and currency "
+                             "within DAYS days under a different id (off by default)")
+    parser.add_argument("--result-cache", metavar="DIR",
+                        help="Reuse the processed result of an unchanged file with the same cleaning and validation "
+                             "settings from DIR, and cache new results there (single-file runs without --stream or "
+                             "--incremental)")
+    parser.add_argument("--result-cache-size", type=int, default=DEFAULT_MAX_BYTES >> 20, metavar="MB",
+                        help=f"Delete the least recently used cached results beyond this size "
+                             f"(default: {DEFAULT_MAX_BYTES >> 20})")
+    parser.add_argument("--invalidate-cache", action="store_true",
+                        help="Drop the cached results of the input files before processing them")
+    parser.add_argument("--fx-rates",
+                        help="CSV of historical rates (date,currency,rate: units of --fx-base per unit of currency); "
+                             "adds totals converted into --reporting-currency at each transaction's date")
+    parser.add_argument("--fx-base", choices=[c.value for c in Currency], default="USD",
+                        help="Currency the --fx-rates rates are quoted in (default: USD)")
+    parser.add_argument("--reporting-currency", choices=[c.value for c in Currency], default="USD",
+                        help="Currency of the consolidated totals (default: USD)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print wall time, CPU time, rows/s and peak memory per pipeline stage, "
+                             "and cache hit rates")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="Write the per-stage profile as JSON to PATH")
+    parser.add_argument("--prometheus-file", metavar="PATH",
+                        help="Write the per-stage profile in Prometheus text format to PATH "
+                             "(for node-exporter's textfile collector)")
 
     return parser.parse_args()
 
 
+def validation_rules(args: argparse.Namespace) -> List[Rule]:
+    rules = list(BUILTIN_RULES)
+    if args.amount_limit:
+        limits = {}
+        for entry in args.amount_limit:
+            currency, separator, amount = entry.partition("=")
+            if not separator:
+                raise ValueError(f"--amount-limit expects CURRENCY=AMOUNT, got {entry}")
+            try:
+                limits[Currency(currency.strip().upper())] = Decimal(amount.strip())
+            except InvalidOperation:
+                raise ValueError(f"--amount-limit amount is not a number: {entry}")
+        rules.append(amount_limit_rule(limits))
+    if args.customer_id_pattern:
+        rules.append(customer_id_pattern_rule(args.customer_id_pattern))
+    return rules
+
+
+def generate_reports(report_generator: ReportGenerator, args: argparse.Namespace,
+                     logger: logging.Logger) -> List[str]:
+    generated_reports = []
+
+    if args.all_reports:
+        logger.info("Generating all reports...")
+        try:
+            reports = report_generator.generate_all_reports()
+            reports.pop("timings")
+            generated_reports.extend(reports.values())
+            logger.info(f"Generated reports: {list(reports.keys())}")
+        except Exception as e:
+            logger.error(f"Error generating all reports: {e}")
+    else:
+        if args.json:
+            logger.info("Generating JSON report...")
+            try:
+                json_path = report_generator.generate_json_report()
+                generated_reports.append(json_path)
+                logger.info(f"JSON report: {json_path}")
+            except Exception as e:
+                logger.error(f"Error generating JSON report: {e}")
+
+        if args.csv:
+            logger.info("Generating CSV summary...")
+            try:
+                csv_path = report_generator.generate_csv_summary()
+                generated_reports.append(csv_path)
+                logger.info(f"CSV summary: {csv_path}")
+            except Exception as e:
+                logger.error(f"Error generating CSV summary: {e}")
+
+        if args.errors:
+            logger.info("Generating error report...")
+            try:
+                error_path = report_generator.generate_error_report()
+                generated_reports.append(error_path)
+                logger.info(f"Error report: {error_path}")
+            except Exception as e:
+                logger.error(f"Error generating error report: {e}")
+
+        if args.rollups:
+            generated_reports.extend(generate_rollup_reports(report_generator, logger))
+
+    return generated_reports
+
+
+def generate_rollup_reports(report_generator: ReportGenerator, logger: logging.Logger) -> List[str]:
+    logger.info("Generating rollup reports...")
+    try:
+        rollup_paths = [report_generator.generate_rollup_json_report(), report_generator.generate_rollup_csv()]
+        logger.info(f"Rollup reports: {rollup_paths}")
+        return rollup_paths
+    except Exception as e:
+        logger.error(f"Error generating rollup reports: {e}")
+        return []
+
+
+def generate_sqlite_report(report_generator: ReportGenerator, args: argparse.Namespace, output_dir: Path,
+                           source: str, logger: logging.Logger, transactions=None) -> List[str]:
+    # Batch runs append one run per file to the database in the top output directory
+    database = args.sqlite or str(output_dir / DEFAULT_DATABASE_NAME)
+    logger.info(f"Writing {source} to SQLite...")
+    try:
+        return [report_generator.generate_sqlite_report(database, transactions, source)]
+    except Exception as e:
+        logger.error(f"Error writing SQLite report: {e}")
+        return []
+
+
+def print_prefilter_stats(csv_processor: CSVProcessor) -> None:
+    stats = csv_processor.prefilter_stats()
+    lines = ["", "BLOOM PREFILTER:"]
+    for label, key in (("Duplicate scan", "duplicate_scan"), ("Processed ids", "processed_ids")):
+        filter_stats = stats[key]
+        if "fill_ratio" not in filter_stats:
+            continue
+        lines.append(
+            f"{label}: {filter_stats['items']:,} ids in {filter_stats['bytes']:,} bytes, "
+            f"fill {filter_stats['fill_ratio']:.1%}, estimated FPR {filter_stats['estimated_fpr']:.4%}, "
+            f"{filter_stats['confirm_hits']:,}/{filter_stats['confirm_lookups']:,} confirmed "
+            f"({filter_stats['confirm_hit_rate']:.1%})"
+        )
+    print("\n".join(lines))
+
+
+def report_profile(args: argparse.Namespace, profiler: StageProfiler, csv_processor: CSVProcessor,
+                   converter: Optional[CurrencyConverter], logger: logging.Logger) -> None:
+    for name, stats in csv_processor.cache_stats().items():
+        profiler.record_cache(name, stats)
+    if converter is not None:
+        profiler.record_cache("fx_rate", converter.rates.cache_stats())
+
+    if args.profile:
+        print("\n" + profiler.format_table())
+    # Metrics are a by-product of the run, so failing to write them does not fail it
+    for path, write in ((args.metrics_file, profiler.write_json), (args.prometheus_file, profiler.write_prometheus)):
+        if path:
+            try:
+                write(path)
+                logger.info(f"Metrics written to {path}")
+            except OSError as e:
+                logger.error(f"Cannot write metrics to {path}: {e}")
+
+
+def run_batch(args: argparse.Namespace, csv_processor: CSVProcessor, files: List[str], output_dir: Path,
+              logger: logging.Logger, converter: Optional[CurrencyConverter] = None) -> int:
+    batch = BatchProcessor(csv_processor, workers=args.workers).process_files(files)
+
+    print("\n" + "="*60)
+    print("BATCH RESULTS")
+    print("="*60)
+    used_names = set()
+    sqlite_reports = []
+    for result in batch.files:
+        if not result.ok:
+            print(f"  ❌ {result.file_path}: {result.error}")
+            continue
+
+        stats = result.processor.get_summary_statistics()
+        print(f"  ✅ {result.file_path}: {result.rows:,} rows, {stats['valid_count']:,} valid, "
+              f"{stats['invalid_count']:,} invalid, {stats['duplicate_count']:,} duplicate ({result.seconds:.2f}s)")
+
+        file_output_dir = output_dir / BatchProcessor.report_dir_name(result.file_path, used_names)
+        file_report_generator = ReportGenerator(result.processor, str(file_output_dir), converter, args.json_format,
+                                                csv_processor.profiler)
+        for report_path in generate_reports(file_report_generator, args, logger):
+            print(f"     📄 {Path(report_path).relative_to(output_dir)}")
+        if args.sqlite is not None:
+            sqlite_reports.extend(generate_sqlite_report(file_report_generator, args, output_dir,
+                                                         result.file_path, logger))
+
+    print(f"\nFiles: {len(batch.files) - len(batch.failed)} processed, {len(batch.failed)} failed")
+    print(f"Rows: {batch.total_rows:,} in {batch.seconds:.2f}s ({batch.rows_per_second:,.0f} rows/s)")
+
+    report_generator = ReportGenerator(batch.combined, str(output_dir), converter, args.json_format,
+                                       csv_processor.profiler)
+    print("\nCOMBINED RESULTS")
+    report_generator.print_console_report()
+    if args.bloom_fpr is not None:
+        print_prefilter_stats(csv_processor)
+
+    generated_reports = generate_reports(report_generator, args, logger)
+    # Files were written as separate runs; the combined totals are their sum
+    generated_reports.extend(sorted(set(sqlite_reports)))
+    if generated_reports:
+        print(f"\n📊 Combined reports generated in '{output_dir}':")
+        for report_path in generated_reports:
+            print(f"  📄 {Path(report_path).name}")
+
+    if batch.failed:
+        logger.error(f"{len(batch.failed)} of {len(batch.files)} files failed")
+        return 1
+    logger.info("Batch processing completed successfully")
+    return 0
+
+
+def run_single(args: argparse.Namespace, csv_processor: CSVProcessor, output_dir: Path,
+               logger: logging.Logger, converter: Optional[CurrencyConverter] = None) -> int:
+    input_file = args.inputs[0]
+    generated_reports = []
+
+    if args.stream:
+        transaction_processor = TransactionProcessor(retain_transactions=False)
+        report_generator = ReportGenerator(transaction_processor, str(output_dir), converter, args.json_format,
+                                           csv_processor.profiler)
+        stream = csv_processor.stream_csv_file(input_file, transaction_processor, args.chunk_size)
+
+        if args.csv or args.all_reports:
+            logger.info("Generating CSV summary from stream...")
+            csv_path = report_generator.generate_csv_summary(transactions=stream)
+            generated_reports.append(csv_path)
+            logger.info(f"CSV summary: {csv_path}")
+        elif args.sqlite is not None:
+            generated_reports.extend(generate_sqlite_report(report_generator, args, output_dir, input_file,
+                                                            logger, transactions=stream))
+        else:
+            for _ in stream:
+                pass
+    elif args.incremental:
+        checkpoint_path = checkpoint_path_for(input_file, str(output_dir))
+        transaction_processor = csv_processor.process_csv_file_incremental(input_file, checkpoint_path)
+        report_generator = ReportGenerator(transaction_processor, str(output_dir), converter, args.json_format,
+                                           csv_processor.profiler)
+    elif args.workers > 1:
+        transaction_processor = csv_processor.process_csv_file_parallel(input_file, args.workers)
+        report_generator = ReportGenerator(transaction_processor, str(output_dir), converter, args.json_format,
+                                           csv_processor.profiler)
+    else:
+        transaction_processor = csv_processor.process_csv_file(input_file)
+        report_generator = ReportGenerator(transaction_processor, str(output_dir), converter, args.json_format,
+                                           csv_processor.profiler)
+
+    print("\n" + "="*60)
+    print("PROCESSING RESULTS")
+    print("="*60)
+    report_generator.print_console_report()
+    if args.bloom_fpr is not None:
+        print_prefilter_stats(csv_processor)
+
+    if args.stream:
+        if args.json or args.all_reports:
+            logger.warning("JSON report skipped: valid transactions are not retained in streaming mode")
+
+        if args.errors or args.all_reports:
+            logger.info("Generating error report...")
+            try:
+                error_path = report_generator.generate_error_report()
+                generated_reports.append(error_path)
+                logger.info(f"Error report: {error_path}")
+            except Exception as e:
+                logger.error(f"Error generating error report: {e}")
+
+        # The rollup cube is kept whether or not rows are retained
+        if args.rollups or args.all_reports:
+            generated_reports.extend(generate_rollup_reports(report_generator, logger))
+
+        # The stream went to the CSV summary, so only the summary and rejected rows remain
+        if args.sqlite is not None and (args.csv or args.all_reports):
+            generated_reports.extend(generate_sqlite_report(report_generator, args, output_dir, input_file, logger))
+    else:
+        generated_reports.extend(generate_reports(report_generator, args, logger))
+        if args.sqlite is not None:
+            generated_reports.extend(generate_sqlite_report(report_generator, args, output_dir, input_file, logger))
+
+    if generated_reports:
+        print(f"\n📊 Reports generated in '{output_dir}':")
+        for report_path in generated_reports:
+            print(f"  📄 {Path(report_path).name}")
+
+    logger.info("Transaction processing completed successfully")
+    return 0
+
+
 def main() -> int:
     try:
         args = parse_arguments()
@@ -67,70 +402,140 @@ def main() -> int:
         logger = logging.getLogger(__name__)
        
 
-        if not os.path.exists(args.input_file):
-            logger.error(f"Input file not found: {args.input_file}")
+        if not args.inputs and not args.manifest:
+            logger.error("No input given: pass a CSV file, directory, glob pattern or --manifest")
+            return 1
+
+        batch_mode = (
+            args.manifest is not None
+            or len(args.inputs) > 1
+            or os.path.isdir(args.inputs[0])
+            or glob.has_magic(args.inputs[0])
+        )
+
+        if not batch_mode and not os.path.exists(args.inputs[0]):
+            logger.error(f"Input file not found: {args.inputs[0]}")
             return 1
 
         output_dir = Path(args.output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        validator = DataValidator()
-        csv_processor = CSVProcessor(validator=validator)
-        
-        transaction_processor = csv_processor.process_csv_file(args.input_file)
+        if args.chunk_size <= 0:
+            logger.error(f"--chunk-size must be positive, got {args.chunk_size}")
+            return 1
 
-        report_generator = ReportGenerator(transaction_processor, str(output_dir))
+        if args.workers < 1:
+            logger.error(f"--workers must be at least 1, got {args.workers}")
+            return 1
 
-        print("\n" + "="*60)
-        print("PROCESSING RESULTS")
-        print("="*60)
-        report_generator.print_console_report()
+        if args.stream and (args.workers > 1 or batch_mode):
+            logger.error("--stream processes a single file and cannot be combined with --workers or batch inputs")
+            return 1
 
-        generated_reports = []
+        if args.incremental and (args.stream or args.workers > 1 or batch_mode):
+            logger.error(
+                "--incremental processes a single file and cannot be combined with --stream, --workers or batch inputs"
+            )
+            return 1
+
+        if args.dedupe_retention_days is not None and args.dedupe_retention_days <= 0:
+            logger.error(f"--dedupe-retention-days must be positive, got {args.dedupe_retention_days}")
+            return 1
+
+        if args.bloom_fpr is not None and not 0 < args.bloom_fpr < 1:
+            logger.error(f"--bloom-fpr must be between 0 and 1, got {args.bloom_fpr}")
+            return 1
 
-        if args.all_reports:
-            logger.info("Generating all reports...")
+        if args.expected_rows is not None and args.expected_rows <= 0:
+            logger.error(f"--expected-rows must be positive, got {args.expected_rows}")
+            return 1
+
+        if args.near_duplicate_window is not None and args.near_duplicate_window < 0:
+            logger.error(f"--near-duplicate-window must not be negative, got {args.near_duplicate_window}")
+            return 1
+
+        if args.result_cache_size <= 0:
+            logger.error(f"--result-cache-size must be positive, got {args.result_cache_size}")
+            return 1
+
+        if args.invalidate_cache and not args.result_cache:
+            logger.error("--invalidate-cache needs --result-cache")
+            return 1
+
+        files = expand_inputs(args.inputs, args.manifest) if batch_mode else args.inputs[:1]
+        if not files:
+            logger.error("No input files to process")
+            return 1
+
+        result_cache = None
+        if args.result_cache:
+            cache = ResultCache(args.result_cache, args.result_cache_size << 20)
+            if args.invalidate_cache:
+                for file_path in files:
+                    if os.path.exists(file_path):
+                        cache.invalidate(file_path)
+            # Streamed, resumed and batch results depend on more than one file's bytes
+            if args.stream or args.incremental or batch_mode:
+                logger.warning("--result-cache only applies to single-file runs without --stream or --incremental")
+            else:
+                result_cache = cache
+
+        converter = None
+        if args.fx_rates:
             try:
-                reports = report_generator.generate_all_reports()
-                generated_reports.extend(reports.values())
-                logger.info(f"Generated reports: {list(reports.keys())}")
-            except Exception as e:
-                logger.error(f"Error generating all reports: {e}")
-        else:
-            if args.json:
-                logger.info("Generating JSON report...")
-                try:
-                    json_path = report_generator.generate_json_report()
-                    generated_reports.append(json_path)
-                    logger.info(f"JSON report: {json_path}")
-                except Exception as e:
-                    logger.error(f"Error generating JSON report: {e}")
-
-            if args.csv:
-                logger.info("Generating CSV summary...")
-                try:
-                    csv_path = report_generator.generate_csv_summary()
-                    generated_reports.append(csv_path)
-                    logger.info(f"CSV summary: {csv_path}")
-                except Exception as e:
-                    logger.error(f"Error generating CSV summary: {e}")
-
-            if args.errors:
-                logger.info("Generating error report...")
-                try:
-                    error_path = report_generator.generate_error_report()
-                    generated_reports.append(error_path)
-                    logger.info(f"Error report: {error_path}")
-                except Exception as e:
-                    logger.error(f"Error generating error report: {e}")
-
-        if generated_reports:
-            print(f"\n📊 Reports generated in '{output_dir}':")
-            for report_path in generated_reports:
-                print(f"  📄 {Path(report_path).name}")
-
-        logger.info("Transaction processing completed successfully")
-        return 0
+                rates = FxRateTable.load(args.fx_rates, Currency(args.fx_base))
+            except (OSError, ValueError) as e:
+                logger.error(f"Cannot load FX rates: {e}")
+                return 1
+            converter = CurrencyConverter(rates, Currency(args.reporting_currency))
+
+        try:
+            rules = validation_rules(args)
+        except (ValueError, re.error) as e:
+            logger.error(f"Invalid validation rule: {e}")
+            return 1
+
+        validator = DataValidator(bloom_false_positive_rate=args.bloom_fpr, rules=rules)
+        processed_ids = IdSet()
+        if args.bloom_fpr is not None:
+            expected_rows = args.expected_rows or sum(
+                estimate_row_count(file_path) for file_path in files if os.path.exists(file_path)
+            )
+            processed_ids = PrefilteredIdSet(max(expected_rows, 1), args.bloom_fpr)
+
+        near_duplicate_detector = None
+        if args.near_duplicate_window is not None:
+            near_duplicate_detector = NearDuplicateDetector(args.near_duplicate_window)
+
+        profiler = NULL_PROFILER
+        if args.profile or args.metrics_file or args.prometheus_file:
+            profiler = StageProfiler()
+
+        dedupe_index = None
+        try:
+            if args.dedupe_db:
+                dedupe_index = DedupeIndex(args.dedupe_db, args.dedupe_retention_days)
+            csv_processor = CSVProcessor(validator=validator, reader_backend=args.reader, cleaner=args.cleaner,
+                                         dedupe_index=dedupe_index, processed_ids=processed_ids,
+                                         near_duplicate_detector=near_duplicate_detector,
+                                         result_cache=result_cache, profiler=profiler)
+
+            if batch_mode:
+                status = run_batch(args, csv_processor, files, output_dir, logger, converter)
+            else:
+                status = run_single(args, csv_processor, output_dir, logger, converter)
+            if profiler.enabled:
+                report_profile(args, profiler, csv_processor, converter, logger)
+
+            # Ids are only recorded when the run succeeded, so a failed run
+            # can be retried without its rows turning into duplicates
+            if dedupe_index is not None and status == 0:
+                dedupe_index.commit()
+            return status
+        finally:
+            processed_ids.close()
+            if dedupe_index is not None:
+                dedupe_index.close()
 
     except KeyboardInterrupt:
         print("\nProcessing interrupted by user")
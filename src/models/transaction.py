@@ -6,6 +6,7 @@ from typing import List, Dict, Any, Optional
 # Use absolute imports
 from constants.currencies import Currency
 from constants.status import TransactionStatus
+from constants.error_codes import describe_errors
 
 @dataclass
 class RawTransaction:
@@ -25,7 +26,12 @@ class ProcessedTransaction:
     currency: Optional[Currency]
     status: Optional[TransactionStatus]
     is_valid: bool = False
-    validation_errors: List[str] = field(default_factory=list)
+    # ErrorCode bits set by validation; messages are only built on request
+    error_codes: int = 0
+
+    @property
+    def validation_errors(self) -> List[str]:
+        return describe_errors(self.error_codes, self.__dict__)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
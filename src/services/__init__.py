@@ -1,13 +1,49 @@
 from .csv_processor import CSVProcessor
+from .amount_parser import AmountParser
 from .data_cleaner import DataCleaner
+from .columnar_cleaner import ColumnarDataCleaner
 from .data_validator import DataValidator
+from .mmap_csv_reader import MmapCSVReader
+from .parallel_processor import ParallelCSVReader
 from .transaction_processor import TransactionProcessor
-from .report_generator import ReportGenerator
+from .report_generator import ReportGenerator, ReportCache
+from .batch_processor import BatchProcessor
+from .checkpoint import Checkpoint
+from .dedupe_index import DedupeIndex
+from .id_prefilter import IdSet, PrefilteredIdSet
+from .transaction_store import TransactionStore
+from .transaction_index import TransactionIndex
+from .fx_rates import FxRateTable, CurrencyConverter
+from .rollup_cube import RollupCube
+from .validation_rules import Rule, RuleEngine
+from .near_duplicate_detector import NearDuplicateDetector
+from .sqlite_sink import SQLiteSink
+from .result_cache import ResultCache
 
 __all__ = [
     'CSVProcessor',
+    'AmountParser',
     'DataCleaner', 
+    'ColumnarDataCleaner',
     'DataValidator',
+    'MmapCSVReader',
+    'ParallelCSVReader',
     'TransactionProcessor',
-    'ReportGenerator'
+    'ReportGenerator',
+    'ReportCache',
+    'BatchProcessor',
+    'Checkpoint',
+    'DedupeIndex',
+    'IdSet',
+    'PrefilteredIdSet',
+    'TransactionStore',
+    'TransactionIndex',
+    'FxRateTable',
+    'CurrencyConverter',
+    'RollupCube',
+    'Rule',
+    'RuleEngine',
+    'NearDuplicateDetector',
+    'SQLiteSink',
+    'ResultCache'
 ]
\ No newline at end of file
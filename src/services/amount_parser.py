@@ -0,0 +1,162 @@
+import re
+import logging
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Optional
+
+# Use absolute imports
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+AMOUNT_CACHE_SIZE = 65536
+AMOUNT_SAMPLE_SIZE = 500
+# The cache only pays for its lookups when amounts repeat: at about 70% hits
+# over a column. A sample of the first rows repeats far less than the whole
+# column, so the cache is only turned off when nearly all sampled values are
+# distinct (200k rows of 60k distinct amounts sample at about 97%).
+CACHE_SAMPLE_SIZE = 4096
+MAX_DISTINCT_RATIO = 0.95
+
+DOT_DECIMAL = "dot"      # 1,234.56
+COMMA_DECIMAL = "comma"  # 1.234,56
+
+# Whole-value shapes for each convention: optional symbols around an
+# optionally negative number with grouped thousands and a decimal part.
+_FAST_PATTERNS = {
+    DOT_DECIMAL: re.compile(r'[^\d.,-]*(-?)(\d{1,3}(?:,\d{3})+|\d+)(?:\.(\d+))?[^\d.,-]*'),
+    COMMA_DECIMAL: re.compile(r'[^\d.,-]*(-?)(\d{1,3}(?:\.\d{3})+|\d+)(?:,(\d+))?[^\d.,-]*'),
+}
+_DECIMAL_HINT = re.compile(r'[.,]\d{1,2}$')
+
+
+def parse_amount_reference(amount_str: any) -> Optional[Decimal]:
+    # The original row-by-row rules, kept as the specification the fast
+    # parser is checked against.
+    if amount_str is None:
+        return None
+
+    amount_str_clean = str(amount_str).strip()
+    if not amount_str_clean:
+        return None
+
+    cleaned = re.sub(r'[^\d.,-]', '', amount_str_clean)
+    if not cleaned:
+        return None
+
+    comma_count = cleaned.count(',')
+    dot_count = cleaned.count('.')
+
+    if comma_count == 1 and dot_count > 0 and cleaned.find(',') > cleaned.find('.'):
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    elif comma_count > 0 and dot_count == 1 and cleaned.find('.') > cleaned.find(','):
+        cleaned = cleaned.replace(',', '')
+    elif comma_count > 0 and dot_count == 0:
+        cleaned = cleaned.replace(',', '')
+    elif comma_count == 1 and dot_count == 0:
+        cleaned = cleaned.replace(',', '.')
+
+    try:
+        return Decimal(cleaned)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+class AmountParser:
+    def __init__(self, cache_size: int = AMOUNT_CACHE_SIZE):
+        self.convention = DOT_DECIMAL
+        self.cache = LRUCache(cache_size)
+        self.use_cache = True
+
+    def detect_convention(self, sample: Iterable[any]) -> str:
+        votes = Counter()
+        for value in sample:
+            if value is None:
+                continue
+            text = str(value).strip()
+            last_comma = text.rfind(',')
+            last_dot = text.rfind('.')
+            if last_comma >= 0 and last_dot >= 0:
+                # With both separators present the last one is the decimal mark
+                votes[COMMA_DECIMAL if last_comma > last_dot else DOT_DECIMAL] += 1
+            else:
+                hint = _DECIMAL_HINT.search(text)
+                if hint:
+                    votes[COMMA_DECIMAL if hint.group().startswith(',') else DOT_DECIMAL] += 1
+
+        if votes:
+            self.convention = votes.most_common(1)[0][0]
+        logger.debug(f"Amount convention: {self.convention} ({dict(votes)})")
+        return self.convention
+
+    def choose_cache(self, sample: Iterable[any]) -> bool:
+        # Mostly distinct amounts would pay a lookup and an insert per value
+        # for almost no hits, which costs more than parsing them again
+        texts = [str(value) for value in sample if value is not None]
+        self.use_cache = len(set(texts)) <= len(texts) * MAX_DISTINCT_RATIO
+        logger.debug(f"Amount cache {'on' if self.use_cache else 'off'} ({len(set(texts))} of {len(texts)} distinct)")
+        return self.use_cache
+
+    def parse(self, amount_str: any) -> Optional[Decimal]:
+        if amount_str is None:
+            return None
+        if self.use_cache:
+            return self.cache.get_or_compute(str(amount_str), self._parse_uncached)
+        return self._parse_uncached(str(amount_str))
+
+    def _parse_uncached(self, text: str) -> Optional[Decimal]:
+        normalized = self._fast_normalize(text)
+        if normalized is None:
+            normalized = self._tokenize(text)
+        if not normalized:
+            return None
+        try:
+            return Decimal(normalized)
+        except (ArithmeticError, ValueError):
+            return None
+
+    def _fast_normalize(self, text: str) -> Optional[str]:
+        match = _FAST_PATTERNS[self.convention].fullmatch(text)
+        if match is None:
+            return None
+
+        sign, whole, fraction = match.groups()
+        # The shapes only contain separators in positions where the original
+        # rules resolve them unambiguously; reproduce those rules exactly.
+        if self.convention == DOT_DECIMAL:
+            whole = whole.replace(',', '')
+            return f"{sign}{whole}.{fraction}" if fraction is not None else f"{sign}{whole}"
+
+        if fraction is None:
+            # "1.234" has no comma, so the dots are left for Decimal to judge
+            return f"{sign}{whole}"
+        if '.' in whole:
+            return f"{sign}{whole.replace('.', '')}.{fraction}"
+        # A lone comma without dots is read as a thousands separator
+        return f"{sign}{whole}{fraction}"
+
+    def _tokenize(self, text: str) -> str:
+        # One pass keeps digits, separators and minus signs, and records what
+        # the separator rules need: counts and the first position of each.
+        kept = []
+        comma_count = dot_count = 0
+        first_comma = first_dot = -1
+        for char in text:
+            if char == ',':
+                if first_comma < 0:
+                    first_comma = len(kept)
+                comma_count += 1
+            elif char == '.':
+                if first_dot < 0:
+                    first_dot = len(kept)
+                dot_count += 1
+            elif char != '-' and not char.isdecimal():
+                continue
+            kept.append(char)
+
+        cleaned = ''.join(kept)
+        if comma_count == 1 and dot_count > 0 and first_comma > first_dot:
+            return cleaned.replace('.', '').replace(',', '.')
+        if comma_count > 0 and (dot_count == 0 or (dot_count == 1 and first_dot > first_comma)):
+            return cleaned.replace(',', '')
+        return cleaned
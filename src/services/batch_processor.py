@@ -0,0 +1,155 @@
+import glob
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Use absolute imports
+from models.transaction import ProcessedTransaction
+from services.csv_processor import CSVProcessor
+from services.data_validator import DataValidator
+from services.transaction_processor import TransactionProcessor
+
+logger = logging.getLogger(__name__)
+
+INPUT_PATTERNS = ["*.csv", "*.csv.gz", "*.csv.bz2", "*.csv.xz"]
+
+
+@dataclass
+class FileResult:
+    file_path: str
+    processor: Optional[TransactionProcessor] = None
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    files: List[FileResult] = field(default_factory=list)
+    combined: TransactionProcessor = field(default_factory=TransactionProcessor)
+    seconds: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(result.rows for result in self.files)
+
+    @property
+    def failed(self) -> List[FileResult]:
+        return [result for result in self.files if not result.ok]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_rows / self.seconds if self.seconds else 0.0
+
+
+def expand_inputs(inputs: Sequence[str], manifest: Optional[str] = None) -> List[str]:
+    entries = list(inputs)
+    if manifest:
+        with open(manifest, "r", encoding="utf-8") as f:
+            entries.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+
+    files = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            matches = sorted({path for pattern in INPUT_PATTERNS for path in glob.glob(os.path.join(entry, pattern))})
+        elif glob.has_magic(entry):
+            matches = sorted(glob.glob(entry))
+        else:
+            # Plain paths are kept even if missing so the failure is reported per file
+            matches = [entry]
+
+        if not matches:
+            logger.warning(f"No input files matched: {entry}")
+        files.extend(matches)
+
+    # The same file listed twice would only ever yield duplicates
+    return list(dict.fromkeys(files))
+
+
+def _clean_and_validate_file(task: Tuple[str, DataValidator, str, str]) -> Tuple[
+    List[ProcessedTransaction], List[ProcessedTransaction], int, float, Optional[str]
+]:
+    file_path, validator, reader_backend, cleaner = task
+    start = time.perf_counter()
+    try:
+        csv_processor = CSVProcessor(validator=validator, reader_backend=reader_backend, cleaner=cleaner)
+        valid_data, invalid_data, rows = csv_processor.clean_and_validate_file(file_path)
+        return valid_data, invalid_data, rows, time.perf_counter() - start, None
+    except Exception as e:
+        return [], [], 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+class BatchProcessor:
+    def __init__(self, csv_processor: CSVProcessor, workers: int = 1):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.csv_processor = csv_processor
+        self.workers = workers
+        self.logger = logging.getLogger(__name__)
+
+    def process_files(self, file_paths: Sequence[str]) -> BatchResult:
+        self.logger.info(f"Processing {len(file_paths)} files with {self.workers} workers")
+        start = time.perf_counter()
+        batch = BatchResult()
+
+        # Results are merged in input order whatever order the workers finish
+        # in, so cross-file duplicate detection is deterministic. Reading,
+        # cleaning and validating happen together, so they are one stage.
+        outcomes = self.csv_processor.profiler.iterate("read_clean_validate", self._clean_and_validate(file_paths),
+                                                       rows=lambda outcome: outcome[2])
+        for file_path, outcome in zip(file_paths, outcomes):
+            valid_data, invalid_data, rows, seconds, error = outcome
+            result = FileResult(file_path=file_path, rows=rows, seconds=seconds, error=error)
+
+            if error is None:
+                try:
+                    processor = TransactionProcessor()
+                    self.csv_processor._collect(processor, valid_data, invalid_data)
+                    batch.combined.merge(processor)
+                    result.processor = processor
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+
+            if result.ok:
+                self.logger.info(f"Processed {file_path}: {rows:,} rows in {seconds:.2f}s")
+            else:
+                self.logger.error(f"Failed to process {file_path}: {result.error}")
+            batch.files.append(result)
+
+        batch.seconds = time.perf_counter() - start
+        self.logger.info(
+            f"Processed {batch.total_rows:,} rows from {len(batch.files) - len(batch.failed)} files "
+            f"in {batch.seconds:.2f}s ({batch.rows_per_second:,.0f} rows/s), {len(batch.failed)} failed"
+        )
+        return batch
+
+    def _clean_and_validate(self, file_paths: Sequence[str]) -> Iterator[tuple]:
+        tasks = [
+            (file_path, self.csv_processor.validator, self.csv_processor.reader_backend, self.csv_processor.cleaner)
+            for file_path in file_paths
+        ]
+        if self.workers == 1:
+            for task in tasks:
+                yield _clean_and_validate_file(task)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(_clean_and_validate_file, tasks)
+
+    @staticmethod
+    def report_dir_name(file_path: str, used: set) -> str:
+        name = Path(file_path).name.split(".")[0] or "input"
+        candidate, suffix = name, 2
+        while candidate in used:
+            candidate = f"{name}_{suffix}"
+            suffix += 1
+        used.add(candidate)
+        return candidate
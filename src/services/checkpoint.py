@@ -0,0 +1,69 @@
+import json
+import os
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# Use absolute imports
+from services.mmap_csv_reader import MmapCSVReader
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 6
+
+
+def checkpoint_path_for(file_path: str, output_dir: str) -> Path:
+    return Path(output_dir) / f"{Path(file_path).name}.checkpoint.json"
+
+
+@dataclass
+class Checkpoint:
+    file_path: str
+    offset: int
+    prefix_sha256: str
+    delimiter: str
+    header: List[str]
+    header_mapping: Dict[str, int]
+    rows: int = 0
+    seen_ids: Set[str] = field(default_factory=set)
+    duplicate_ids: Set[str] = field(default_factory=set)
+    processor_state: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['Checkpoint']:
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.pop("version", None) != CHECKPOINT_VERSION:
+                logger.warning(f"Ignoring checkpoint {path}: unsupported version")
+                return None
+            data["seen_ids"] = set(data["seen_ids"])
+            data["duplicate_ids"] = set(data["duplicate_ids"])
+            return cls(**data)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    def save(self, path: Path) -> None:
+        data = asdict(self)
+        data["version"] = CHECKPOINT_VERSION
+        data["seen_ids"] = list(self.seen_ids)
+        data["duplicate_ids"] = list(self.duplicate_ids)
+
+        # Write then rename so an interrupted run never leaves a torn checkpoint
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+        logger.info(f"Checkpoint saved: {path} ({self.rows:,} rows, offset {self.offset:,})")
+
+    def matches_prefix(self, reader: MmapCSVReader, hasher) -> bool:
+        # Feeds the prefix into hasher so the caller can extend it past the offset
+        if reader.size < self.offset:
+            return False
+        reader.hash_range(hasher, 0, self.offset)
+        return hasher.copy().hexdigest() == self.prefix_sha256
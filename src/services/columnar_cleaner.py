@@ -0,0 +1,147 @@
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+# Use absolute imports
+from models.transaction import RawTransaction, ProcessedTransaction
+from constants.currencies import Currency, CURRENCY_MAP
+from constants.status import TransactionStatus, STATUS_MAP
+from services.data_cleaner import DataCleaner, DATE_SAMPLE_SIZE
+from utils.gc_pause import gc_paused
+
+logger = logging.getLogger(__name__)
+
+# Same resolution order as DataCleaner: the alias maps win over enum values
+CURRENCY_LOOKUP = {**{c.value: c for c in Currency}, **CURRENCY_MAP}
+STATUS_LOOKUP = {**{s.value: s for s in TransactionStatus}, **STATUS_MAP}
+_NON_AMOUNT_CHARS = re.compile(r'[^\d.,-]')
+
+
+class ColumnBatch(list):
+    # Cleaned rows that keep the factorized columns they were built from: per
+    # field, one code per row into an object array of distinct cleaned values
+    # whose last slot is the missing value. DataValidator checks the rules
+    # over these instead of the rows.
+    def __init__(self, rows: Sequence[ProcessedTransaction], columns: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        super().__init__(rows)
+        self.columns = columns
+
+    def __reduce__(self):
+        # Only the rows cross process boundaries
+        return list, (list(self),)
+
+
+# Cleans whole columns at once with results identical to DataCleaner. Every
+# column is factorized first, so each distinct raw value is cleaned once and
+# the results are scattered back to the rows with a NumPy take.
+class ColumnarDataCleaner(DataCleaner):
+
+    def clean(self, transactions: List[RawTransaction]) -> List[ProcessedTransaction]:
+        if not transactions:
+            return []
+
+        with gc_paused():
+            columns = zip(*[
+                (t.transaction_id, t.customer_id, t.date, t.amount, t.currency, t.status)
+                for t in transactions
+            ])
+            factorized = self.clean_columns(list(columns))
+            return ColumnBatch(self.build_rows(factorized), factorized)
+
+    def clean_columns(self, columns: Sequence[Sequence[Any]]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        # Raw values per RawTransaction field, in declaration order, to the
+        # factorized cleaned columns that ColumnBatch keeps
+        transaction_ids, customer_ids, dates, amounts, currencies, statuses = columns
+        self.infer_date_format(dates[:DATE_SAMPLE_SIZE])
+        return {
+            "transaction_id": self._map_column(transaction_ids, self._clean_string_column, ""),
+            "customer_id": self._map_column(customer_ids, self._clean_string_column, ""),
+            "date": self._map_column(dates, self._clean_date_column, None),
+            "amount": self._map_column(amounts, self._clean_amount_column, None),
+            "currency": self._map_column(currencies, self._clean_currency_column, None),
+            "status": self._map_column(statuses, self._clean_status_column, None),
+        }
+
+    def build_rows(self, columns: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> List[ProcessedTransaction]:
+        with gc_paused():
+            return [
+                ProcessedTransaction(*fields)
+                for fields in zip(*[lookup[codes].tolist() for codes, lookup in columns.values()])
+            ]
+
+    def _map_column(self, values: Sequence[Any], clean_uniques: Callable[[List[str]], Sequence[Any]],
+                    missing: Any) -> Tuple[np.ndarray, np.ndarray]:
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+
+        # Missing values get code -1, which indexes the trailing slot
+        lookup = np.empty(len(uniques) + 1, dtype=object)
+        if infer_dtype(uniques, skipna=False) != "string":
+            uniques = [str(v) for v in uniques]
+        lookup[:-1] = list(clean_uniques(list(uniques)))
+        lookup[-1] = missing
+        return codes, lookup
+
+    # The column cleaners take the distinct raw values as strings. String
+    # methods run in a plain comprehension: pandas' .str accessor loops in
+    # Python as well, with more overhead per value.
+    def _clean_string_column(self, values: Sequence[str]) -> List[str]:
+        return [v.strip() for v in values]
+
+    def _clean_date_column(self, values: Sequence[str]) -> np.ndarray:
+        # Each format in the cleaner's order parses what the earlier ones
+        # left. Only the two day/month orders can both match a string, and
+        # they share the year field, so a year pandas cannot represent fails
+        # both and no later format takes it. That range depends on the pandas
+        # version (1677-2262 with nanoseconds); year 0, which pandas 3 accepts
+        # and strptime does not, is left to the row-wise path as well.
+        stripped = np.empty(len(values), dtype=object)
+        stripped[:] = [v.strip() for v in values]
+        parsed = np.full(len(stripped), None, dtype=object)
+        pending = stripped != ""
+        for fmt in self.date_formats:
+            if not pending.any():
+                break
+            rows = np.flatnonzero(pending)
+            dates = pd.to_datetime(pd.Series(stripped[rows], dtype=object), format=fmt, errors="coerce")
+            matched = (dates.dt.year >= 1).to_numpy()
+            parsed[rows[matched]] = dates[matched].dt.date.to_numpy()
+            pending[rows[matched]] = False
+
+        # Excel serials, out-of-range years and garbage take the row-wise path
+        for row in np.flatnonzero(pending):
+            parsed[row] = self._parse_date(stripped[row])
+        return parsed
+
+    def _clean_amount_column(self, values: Sequence[str]) -> List[Optional[Decimal]]:
+        # Only values with a comma need the decimal-separator rules of
+        # DataCleaner._clean_amount; everything else goes to Decimal as is.
+        to_decimal, separators = self._to_decimal, self._apply_separator_rules
+        cleaned = [_NON_AMOUNT_CHARS.sub('', v.strip()) for v in values]
+        return [to_decimal(separators(v) if ',' in v else v) for v in cleaned]
+
+    def _apply_separator_rules(self, cleaned: str) -> str:
+        dot_count = cleaned.count('.')
+        first_comma = cleaned.find(',')
+        first_dot = cleaned.find('.')
+        if cleaned.count(',') == 1 and dot_count > 0 and first_comma > first_dot:
+            return cleaned.replace('.', '').replace(',', '.')
+        if (dot_count == 1 and first_dot > first_comma) or dot_count == 0:
+            return cleaned.replace(',', '')
+        return cleaned
+
+    def _to_decimal(self, value: str) -> Optional[Decimal]:
+        try:
+            return Decimal(value)
+        except (InvalidOperation, ValueError):
+            return None
+
+    def _clean_currency_column(self, values: Sequence[str]) -> List[Optional[Currency]]:
+        return [CURRENCY_LOOKUP.get(v.strip().upper()) for v in values]
+
+    def _clean_status_column(self, values: Sequence[str]) -> List[Optional[TransactionStatus]]:
+        return [STATUS_LOOKUP.get(v.strip().lower()) for v in values]
@@ -1,55 +1,109 @@
 import csv
+import hashlib
 import os
 import logging
+from datetime import date
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Iterable, Optional, Tuple
 from decimal import Decimal
 
+import numpy as np
+
 # Use absolute imports
 from models.transaction import RawTransaction, ProcessedTransaction, Transaction
 from constants.currencies import Currency
 from constants.status import TransactionStatus
 from services.data_cleaner import DataCleaner
+from services.columnar_cleaner import ColumnarDataCleaner
 from services.data_validator import DataValidator
+from services.parallel_processor import ParallelCSVReader
+from services.mmap_csv_reader import MmapCSVReader
+from services.row_decoder import RowDecoder, compile_row_decoder
+from services.checkpoint import Checkpoint
+from services.dedupe_index import DedupeIndex
+from services.id_prefilter import IdSet
+from services.near_duplicate_detector import NearDuplicateDetector
+from services.result_cache import ResultCache
+from services.validation_rules import rules_fingerprint
+from utils.lru_cache import LRUCache
+from utils.compressed_io import detect_compression, open_text
+from utils.gc_pause import gc_paused
+from utils.profiling import NULL_PROFILER, StageProfiler
+
+DEFAULT_CHUNK_SIZE = 10000
+READER_BACKENDS = ('text', 'mmap')
+CLEANERS = {'row': DataCleaner, 'columnar': ColumnarDataCleaner}
+DECODER_CACHE_SIZE = 256
+ROW_ESTIMATE_SAMPLE_CHARS = 65536
+COMPRESSION_RATIO_ESTIMATE = 5
+REQUIRED_FIELDS = ['transaction_id', 'customer_id', 'date', 'amount', 'currency', 'status']
+# Part of every result cache key; bump it when a change to header mapping,
+# cleaning or validation changes the results of an unchanged file
+PIPELINE_VERSION = 1
+
+def estimate_row_count(file_path: str) -> int:
+    # Only used to size filters, so a rough figure from the first lines will do
+    try:
+        with open_text(file_path) as file:
+            sample = file.read(ROW_ESTIMATE_SAMPLE_CHARS)
+        size = os.path.getsize(file_path)
+        if detect_compression(file_path) is not None:
+            size *= COMPRESSION_RATIO_ESTIMATE
+    except OSError:
+        return 1
+    lines = max(sample.count("\n"), 1)
+    return max(int(size / max(len(sample.encode("utf-8")) / lines, 1)), 1)
 
 class CSVProcessor:
-    def __init__(self, validator: DataValidator = None):
+    # Shared by all instances: batches of files usually repeat a few layouts
+    _decoder_cache = LRUCache(DECODER_CACHE_SIZE)
+
+    def __init__(self, validator: DataValidator = None, reader_backend: str = 'text', cleaner: str = 'row',
+                 dedupe_index: Optional[DedupeIndex] = None, processed_ids=None,
+                 near_duplicate_detector: Optional[NearDuplicateDetector] = None,
+                 result_cache: Optional[ResultCache] = None, profiler: Optional[StageProfiler] = None):
+        if reader_backend not in READER_BACKENDS:
+            raise ValueError(f"Unknown reader backend: {reader_backend}")
+        if cleaner not in CLEANERS:
+            raise ValueError(f"Unknown cleaner: {cleaner}")
         self.logger = logging.getLogger(__name__)
+        self.reader_backend = reader_backend
+        self.cleaner = cleaner
         self.validator = validator or DataValidator()
-        self.data_cleaner = DataCleaner()
-        self._processed_ids = set()
+        self.data_cleaner = CLEANERS[cleaner]()
+        self.dedupe_index = dedupe_index
+        # An IdSet or, for bounded memory, a PrefilteredIdSet
+        self._processed_ids = processed_ids if processed_ids is not None else IdSet()
+        self._reprocessed_ids = set()
+        # Like the processed ids, spans every chunk and file of the run
+        self.near_duplicate_detector = near_duplicate_detector
+        # Consulted by process_csv_file and process_csv_file_parallel. Results
+        # depending on ids from earlier runs cannot be reused, so it is off
+        # with a dedupe index.
+        if result_cache is not None and dedupe_index is not None:
+            self.logger.warning("Result cache disabled: results depend on the dedupe index")
+            result_cache = None
+        self.result_cache = result_cache
+        # Times the read, clean, validate and convert stages; off by default
+        self.profiler = profiler or NULL_PROFILER
     
     def detect_delimiter(self, file_path: str) -> str:
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
+            with open_text(file_path) as file:
                 sample = file.read(1024)
-            
-            delimiters = [",", ";", "\t", "|"]
-            counts = {d: sample.count(d) for d in delimiters}
-            best_delimiter = max(counts.keys(), key=lambda d: counts[d])
-            return best_delimiter if counts[best_delimiter] > 0 else ","
+            return self._choose_delimiter(sample)
         except Exception as e:
             self.logger.warning(f"Error detecting delimiter: {e}, defaulting to comma")
             return ","
-    
-    def read_csv_file(self, file_path: str) -> List[RawTransaction]:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8') as file:
-            first_line = file.readline()
-            delimiter = self.detect_delimiter(file_path)
-            file.seek(0)
-            content = file.read()
-        
-        lines = content.strip().split('\n')
-        reader = csv.reader(lines, delimiter=delimiter)
-        rows = list(reader)
-        
-        if not rows: 
-            return []
-        
-        headers = [str(h).lower().strip() for h in rows[0]]
+
+    def _choose_delimiter(self, sample: str) -> str:
+        delimiters = [",", ";", "\t", "|"]
+        counts = {d: sample.count(d) for d in delimiters}
+        best_delimiter = max(counts.keys(), key=lambda d: counts[d])
+        return best_delimiter if counts[best_delimiter] > 0 else ","
+
+    def _map_headers(self, header_row: List[str]) -> Dict[str, int]:
+        headers = [str(h).lower().strip() for h in header_row]
         map_index = {}
         
         for i, header in enumerate(headers):
@@ -66,79 +120,511 @@ class CSVProcessor:
             elif 'status' in header:
                 map_index['status'] = i
         
-        required_fields = ['transaction_id', 'customer_id', 'date', 'amount', 'currency', 'status']
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if field not in map_index:
                 map_index[field] = -1
+        return map_index
+
+    def _decoder_for(self, header_row: List[str]) -> RowDecoder:
+        signature = tuple(str(h).lower().strip() for h in header_row)
+        decoder = self._decoder_cache.get(signature)
+        if decoder is None:
+            map_index = self._map_headers(header_row)
+            decoder = compile_row_decoder([map_index[field] for field in REQUIRED_FIELDS])
+            self._decoder_cache.put(signature, decoder)
+        return decoder
+
+    def read_csv_file(self, file_path: str) -> List[RawTransaction]:
+        return list(self.iter_csv_file(file_path))
+
+    def read_csv_columns(self, file_path: str) -> List[List[Any]]:
+        # The fields of read_csv_file's rows as one list per RawTransaction
+        # field, taken from the parsed records column by column instead of
+        # building a RawTransaction per row
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        with gc_paused():
+            rows = self._iter_rows(file_path)
+            header = next((row for row in rows if any(row)), None)
+            records = list(filter(any, rows)) if header is not None else []
+            map_index = self._map_headers(header or [])
+            # Only columns some record is too short for need the bounds check
+            shortest = min(map(len, records), default=0)
+            columns = []
+            for index in (map_index[field] for field in REQUIRED_FIELDS):
+                if index < 0:
+                    columns.append([None] * len(records))
+                elif index < shortest:
+                    columns.append([row[index] for row in records])
+                else:
+                    columns.append([row[index] if len(row) > index else None for row in records])
+            return columns
+
+    def iter_csv_file(self, file_path: str) -> Iterator[RawTransaction]:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        rows = self._iter_rows(file_path)
+        header = next((row for row in rows if any(row)), None)
+        if header is None:
+            return
+        decode = self._decoder_for(header)
         
-        transactions = []
-        for i in range(1, len(rows)):
-            row = rows[i]
-            if not any(row): 
+        for row in rows:
+            if not any(row):
                 continue
-            
-            def get_val(field):
-                idx = map_index.get(field, -1)
-                return row[idx] if 0 <= idx < len(row) and row[idx] is not None else None
-            
-            transaction = RawTransaction(
-                transaction_id=get_val('transaction_id'),
-                customer_id=get_val('customer_id'),
-                date=get_val('date'),
-                amount=get_val('amount'),
-                currency=get_val('currency'),
-                status=get_val('status')
-            )
-            transactions.append(transaction)
+            yield decode(row)
+
+    def _iter_rows(self, file_path: str) -> Iterator[List[str]]:
+        # Both backends feed csv.reader whole records, so quoted fields may
+        # contain newlines and CRLF line endings are handled by the csv module.
+        if self.reader_backend == 'mmap' and not self._is_compressed(file_path):
+            with MmapCSVReader(file_path) as reader:
+                yield from reader.iter_rows(self._choose_delimiter(reader.sample()))
+        else:
+            with open_text(file_path, newline='') as file:
+                delimiter = self._choose_delimiter(file.read(1024))
+                file.seek(0)
+                yield from csv.reader(file, delimiter=delimiter)
+
+    def _is_compressed(self, file_path: str) -> bool:
+        codec = detect_compression(file_path)
+        if codec is not None:
+            self.logger.info(f"Reading {codec}-compressed input {file_path} as a stream")
+        return codec is not None
+
+    def iter_csv_chunks(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[RawTransaction]]:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
         
-        return transactions
+        chunk = []
+        for transaction in self.iter_csv_file(file_path):
+            chunk.append(transaction)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
-    def process_csv_file(self, file_path: str):
-        from services.transaction_processor import TransactionProcessor
+    def _iter_transaction_ids(self, file_path: str) -> Iterator[str]:
+        for transaction in self.iter_csv_file(file_path):
+            yield self.data_cleaner._clean_string(transaction.transaction_id)
+
+    def stream_csv_file(self, file_path: str, processor, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Transaction]:
+        self.logger.info(f"Starting to stream CSV file: {file_path} (chunk size {chunk_size})")
+
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+
+        try:
+            # Duplicates invalidate every occurrence of an id, so they must be known
+            # before the first chunk is validated. Only the id column is kept.
+            with self.profiler.stage("duplicate_scan"):
+                duplicate_ids = self.validator.find_duplicate_ids_rescanning(
+                    lambda: self._iter_transaction_ids(file_path), estimate_row_count(file_path)
+                )
+
+            for raw_chunk in self.profiler.iterate("read", self.iter_csv_chunks(file_path, chunk_size)):
+                with self.profiler.stage("clean", len(raw_chunk)):
+                    cleaned_chunk = self.data_cleaner.clean(raw_chunk)
+                with self.profiler.stage("validate", len(cleaned_chunk)):
+                    valid_data, invalid_data = self.validator.validate_rows(cleaned_chunk, duplicate_ids)
+                yield from self._collect(processor, valid_data, invalid_data)
 
+        except Exception as e:
+            self.logger.error(f"Error streaming CSV file: {e}")
+            raise
+
+    def result_config(self) -> Dict[str, Any]:
+        # Everything besides the file's bytes that the processed result depends on
+        detector = self.near_duplicate_detector
+        return {
+            "pipeline_version": PIPELINE_VERSION,
+            "cleaner": self.cleaner,
+            "rules": rules_fingerprint(self.validator.rules),
+            "near_duplicate_window": detector.window_days if detector is not None else None,
+        }
+
+    def _through_result_cache(self, file_path: str, process: Callable[[str], Any]):
+        # A file is cached as processed on its own: rows are not recorded in
+        # the processed ids or near-duplicate detector on a hit
+        if self.result_cache is None:
+            return process(file_path)
+        with self.profiler.stage("result_cache_load"):
+            key = self.result_cache.key(file_path, self.result_config())
+            processor = self.result_cache.get(key)
+        if processor is not None:
+            self.logger.info(f"Reusing cached result for {file_path}, cleaning and validation skipped")
+            return processor
+        processor = process(file_path)
+        with self.profiler.stage("result_cache_store"):
+            self.result_cache.put(key, processor)
+        return processor
+
+    def process_csv_file(self, file_path: str):
         self.logger.info(f"Starting to process CSV file: {file_path}")
 
         if not Path(file_path).exists():
             raise FileNotFoundError(f"CSV file not found: {file_path}")
 
+        return self._through_result_cache(file_path, self._process_csv_file)
+
+    def _process_csv_file(self, file_path: str):
+        from services.transaction_processor import TransactionProcessor
+
         processor = TransactionProcessor()
 
         try:
+            if self.cleaner == 'columnar' and self.validator.engine.columnar:
+                self._process_columns(processor, file_path)
+                return processor
+            valid_data, invalid_data, _ = self.clean_and_validate_file(file_path)
+            self._collect(processor, valid_data, invalid_data)
+            return processor
+
+        except Exception as e:
+            self.logger.error(f"Error processing CSV file: {e}")
+            raise
+
+    def clean_and_validate_file(self, file_path: str) -> Tuple[
+        List[ProcessedTransaction], List[ProcessedTransaction], int
+    ]:
+        with self.profiler.stage("read") as stage:
             raw_transactions = self.read_csv_file(file_path)
+            stage.rows = len(raw_transactions)
 
-            
+        with self.profiler.stage("clean", len(raw_transactions)):
             cleaned_data = self.data_cleaner.clean(raw_transactions)
-   
-            
+        self.logger.debug(f"Date cache: {self.data_cleaner.date_cache.stats()}")
+
+        with self.profiler.stage("validate", len(cleaned_data)):
             valid_data, invalid_data, duplicate_ids = self.validator.validate_dataset(cleaned_data)
-          
-
-            # Convert valid ProcessedTransaction to Transaction objects
-            valid_count = 0
-            for processed in valid_data:
-                transaction = Transaction.from_processed(processed)
-                if transaction:
-                    if transaction.transaction_id in self._processed_ids:
-                        processor.add_duplicate_transaction(transaction)
-                        print(f"  🔄 Duplicate: {transaction.transaction_id}")
-                    else:
-                        processor.add_transaction(transaction)
-                        self._processed_ids.add(transaction.transaction_id)
-                        valid_count += 1
-                       
-                else:
-                    print(f"  ❌ Invalid: {processed.transaction_id} - Missing required fields")
-
-            # Add invalid transactions to processor
-            for invalid_txn in invalid_data:
-                company_transaction = Transaction.from_processed(invalid_txn)
-                if company_transaction:
-                    processor.add_invalid_transaction(
-                        company_transaction, 
-                        invalid_txn.validation_errors
-                    )
+        return valid_data, invalid_data, len(raw_transactions)
+
+    def _process_columns(self, processor, file_path: str) -> None:
+        # The columnar cleaner's pipeline: the file is read into columns,
+        # cleaned and validated once per distinct value, and valid rows reach
+        # the store as a column batch. Only rejected rows become objects.
+        with self.profiler.stage("read") as stage:
+            raw_columns = self.read_csv_columns(file_path)
+            stage.rows = rows = len(raw_columns[0])
+        if rows:
+            with gc_paused():
+                self._clean_and_add_columns(processor, raw_columns, rows)
+
+    def _clean_and_add_columns(self, processor, raw_columns: List[List[Any]], rows: int) -> None:
+        with self.profiler.stage("clean", rows):
+            columns = self.data_cleaner.clean_columns(raw_columns)
+        self.logger.debug(f"Date cache: {self.data_cleaner.date_cache.stats()}")
+
+        with self.profiler.stage("validate", rows):
+            error_codes = self.validator.validate_columns(columns)
+
+        complete = np.ones(rows, dtype=bool)
+        for name, (keys, values) in columns.items():
+            present = [value is not None for value in values] if name == "amount" else values.astype(bool)
+            complete &= np.asarray(present, dtype=bool)[keys]
+        if not complete[error_codes == 0].all():
+            # Rules that pass rows with missing fields: those rows take the
+            # row-wise path, which reports them as they are dropped
+            cleaned_data = self.data_cleaner.build_rows(columns)
+            for transaction, codes in zip(cleaned_data, error_codes.tolist()):
+                transaction.error_codes = codes
+                transaction.is_valid = codes == 0
+            self._collect(processor, [t for t in cleaned_data if t.is_valid],
+                          [t for t in cleaned_data if not t.is_valid])
+            return
+
+        with self.profiler.stage("convert", rows):
+            self._add_columns(processor, columns, error_codes, complete)
+
+    def _add_columns(self, processor, columns: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                     error_codes: np.ndarray, complete: np.ndarray) -> None:
+        # _convert_and_add for validated columns, in the same order of effects
+        valid = error_codes == 0
+        valid_columns = {name: (keys[valid], values) for name, (keys, values) in columns.items()}
+        keys, values = valid_columns["transaction_id"]
+        candidate_ids = values[keys].tolist()
+        processed_before = self._processed_ids.contains_many(candidate_ids)
+
+        seen_before = set()
+        if self.dedupe_index is not None:
+            seen_before = self.dedupe_index.contains_many(
+                transaction_id for transaction_id in candidate_ids if transaction_id not in processed_before
+            ) - self._reprocessed_ids
+
+        # Ids are unique among valid rows, so only earlier files and runs repeat them
+        repeated = processed_before | seen_before
+        accepted_columns, accepted_ids = valid_columns, candidate_ids
+        if repeated:
+            accepted = np.array([transaction_id not in repeated for transaction_id in candidate_ids], dtype=bool)
+            for transaction in self._transactions(valid_columns, np.flatnonzero(~accepted)):
+                processor.add_duplicate_transaction(transaction)
+                print(f"  🔄 Duplicate: {transaction.transaction_id}")
+            accepted_columns = {name: (keys[accepted], values) for name, (keys, values) in valid_columns.items()}
+            accepted_ids = [transaction_id for transaction_id in candidate_ids if transaction_id not in repeated]
+        processor.add_transaction_columns(accepted_columns)
+
+        self._processed_ids.add_many(accepted_ids)
+        if self.dedupe_index is not None:
+            self.dedupe_index.add_many(accepted_ids)
+        if self.near_duplicate_detector is not None:
+            self._flag_near_duplicates(processor, self._transactions(accepted_columns, np.arange(len(accepted_ids))))
+
+        rejected = np.flatnonzero(~valid & complete)
+        for transaction, codes in zip(self._transactions(columns, rejected), error_codes[rejected].tolist()):
+            processor.add_invalid_transaction(transaction, codes)
+
+    def _transactions(self, columns: Dict[str, Tuple[np.ndarray, np.ndarray]], rows: np.ndarray) -> List[Transaction]:
+        # Transaction objects for a few rows of complete factorized columns
+        fields = [values[keys[rows]].tolist() for keys, values in columns.values()]
+        return [Transaction(*row) for row in zip(*fields)]
+
+    def process_csv_file_parallel(self, file_path: str, workers: int):
+        self.logger.info(f"Starting to process CSV file: {file_path} with {workers} workers")
+
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+
+        # Serial and parallel runs give the same result, so they share cache entries
+        return self._through_result_cache(file_path, lambda path: self._process_csv_file_parallel(path, workers))
+
+    def _process_csv_file_parallel(self, file_path: str, workers: int):
+        from services.transaction_processor import TransactionProcessor
+
+        # Byte ranges cannot be cut out of a compressed stream
+        if self._is_compressed(file_path):
+            self.logger.warning(f"Compressed input cannot be split into byte ranges, processing {file_path} serially")
+            return self._process_csv_file(file_path)
+
+        processor = TransactionProcessor()
+
+        try:
+            with MmapCSVReader(file_path) as reader:
+                delimiter = self._choose_delimiter(reader.sample())
+                header, header_end = reader.read_header(delimiter)
+            if header is None:
+                return processor
+
+            # Reading, cleaning and validation happen together in the workers
+            with self.profiler.stage("read_clean_validate") as stage:
+                cleaned_data = ParallelCSVReader(workers, self.cleaner, self.validator).clean_and_validate(
+                    file_path, header_end, delimiter, header
+                )
+                stage.rows = len(cleaned_data)
+
+            with self.profiler.stage("resolve_duplicates", len(cleaned_data)):
+                valid_data, invalid_data = self.validator.resolve_duplicates(cleaned_data)
+            self._collect(processor, valid_data, invalid_data)
             return processor
 
         except Exception as e:
             self.logger.error(f"Error processing CSV file: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def process_csv_file_incremental(self, file_path: str, checkpoint_path: Path):
+        self.logger.info(f"Starting incremental processing of CSV file: {file_path}")
+
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+
+        if self._is_compressed(file_path):
+            self.logger.warning(f"Compressed input cannot be resumed from a byte offset, processing {file_path} in full")
+            return self.process_csv_file(file_path)
+
+        try:
+            with MmapCSVReader(file_path) as reader:
+                hasher = hashlib.sha256()
+                previous = Checkpoint.load(checkpoint_path)
+                checkpoint = previous
+                if checkpoint is not None and not checkpoint.matches_prefix(reader, hasher):
+                    self.logger.warning(f"{file_path} changed before the checkpointed offset, reprocessing in full")
+                    checkpoint = None
+
+                processor = self._resume_from_checkpoint(reader, checkpoint) if checkpoint else None
+                if processor is not None:
+                    hashed_until = checkpoint.offset
+                else:
+                    if previous is not None:
+                        # These ids reached the dedupe index from this very file
+                        self._reprocessed_ids = {t["transaction_id"] for t in previous.processor_state["transactions"]}
+                    hasher = hashlib.sha256()
+                    hashed_until = 0
+                    checkpoint, processor = self._start_checkpoint(reader, file_path)
+                    if checkpoint is None:
+                        return processor
+
+                # A final line without a newline may still be being written: its
+                # rows are reported, but the checkpoint stays at the last boundary.
+                if not reader.ends_with_newline():
+                    self.logger.info(f"{file_path} ends mid-record, checkpoint not advanced")
+                    return processor
+
+                with self.profiler.stage("checkpoint_save"):
+                    reader.hash_range(hasher, hashed_until, reader.size)
+                    checkpoint.offset = reader.size
+                    checkpoint.prefix_sha256 = hasher.hexdigest()
+                    checkpoint.processor_state = processor.to_state()
+                    checkpoint.save(checkpoint_path)
+                return processor
+
+        except Exception as e:
+            self.logger.error(f"Error processing CSV file: {e}")
+            raise
+
+    def _start_checkpoint(self, reader: MmapCSVReader, file_path: str) -> Tuple[Optional[Checkpoint], Any]:
+        from services.transaction_processor import TransactionProcessor
+
+        processor = TransactionProcessor()
+        delimiter = self._choose_delimiter(reader.sample())
+        header, header_end = reader.read_header(delimiter)
+        if header is None:
+            return None, processor
+
+        checkpoint = Checkpoint(
+            file_path=str(Path(file_path).resolve()),
+            offset=header_end,
+            prefix_sha256="",
+            delimiter=delimiter,
+            header=header,
+            header_mapping=self._map_headers(header),
+        )
+        valid_data, invalid_data = self._validate_appended(reader, checkpoint)
+        self._collect(processor, valid_data, invalid_data)
+        return checkpoint, processor
+
+    def _resume_from_checkpoint(self, reader: MmapCSVReader, checkpoint: Checkpoint):
+        from services.transaction_processor import TransactionProcessor
+
+        if self._map_headers(checkpoint.header) != checkpoint.header_mapping:
+            self.logger.warning("Header mapping rules changed since the checkpoint, reprocessing in full")
+            return None
+
+        appended = self._validate_appended(reader, checkpoint)
+        if appended is None:
+            return None
+        valid_data, invalid_data = appended
+
+        with self.profiler.stage("checkpoint_restore", checkpoint.rows):
+            processor = TransactionProcessor.from_state(checkpoint.processor_state)
+        detector = self.near_duplicate_detector
+        window = detector.window_days if detector is not None else None
+        if processor.near_duplicate_window != window:
+            self.logger.warning("Near-duplicate window changed since the checkpoint, reprocessing in full")
+            return None
+        self._processed_ids.update(t.transaction_id for t in processor.transactions)
+        if detector is not None:
+            detector.seed(processor.transactions)
+        self._collect(processor, valid_data, invalid_data)
+        self.logger.info(f"Resumed from checkpoint at offset {checkpoint.offset:,} ({checkpoint.rows:,} rows)")
+        return processor
+
+    def _validate_appended(self, reader: MmapCSVReader, checkpoint: Checkpoint) -> Optional[Tuple[
+        List[ProcessedTransaction], List[ProcessedTransaction]
+    ]]:
+        decode = self._decoder_for(checkpoint.header)
+        with self.profiler.stage("read") as stage:
+            raw_transactions = [
+                decode(row) for row in reader.iter_rows(checkpoint.delimiter, checkpoint.offset) if any(row)
+            ]
+            stage.rows = len(raw_transactions)
+        with self.profiler.stage("clean", len(raw_transactions)):
+            cleaned_data = self.data_cleaner.clean(raw_transactions)
+
+        new_ids = [t.transaction_id for t in cleaned_data if t.transaction_id]
+        duplicate_ids = self.validator.find_duplicate_ids(new_ids)
+        collisions = checkpoint.seen_ids.intersection(new_ids)
+
+        # A new row repeating an id that was unique in the prefix would turn an
+        # already reported row invalid, which only a full run can reproduce.
+        if collisions - checkpoint.duplicate_ids:
+            self.logger.warning(
+                f"{len(collisions - checkpoint.duplicate_ids)} appended ids repeat earlier rows, reprocessing in full"
+            )
+            return None
+
+        with self.profiler.stage("validate", len(cleaned_data)):
+            valid_data, invalid_data = self.validator.validate_rows(cleaned_data, duplicate_ids | collisions)
+        checkpoint.seen_ids.update(new_ids)
+        checkpoint.duplicate_ids.update(duplicate_ids)
+        checkpoint.rows += len(raw_transactions)
+        return valid_data, invalid_data
+
+    def prefilter_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {"duplicate_scan": self.validator.prefilter_stats, "processed_ids": self._processed_ids.stats()}
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        # Caches of this process; workers of parallel and batch runs keep their own
+        stats = {
+            "header_decoder": self._decoder_cache.stats(),
+            "date_parse": self.data_cleaner.date_cache.stats(),
+            "amount_parse": self.data_cleaner.amount_parser.cache.stats(),
+        }
+        if self.result_cache is not None:
+            stats["result"] = self.result_cache.stats()
+        return stats
+
+    def _collect(self, processor, valid_data: List[ProcessedTransaction],
+                 invalid_data: List[ProcessedTransaction]) -> List[Transaction]:
+        with self.profiler.stage("convert", len(valid_data) + len(invalid_data)):
+            return self._convert_and_add(processor, valid_data, invalid_data)
+
+    def _convert_and_add(self, processor, valid_data: Iterable[ProcessedTransaction],
+                         invalid_data: Iterable[ProcessedTransaction]) -> List[Transaction]:
+        accepted = []
+
+        # Convert valid ProcessedTransaction to Transaction objects
+        converted = [(processed, Transaction.from_processed(processed)) for processed in valid_data]
+
+        candidate_ids = [transaction.transaction_id for _, transaction in converted if transaction]
+        processed_before = self._processed_ids.contains_many(candidate_ids)
+
+        # One batched lookup per chunk for ids accepted by earlier runs
+        seen_before = set()
+        if self.dedupe_index is not None:
+            seen_before = self.dedupe_index.contains_many(
+                transaction_id for transaction_id in candidate_ids if transaction_id not in processed_before
+            ) - self._reprocessed_ids
+
+        accepted_ids = set()
+        for processed, transaction in converted:
+            if transaction:
+                transaction_id = transaction.transaction_id
+                if transaction_id in processed_before or transaction_id in accepted_ids or transaction_id in seen_before:
+                    processor.add_duplicate_transaction(transaction)
+                    print(f"  🔄 Duplicate: {transaction.transaction_id}")
+                else:
+                    processor.add_transaction(transaction)
+                    accepted_ids.add(transaction_id)
+                    accepted.append(transaction)
+                   
+            else:
+                print(f"  ❌ Invalid: {processed.transaction_id} - Missing required fields")
+        processor.update_index()
+
+        self._processed_ids.add_many(transaction.transaction_id for transaction in accepted)
+        if self.dedupe_index is not None:
+            self.dedupe_index.add_many(transaction.transaction_id for transaction in accepted)
+        if self.near_duplicate_detector is not None:
+            self._flag_near_duplicates(processor, accepted)
+
+        # Add invalid transactions to processor
+        for invalid_txn in invalid_data:
+            company_transaction = Transaction.from_processed(invalid_txn)
+            if company_transaction:
+                processor.add_invalid_transaction(
+                    company_transaction, 
+                    invalid_txn.error_codes
+                )
+        return accepted
+
+    def _flag_near_duplicates(self, processor, accepted: List[Transaction]) -> None:
+        detector = self.near_duplicate_detector
+        processor.near_duplicate_window = detector.window_days
+        observe = detector.observe
+        for transaction in accepted:
+            match = observe(transaction)
+            if match is not None:
+                matched_id, matched_ordinal = match
+                processor.add_near_duplicate(transaction, matched_id, date.fromordinal(matched_ordinal))
@@ -1,21 +1,75 @@
-import re
 import logging
 from decimal import Decimal, InvalidOperation
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Optional, List, Iterable
+from collections import Counter
 from dateutil import parser
 
 # Use absolute imports
 from models.transaction import RawTransaction, ProcessedTransaction
 from constants.currencies import Currency, CURRENCY_MAP
 from constants.status import TransactionStatus, STATUS_MAP
+from services.amount_parser import AmountParser, AMOUNT_SAMPLE_SIZE, CACHE_SAMPLE_SIZE
+from utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+DATE_FORMATS = [
+    '%Y-%m-%d', '%m/%d/%Y', '%d-%m-%Y', '%d/%m/%Y', 
+    '%d-%m-%y', '%d/%m/%y', '%Y%m%d'
+]
+
+# Formats that can both parse the same string. Their relative order decides
+# the result, so inference never moves one past the other.
+OVERLAPPING_DATE_FORMATS = {frozenset({'%m/%d/%Y', '%d/%m/%Y'})}
+
+DATE_SAMPLE_SIZE = 500
+DATE_CACHE_SIZE = 4096
+
 class DataCleaner:
+    def __init__(self, date_cache_size: int = DATE_CACHE_SIZE):
+        self.date_formats = list(DATE_FORMATS)
+        self.date_cache = LRUCache(date_cache_size)
+        self.amount_parser = AmountParser()
+
     def clean(self, transactions: List[RawTransaction]) -> List[ProcessedTransaction]:
+        self.infer_date_format(t.date for t in transactions[:DATE_SAMPLE_SIZE])
+        self.amount_parser.detect_convention(t.amount for t in transactions[:AMOUNT_SAMPLE_SIZE])
+        self.amount_parser.choose_cache(t.amount for t in transactions[:CACHE_SAMPLE_SIZE])
         return [self._clean_transaction(t) for t in transactions]
     
+    def infer_date_format(self, sample: Iterable[any]) -> Optional[str]:
+        counts = Counter(str(d).strip() for d in sample if d is not None)
+        format_counts = Counter()
+        for date_str, count in counts.items():
+            fmt = self._match_date_format(date_str, DATE_FORMATS)
+            if fmt:
+                format_counts[fmt] += count
+        
+        if not format_counts:
+            return None
+        
+        dominant = format_counts.most_common(1)[0][0]
+        self.date_formats = self._promote_date_format(dominant)
+        return dominant
+    
+    def _promote_date_format(self, dominant: str) -> List[str]:
+        formats = [fmt for fmt in DATE_FORMATS if fmt != dominant]
+        position = DATE_FORMATS.index(dominant)
+        while position > 0 and frozenset({formats[position - 1], dominant}) not in OVERLAPPING_DATE_FORMATS:
+            position -= 1
+        formats.insert(position, dominant)
+        return formats
+    
+    def _match_date_format(self, date_str: str, formats: List[str]) -> Optional[str]:
+        for fmt in formats:
+            try:
+                datetime.strptime(date_str, fmt)
+                return fmt
+            except ValueError:
+                continue
+        return None
+    
     def _clean_transaction(self, transaction: RawTransaction) -> ProcessedTransaction:
         cleaned = ProcessedTransaction(
             transaction_id=self._clean_string(transaction.transaction_id),
@@ -41,12 +95,10 @@ class DataCleaner:
         if not date_str_clean:
             return None
         
-        date_formats = [
-            '%Y-%m-%d', '%m/%d/%Y', '%d-%m-%Y', '%d/%m/%Y', 
-            '%d-%m-%y', '%d/%m/%y', '%Y%m%d'
-        ]
-        
-        for fmt in date_formats:
+        return self.date_cache.get_or_compute(date_str_clean, self._parse_date)
+    
+    def _parse_date(self, date_str_clean: str) -> Optional[date]:
+        for fmt in self.date_formats:
             try:
                 return datetime.strptime(date_str_clean, fmt).date()
             except ValueError:
@@ -64,33 +116,7 @@ class DataCleaner:
         return None
     
     def _clean_amount(self, amount_str: any) -> Optional[Decimal]:
-        if amount_str is None: 
-            return None
-        
-        amount_str_clean = str(amount_str).strip()
-        if not amount_str_clean: 
-            return None
-        
-        cleaned = re.sub(r'[^\d.,-]', '', amount_str_clean)
-        if not cleaned: 
-            return None
-        
-        comma_count = cleaned.count(',')
-        dot_count = cleaned.count('.')
-        
-        if comma_count == 1 and dot_count > 0 and cleaned.find(',') > cleaned.find('.'):
-            cleaned = cleaned.replace('.', '').replace(',', '.')
-        elif comma_count > 0 and dot_count == 1 and cleaned.find('.') > cleaned.find(','):
-            cleaned = cleaned.replace(',', '')
-        elif comma_count > 0 and dot_count == 0:
-            cleaned = cleaned.replace(',', '')
-        elif comma_count == 1 and dot_count == 0:
-            cleaned = cleaned.replace(',', '.')
-        
-        try:
-            return Decimal(cleaned)
-        except:
-            return None
+        return self.amount_parser.parse(amount_str)
     
     def _clean_currency(self, currency_str: any) -> Optional[Currency]:
         if currency_str is None: 
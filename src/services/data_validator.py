@@ -1,70 +1,156 @@
 import logging
+from itertools import islice
 from decimal import Decimal
-from typing import List, Tuple, Set
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Set, Iterable
+
+import numpy as np
+import pandas as pd
 
 # Use absolute imports
 from models.transaction import ProcessedTransaction
-from constants.currencies import VALID_CURRENCIES, Currency
-from constants.status import VALID_STATUSES, TransactionStatus
+from constants.error_codes import ErrorCode
+from services.validation_rules import BUILTIN_RULES, Rule, RuleEngine
+from utils.bloom_filter import BloomFilter
 
 logger = logging.getLogger(__name__)
 
+PREFILTER_BATCH_SIZE = 8192
+
 class DataValidator:
+    def __init__(self, bloom_false_positive_rate: Optional[float] = None, rules: Optional[Sequence[Rule]] = None):
+        # With a false positive rate set, duplicate scans keep a Bloom filter
+        # instead of a set of every id and confirm candidates in a second pass
+        self.bloom_false_positive_rate = bloom_false_positive_rate
+        self.prefilter_stats: Dict[str, Any] = {}
+        # Rules are compiled once into a single pass per row. Batches from the
+        # columnar cleaner are checked over its columns instead.
+        self.rules = list(BUILTIN_RULES if rules is None else rules)
+        self.engine = RuleEngine(self.rules)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Generated check functions do not pickle; workers recompile the rules
+        state = self.__dict__.copy()
+        del state["engine"]
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.engine = RuleEngine(self.rules)
+    
     def validate_dataset(self, transactions: List[ProcessedTransaction]) -> Tuple[
         List[ProcessedTransaction], List[ProcessedTransaction], List[str]
+    ]:
+        duplicate_ids = self._find_duplicates(transactions)
+        valid_rows, invalid_rows = self.validate_rows(transactions, duplicate_ids)
+        return valid_rows, invalid_rows, list(duplicate_ids)
+    
+    def validate_rows(self, transactions: Iterable[ProcessedTransaction], duplicate_ids: Set[str]) -> Tuple[
+        List[ProcessedTransaction], List[ProcessedTransaction]
     ]:
         valid_rows = []
         invalid_rows = []
-        duplicate_ids = self._find_duplicates(transactions)
+        if not isinstance(transactions, list):
+            transactions = list(transactions)
         
-        for transaction in transactions:
-            errors = self._validate_row(transaction)
+        for transaction, codes in zip(transactions, self.error_codes(transactions)):
             if transaction.transaction_id in duplicate_ids:
-                errors.append("Duplicate transaction_id")
+                codes |= ErrorCode.DUPLICATE_TRANSACTION_ID
             
-            transaction.is_valid = len(errors) == 0
-            transaction.validation_errors = errors
+            transaction.is_valid = codes == 0
+            transaction.error_codes = int(codes)
             
             if transaction.is_valid:
                 valid_rows.append(transaction)
             else:
                 invalid_rows.append(transaction)
         
-        return valid_rows, invalid_rows, list(duplicate_ids)
+        return valid_rows, invalid_rows
+    
+    def validate_columns(self, columns: Mapping[str, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        # validate_dataset over the factorized columns of ColumnarDataCleaner:
+        # one set of ErrorCode bits per row, 0 for valid rows
+        codes = self.engine.check_columns(columns)
+        codes[self._duplicate_rows(*columns["transaction_id"])] |= int(ErrorCode.DUPLICATE_TRANSACTION_ID)
+        return codes
     
-    def _validate_row(self, transaction: ProcessedTransaction) -> List[str]:
-        errors = []
+    def _duplicate_rows(self, keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # Distinct raw ids may clean to the same id, so rows are counted per cleaned id
+        if self.bloom_false_positive_rate is not None:
+            transaction_ids = values[keys].tolist()
+            duplicate_ids = self.find_duplicate_ids_rescanning(lambda: transaction_ids, len(transaction_ids))
+            return pd.Series(values, dtype=object).isin(duplicate_ids).to_numpy()[keys]
+        id_codes, distinct = pd.factorize(values)
+        row_codes = id_codes[keys]
+        duplicated = (np.bincount(row_codes, minlength=len(distinct)) > 1) & distinct.astype(bool)
+        return duplicated[row_codes]
+    
+    def resolve_duplicates(self, transactions: List[ProcessedTransaction]) -> Tuple[
+        List[ProcessedTransaction], List[ProcessedTransaction]
+    ]:
+        # For rows already checked by validate_rows against a partial view of the data
+        duplicate_ids = self._find_duplicates(transactions)
+        valid_rows = []
+        invalid_rows = []
         
-        if not transaction.transaction_id:
-            errors.append("Missing transaction_id")
-        if not transaction.customer_id:
-            errors.append("Missing customer_id")
-        if not transaction.date:
-            errors.append("Invalid date")
+        for transaction in transactions:
+            if transaction.transaction_id in duplicate_ids:
+                transaction.error_codes |= ErrorCode.DUPLICATE_TRANSACTION_ID
+                transaction.is_valid = False
+            
+            if transaction.is_valid:
+                valid_rows.append(transaction)
+            else:
+                invalid_rows.append(transaction)
         
-        if transaction.amount is None:
-            errors.append("Invalid amount")
-        elif transaction.amount <= 0:
-            errors.append("Amount must be positive")
+        return valid_rows, invalid_rows
+    
+    def error_codes(self, transactions: List[ProcessedTransaction]) -> List[int]:
+        columns = getattr(transactions, "columns", None)
+        if columns is not None and self.engine.columnar:
+            return self.engine.check_columns(columns).tolist()
+        check = self.engine.check
+        return [check(transaction) for transaction in transactions]
+    
+    def _find_duplicates(self, transactions: List[ProcessedTransaction]) -> set:
+        return self.find_duplicate_ids_rescanning(
+            lambda: (t.transaction_id for t in transactions), len(transactions)
+        )
+    
+    def find_duplicate_ids_rescanning(self, id_source: Callable[[], Iterable[str]], expected_items: int) -> Set[str]:
+        if self.bloom_false_positive_rate is None:
+            return self.find_duplicate_ids(id_source())
         
-        if not transaction.currency:
-            errors.append("Missing currency")
-        elif transaction.currency not in VALID_CURRENCIES:
-            errors.append(f"Invalid currency: {transaction.currency}")
+        # First pass: ids the filter may have seen before are candidates, a
+        # small set of true duplicates plus false positives
+        bloom = BloomFilter(max(expected_items, 1), self.bloom_false_positive_rate)
+        candidates = set()
+        ids = (transaction_id for transaction_id in id_source() if transaction_id)
+        for batch in iter(lambda: list(islice(ids, PREFILTER_BATCH_SIZE)), []):
+            batch_seen = set()
+            for transaction_id, maybe_seen in zip(batch, bloom.add_many(batch)):
+                if maybe_seen or transaction_id in batch_seen:
+                    candidates.add(transaction_id)
+                batch_seen.add(transaction_id)
         
-        if not transaction.status:
-            errors.append("Missing status")
-        elif transaction.status not in VALID_STATUSES:
-            errors.append(f"Invalid status: {transaction.status}")
-            
-        return errors
+        # Second pass: exact confirmation restricted to the candidates
+        duplicates = set()
+        if candidates:
+            duplicates = self.find_duplicate_ids(
+                transaction_id for transaction_id in id_source() if transaction_id in candidates
+            )
+        
+        self.prefilter_stats = bloom.stats()
+        self.prefilter_stats["confirm_lookups"] = len(candidates)
+        self.prefilter_stats["confirm_hits"] = len(duplicates)
+        self.prefilter_stats["confirm_hit_rate"] = len(duplicates) / len(candidates) if candidates else 0.0
+        logger.info(f"Duplicate prefilter: {self.prefilter_stats}")
+        return duplicates
     
-    def _find_duplicates(self, transactions: List[ProcessedTransaction]) -> set:
+    def find_duplicate_ids(self, transaction_ids: Iterable[str]) -> Set[str]:
         seen = set()
         duplicates = set()
         
-        for transaction in transactions:
-            transaction_id = transaction.transaction_id
+        for transaction_id in transaction_ids:
             if not transaction_id:
                 continue
                 
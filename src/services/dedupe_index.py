@@ -0,0 +1,118 @@
+import sqlite3
+import time
+import logging
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits bound parameters per statement (999 before 3.32)
+LOOKUP_BATCH_SIZE = 900
+SECONDS_PER_DAY = 86400
+# How long a write waits for another process's write transaction to finish
+BUSY_TIMEOUT_MS = 30000
+
+
+class DedupeIndex:
+    # Transaction ids accepted by earlier runs, kept in SQLite so a replayed
+    # transaction is caught across processes and days. Membership checks and
+    # inserts are batched per chunk. A run's ids are staged in a temporary
+    # table private to this connection and moved to the shared table in one
+    # short write transaction on commit(), so concurrent runs are not locked
+    # out while this one is running, and a failed run can be retried without
+    # flagging its own rows.
+    def __init__(self, path: str, retention_days: Optional[int] = None):
+        if retention_days is not None and retention_days <= 0:
+            raise ValueError(f"retention_days must be positive, got {retention_days}")
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self.run_time = int(time.time())
+        self.lookups = 0
+        self.hits = 0
+        self.inserted = 0
+        self.logger = logging.getLogger(__name__)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_ids ("
+            "transaction_id TEXT PRIMARY KEY, first_seen INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS seen_ids_first_seen ON seen_ids (first_seen)")
+        self._conn.execute("CREATE TEMP TABLE pending_ids (transaction_id TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.prune()
+
+    def __enter__(self) -> "DedupeIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+    def prune(self) -> int:
+        if self.retention_days is None:
+            return 0
+        cutoff = self.run_time - self.retention_days * SECONDS_PER_DAY
+        removed = self._conn.execute("DELETE FROM seen_ids WHERE first_seen < ?", (cutoff,)).rowcount
+        if removed:
+            self.logger.info(f"Pruned {removed:,} ids older than {self.retention_days} days from {self.path}")
+        return removed
+
+    def contains_many(self, transaction_ids: Iterable[str]) -> Set[str]:
+        ids = list(dict.fromkeys(transaction_ids))
+        found = set()
+        for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            # Ids added earlier in this run count as seen too
+            rows = self._conn.execute(
+                f"SELECT transaction_id FROM seen_ids WHERE transaction_id IN ({placeholders}) "
+                f"UNION ALL SELECT transaction_id FROM pending_ids WHERE transaction_id IN ({placeholders})",
+                batch + batch,
+            )
+            found.update(row[0] for row in rows)
+        self.lookups += len(ids)
+        self.hits += len(found)
+        return found
+
+    def add_many(self, transaction_ids: Iterable[str]) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO pending_ids (transaction_id) VALUES (?)",
+            ((transaction_id,) for transaction_id in transaction_ids),
+        )
+
+    def commit(self) -> None:
+        # IMMEDIATE takes the write lock up front, waiting up to the busy
+        # timeout for other writers instead of failing halfway through
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO seen_ids (transaction_id, first_seen) "
+                "SELECT transaction_id, ? FROM pending_ids",
+                (self.run_time,),
+            )
+            self._conn.execute("DELETE FROM pending_ids")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.inserted += max(cursor.rowcount, 0)
+        self.logger.info(
+            f"Dedupe index {self.path}: {self.lookups:,} ids checked, {self.hits:,} seen before, "
+            f"{self.inserted:,} added"
+        )
+
+    def rollback(self) -> None:
+        self._conn.execute("DELETE FROM pending_ids")
+
+    def close(self) -> None:
+        # Ids still pending go with the temporary table
+        self._conn.close()
+
+    def __len__(self) -> int:
+        # Committed ids only
+        return self._conn.execute("SELECT COUNT(*) FROM seen_ids").fetchone()[0]
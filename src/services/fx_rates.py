@@ -0,0 +1,151 @@
+import csv
+import logging
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Use absolute imports
+from constants.currencies import Currency
+from services.summary_aggregates import EXACT_CONTEXT
+from utils.compressed_io import open_text
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+RATE_COLUMNS = ("date", "currency", "rate")
+DEFAULT_RATE_CACHE_SIZE = 65536
+_CENT = Decimal("0.01")
+_ONE = Decimal(1)
+_ZERO = Decimal(0)
+
+
+class FxRateTable:
+    # Historical rates as units of base_currency per unit of currency, one
+    # sorted list of date ordinals per currency. A lookup uses the latest rate
+    # on or before the date, found by binary search and memoized per
+    # (from, to, date) since reports ask for the same pairs over and over.
+    def __init__(self, base_currency: Currency = Currency.USD, cache_size: int = DEFAULT_RATE_CACHE_SIZE):
+        self.base_currency = base_currency
+        self._ordinals: Dict[Currency, List[int]] = {}
+        self._rates: Dict[Currency, List[Decimal]] = {}
+        self._cache = LRUCache(cache_size)
+
+    @classmethod
+    def load(cls, path: str, base_currency: Currency = Currency.USD) -> "FxRateTable":
+        # CSV with a date,currency,rate header; compressed files are read too
+        by_currency: Dict[Currency, Dict[int, Decimal]] = {}
+        with open_text(path) as f:
+            reader = csv.DictReader(f)
+            missing = [column for column in RATE_COLUMNS if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"{path}: rate file is missing columns {missing}")
+            for line_number, row in enumerate(reader, start=2):
+                try:
+                    ordinal = date.fromisoformat(row["date"].strip()).toordinal()
+                    currency = Currency(row["currency"].strip().upper())
+                    rate = Decimal(row["rate"].strip())
+                except (ValueError, InvalidOperation, AttributeError) as e:
+                    raise ValueError(f"{path}:{line_number}: invalid rate row {row}: {e}") from e
+                if not rate.is_finite() or rate <= 0:
+                    raise ValueError(f"{path}:{line_number}: rate must be positive, got {row['rate']}")
+                # A later row for the same currency and date replaces the earlier one
+                by_currency.setdefault(currency, {})[ordinal] = rate
+
+        table = cls(base_currency)
+        for currency, rates in by_currency.items():
+            ordinals = sorted(rates)
+            table._ordinals[currency] = ordinals
+            table._rates[currency] = [rates[ordinal] for ordinal in ordinals]
+        logger.info(f"Loaded {sum(len(r) for r in by_currency.values()):,} FX rates for "
+                    f"{len(by_currency)} currencies from {path}")
+        return table
+
+    def add_rate(self, currency: Currency, day: date, rate: Decimal) -> None:
+        ordinals = self._ordinals.setdefault(currency, [])
+        rates = self._rates.setdefault(currency, [])
+        ordinal = day.toordinal()
+        index = bisect_right(ordinals, ordinal)
+        if index and ordinals[index - 1] == ordinal:
+            rates[index - 1] = Decimal(rate)
+        else:
+            ordinals.insert(index, ordinal)
+            rates.insert(index, Decimal(rate))
+        self._cache.clear()
+
+    def rate(self, currency: Currency, ordinal: int) -> Optional[Decimal]:
+        # Units of base_currency per unit of currency on the date, or None
+        # when the table has no rate for the currency on or before it
+        if currency == self.base_currency:
+            return _ONE
+        ordinals = self._ordinals.get(currency)
+        if not ordinals:
+            return None
+        index = bisect_right(ordinals, ordinal) - 1
+        if index < 0:
+            return None
+        return self._rates[currency][index]
+
+    def cross_rate(self, from_currency: Currency, to_currency: Currency, ordinal: int) -> Optional[Decimal]:
+        return self._cache.get_or_compute((from_currency, to_currency, ordinal), self._compute_cross_rate)
+
+    def _compute_cross_rate(self, key: Tuple[Currency, Currency, int]) -> Optional[Decimal]:
+        from_currency, to_currency, ordinal = key
+        if from_currency == to_currency:
+            return _ONE
+        from_rate = self.rate(from_currency, ordinal)
+        to_rate = self.rate(to_currency, ordinal)
+        if from_rate is None or to_rate is None:
+            return None
+        return from_rate / to_rate
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class CurrencyConverter:
+    # Converts amounts into one reporting currency at each amount's own date
+    def __init__(self, rates: FxRateTable, reporting_currency: Currency = Currency.USD):
+        self.rates = rates
+        self.reporting_currency = reporting_currency
+
+    def convert_many(self, items: Iterable[Tuple[Currency, int, Decimal]]) -> List[Optional[Decimal]]:
+        # (currency, date ordinal, amount) -> converted amount, unrounded, or
+        # None when a rate is missing
+        converted = []
+        cross_rate = self.rates.cross_rate
+        reporting_currency = self.reporting_currency
+        for currency, ordinal, amount in items:
+            rate = cross_rate(currency, reporting_currency, ordinal)
+            converted.append(None if rate is None else EXACT_CONTEXT.multiply(amount, rate))
+        return converted
+
+    def convert_totals(self, amounts_by_date: Dict[Tuple[Currency, int], Decimal]) -> Dict[str, Any]:
+        # Per-currency and consolidated totals from amounts already summed per
+        # (currency, date), so the work depends on the number of distinct
+        # dates rather than on the number of transactions
+        keys = list(amounts_by_date)
+        converted = self.convert_many((currency, ordinal, amounts_by_date[currency, ordinal])
+                                      for currency, ordinal in keys)
+        totals: Dict[Currency, Decimal] = {}
+        unconverted: Dict[Currency, Decimal] = {}
+        for (currency, ordinal), value in zip(keys, converted):
+            if value is None:
+                unconverted[currency] = EXACT_CONTEXT.add(unconverted.get(currency, _ZERO),
+                                                          amounts_by_date[currency, ordinal])
+            else:
+                totals[currency] = EXACT_CONTEXT.add(totals.get(currency, _ZERO), value)
+
+        by_currency = {
+            currency.value: totals[currency].quantize(_CENT, rounding=ROUND_HALF_EVEN)
+            for currency in Currency if currency in totals
+        }
+        if unconverted:
+            logger.warning(f"No {self.reporting_currency.value} rate on or before some transaction dates for "
+                           f"{', '.join(currency.value for currency in unconverted)}; those amounts are left out")
+        return {
+            "currency": self.reporting_currency.value,
+            "consolidated_total": sum(by_currency.values(), _ZERO),
+            "by_currency": by_currency,
+            "unconverted": {currency.value: unconverted[currency] for currency in Currency if currency in unconverted},
+        }
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import logging
+from typing import Any, Dict, Iterable, Set
+
+# Use absolute imports
+from services.dedupe_index import DedupeIndex
+from utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+
+class IdSet(set):
+    # The plain in-memory set, with the batch interface of PrefilteredIdSet
+    def contains_many(self, transaction_ids: Iterable[str]) -> Set[str]:
+        return {transaction_id for transaction_id in transaction_ids if transaction_id in self}
+
+    def add_many(self, transaction_ids: Iterable[str]) -> None:
+        self.update(transaction_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"items": len(self)}
+
+    def close(self) -> None:
+        pass
+
+
+class PrefilteredIdSet:
+    # Exact set membership at bounded memory: a Bloom filter answers "never
+    # seen" for most ids and only possible hits are confirmed against an
+    # exact store kept on disk in a temporary SQLite file.
+    def __init__(self, expected_items: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE):
+        self.bloom = BloomFilter(expected_items, false_positive_rate)
+        fd, self._store_path = tempfile.mkstemp(prefix="processed_ids_", suffix=".sqlite")
+        os.close(fd)
+        self.store = DedupeIndex(self._store_path)
+        self.confirm_lookups = 0
+        self.confirm_hits = 0
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return bool(self.contains_many([transaction_id]))
+
+    def contains_many(self, transaction_ids: Iterable[str]) -> Set[str]:
+        transaction_ids = list(transaction_ids)
+        possible = [
+            transaction_id
+            for transaction_id, maybe_seen in zip(transaction_ids, self.bloom.contains_many(transaction_ids))
+            if maybe_seen
+        ]
+        if not possible:
+            return set()
+        confirmed = self.store.contains_many(possible)
+        self.confirm_lookups += len(possible)
+        self.confirm_hits += len(confirmed)
+        return confirmed
+
+    def add_many(self, transaction_ids: Iterable[str]) -> None:
+        transaction_ids = list(transaction_ids)
+        self.bloom.add_many(transaction_ids)
+        self.store.add_many(transaction_ids)
+
+    def update(self, transaction_ids: Iterable[str]) -> None:
+        self.add_many(transaction_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.bloom.stats()
+        stats["confirm_lookups"] = self.confirm_lookups
+        stats["confirm_hits"] = self.confirm_hits
+        stats["confirm_hit_rate"] = self.confirm_hits / self.confirm_lookups if self.confirm_lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        self.store.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self._store_path + suffix)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,104 @@
+import csv
+import io
+import mmap
+import logging
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+
+class MmapCSVReader:
+    def __init__(self, file_path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES):
+        if chunk_bytes <= 0:
+            raise ValueError(f"chunk_bytes must be positive, got {chunk_bytes}")
+        self.file_path = file_path
+        self.chunk_bytes = chunk_bytes
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self.size = 0
+
+    def __enter__(self) -> "MmapCSVReader":
+        self._file = open(self.file_path, "rb")
+        try:
+            self._file.seek(0, 2)
+            self.size = self._file.tell()
+            # mmap cannot map an empty file; an empty reader simply yields nothing
+            if self.size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def sample(self, size: int = 1024) -> str:
+        if self._map is None:
+            return ""
+        return self._map[:size].decode("utf-8", errors="ignore")
+
+    def record_end(self, start: int, min_end: Optional[int] = None) -> int:
+        if self._map is None:
+            return 0
+        search_from = start if min_end is None else max(start, min_end)
+        end = self._next_line_end(search_from)
+
+        # A record boundary has an even number of quote characters before it,
+        # counted from the previous boundary; doubled quotes keep the parity.
+        quotes = self._map[start:end].count(b'"')
+        while quotes % 2 and end < self.size:
+            next_end = self._next_line_end(end)
+            quotes += self._map[end:next_end].count(b'"')
+            end = next_end
+        return end
+
+    def iter_record_ranges(self, start: int = 0, range_bytes: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        range_bytes = range_bytes or self.chunk_bytes
+        while start < self.size:
+            end = self.record_end(start, start + range_bytes)
+            yield start, end
+            start = end
+
+    def read_header(self, delimiter: str) -> Tuple[Optional[List[str]], int]:
+        start = 0
+        while start < self.size:
+            end = self.record_end(start)
+            row = next(self._parse(start, end, delimiter), [])
+            if any(cell.strip() for cell in row):
+                return row, end
+            start = end
+        return None, 0
+
+    def iter_rows(self, delimiter: str, start: int = 0, end: Optional[int] = None) -> Iterator[List[str]]:
+        end = self.size if end is None else end
+        for range_start, range_end in self.iter_record_ranges(start):
+            if range_start >= end:
+                break
+            yield from self._parse(range_start, min(range_end, end), delimiter)
+
+    def hash_range(self, hasher, start: int, end: int) -> None:
+        if self._map is None:
+            return
+        view = memoryview(self._map)
+        try:
+            for block_start in range(start, end, self.chunk_bytes):
+                hasher.update(view[block_start:min(block_start + self.chunk_bytes, end)])
+        finally:
+            view.release()
+
+    def ends_with_newline(self) -> bool:
+        return self.size == 0 or self._map[-1:] == b"\n"
+
+    def _parse(self, start: int, end: int, delimiter: str) -> Iterator[List[str]]:
+        text = self._map[start:end].decode("utf-8")
+        return csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+
+    def _next_line_end(self, position: int) -> int:
+        newline = self._map.find(b"\n", position)
+        return self.size if newline == -1 else newline + 1
@@ -0,0 +1,72 @@
+from bisect import bisect_left, insort
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Use absolute imports
+from models.transaction import Transaction
+
+DEFAULT_WINDOW_DAYS = 1
+
+BucketKey = Tuple[str, str, Decimal]
+Entry = Tuple[int, str]
+
+
+class NearDuplicateDetector:
+    # Flags transactions that repeat an earlier one's customer, currency and
+    # amount within window_days under a different id, as upstream replays do.
+    # Rows are bucketed by that key and each bucket keeps (date ordinal, id)
+    # sorted, so a row is only compared with its nearest dates in its own
+    # bucket: one dict lookup and a bisect per row instead of pairwise checks.
+    # Most keys occur once, so a bucket is a bare entry until it gets a second
+    # one, and keys hold the currency code: millions of lists and enum-holding
+    # tuples would otherwise all be tracked by the garbage collector.
+    def __init__(self, window_days: int = DEFAULT_WINDOW_DAYS):
+        if window_days < 0:
+            raise ValueError(f"window_days must not be negative, got {window_days}")
+        self.window_days = window_days
+        self._buckets: Dict[BucketKey, Union[Entry, List[Entry]]] = {}
+        self.count = 0
+
+    def observe(self, transaction: Transaction) -> Optional[Tuple[str, int]]:
+        # Records the transaction and returns the id and date ordinal of the
+        # closest earlier one it repeats, or None
+        ordinal = transaction.date.toordinal()
+        entry = (ordinal, transaction.transaction_id)
+        self.count += 1
+        key = (transaction.customer_id, transaction.currency.value, transaction.amount)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = entry
+            return None
+        if type(bucket) is tuple:
+            bucket = self._buckets[key] = [bucket]
+        match = self._closest(bucket, ordinal)
+        insort(bucket, entry)
+        return match
+
+    def seed(self, transactions: Iterable[Transaction]) -> None:
+        # Records transactions already reported on, e.g. rows restored from a checkpoint
+        for transaction in transactions:
+            self.observe(transaction)
+
+    def _closest(self, bucket: List[Entry], ordinal: int) -> Optional[Tuple[str, int]]:
+        # The nearest dates sit either side of the insertion point; on a tie
+        # the earlier date wins
+        position = bisect_left(bucket, (ordinal,))
+        candidates = []
+        if position > 0:
+            candidates.append(bucket[position - 1])
+        if position < len(bucket):
+            candidates.append(bucket[position])
+        best = None
+        for other_ordinal, other_id in candidates:
+            distance = abs(other_ordinal - ordinal)
+            if distance <= self.window_days and (best is None or distance < abs(best[1] - ordinal)):
+                best = (other_id, other_ordinal)
+        return best
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> Dict[str, int]:
+        return {"window_days": self.window_days, "rows": self.count, "buckets": len(self._buckets)}
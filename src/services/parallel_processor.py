@@ -0,0 +1,67 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+
+# Use absolute imports
+from models.transaction import ProcessedTransaction
+from services.mmap_csv_reader import MmapCSVReader
+from services.validation_rules import Rule
+
+logger = logging.getLogger(__name__)
+
+# Ranges are cut smaller than one per worker so a slow range does not leave
+# the rest of the pool idle, but never so small that pickling dominates.
+RANGES_PER_WORKER = 4
+MIN_RANGE_BYTES = 1 << 20
+
+
+def split_byte_ranges(file_path: str, start: int, range_count: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(file_path)
+    if start >= size:
+        return []
+
+    target = max((size - start) // max(range_count, 1), MIN_RANGE_BYTES)
+    with MmapCSVReader(file_path) as reader:
+        return list(reader.iter_record_ranges(start, target))
+
+
+def _process_range(task: Tuple[str, int, int, str, List[str], str, Sequence[Rule]]) -> List[ProcessedTransaction]:
+    from services.csv_processor import CSVProcessor
+    from services.data_validator import DataValidator
+
+    file_path, start, end, delimiter, header, cleaner, rules = task
+    # Rules are plain data, so each worker compiles its own copy
+    csv_processor = CSVProcessor(DataValidator(rules=rules), cleaner=cleaner)
+    decode = csv_processor._decoder_for(header)
+    with MmapCSVReader(file_path) as reader:
+        raw_transactions = [decode(row) for row in reader.iter_rows(delimiter, start, end) if any(row)]
+
+    # Duplicates can span ranges, so they are resolved after the merge
+    cleaned_data = csv_processor.data_cleaner.clean(raw_transactions)
+    csv_processor.validator.validate_rows(cleaned_data, set())
+    return cleaned_data
+
+
+class ParallelCSVReader:
+    def __init__(self, workers: int, cleaner: str = 'row', validator=None):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self.cleaner = cleaner
+        self.rules = validator.rules if validator is not None else None
+        self.logger = logging.getLogger(__name__)
+
+    def clean_and_validate(self, file_path: str, header_end: int, delimiter: str,
+                           header: List[str]) -> List[ProcessedTransaction]:
+        ranges = split_byte_ranges(file_path, header_end, self.workers * RANGES_PER_WORKER)
+        self.logger.info(f"Processing {len(ranges)} byte ranges with {self.workers} workers")
+
+        tasks = [(file_path, start, end, delimiter, header, self.cleaner, self.rules)
+                 for start, end in ranges]
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # map() yields in submission order, which keeps the merge in file order
+            for range_rows in executor.map(_process_range, tasks):
+                results.extend(range_rows)
+        return results
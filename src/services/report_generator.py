@@ -1,24 +1,103 @@
 import json
 import csv
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Iterable, Mapping
 
 # Use absolute imports
+from models.transaction import Transaction
 from services.transaction_processor import TransactionProcessor
+from services.fx_rates import CurrencyConverter
+from services.rollup_cube import ROLLUP_VERSION
+from services.sqlite_sink import DEFAULT_DATABASE_NAME, SQLiteSink
+from constants.status import TransactionStatus
+from utils.json_stream import JSON_FORMATS, EncodedSection, JsonStreamWriter
+from utils.profiling import NULL_PROFILER, StageProfiler
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class ReportCache:
+    # What the JSON and error reports share, computed once by
+    # generate_all_reports: the summary and the invalid, duplicate and
+    # near-duplicate sections, already encoded. Valid rows are not cached;
+    # each writer streams them from the store so memory stays flat.
+    summary: Dict[str, Any]
+    error_sections: Dict[str, EncodedSection]
+
+
 class ReportGenerator:
-    def __init__(self, processor: TransactionProcessor, output_dir: str = "output"):
+    def __init__(self, processor: TransactionProcessor, output_dir: str = "output",
+                 converter: Optional[CurrencyConverter] = None, json_format: str = "json",
+                 profiler: Optional[StageProfiler] = None):
+        if json_format not in JSON_FORMATS:
+            raise ValueError(f"Unknown JSON format: {json_format}")
         self.processor = processor
+        self.converter = converter
+        # Layout of the JSON and error reports; see JsonStreamWriter
+        self.json_format = json_format
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        # Each report is timed as a report_* stage
+        self.profiler = profiler or NULL_PROFILER
     
-    def print_console_report(self) -> None:
+    def get_summary(self) -> Dict[str, Any]:
+        # Processor statistics plus, with a converter, totals in the reporting currency
         stats = self.processor.get_summary_statistics()
+        if self.converter is not None:
+            stats["reporting_currency"] = self.converter.convert_totals(self.processor.valid_rollup.amounts_by_date())
+        return stats
+    
+    def _json_filename(self, prefix: str) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = "ndjson" if self.json_format == "ndjson" else "json"
+        return f"{prefix}_{timestamp}.{extension}"
+    
+    def _write_json(self, report_path: Path, sections: Mapping[str, Any]) -> Dict[str, int]:
+        # Row sections are passed as iterators and encoded one record at a time
+        start = time.perf_counter()
+        with open(report_path, "w", encoding="utf-8") as f:
+            stats = JsonStreamWriter(f, self.json_format).write_document(sections)
+        seconds = max(time.perf_counter() - start, 1e-9)
+        # ensure_ascii output, so characters are bytes
+        megabytes = stats["chars"] / (1 << 20)
+        self.logger.info(
+            f"Wrote {stats['records']:,} records, {megabytes:.1f} MB in {seconds:.2f}s "
+            f"({stats['records'] / seconds:,.0f} records/s, {megabytes / seconds:.1f} MB/s)"
+        )
+        return stats
+    
+    def _error_sections(self, cache: Optional[ReportCache] = None) -> Dict[str, Any]:
+        # The sections common to the JSON and error reports, in report order
+        if cache is not None:
+            return cache.error_sections
+        sections = {
+            "invalid_transactions": iter(self.processor.get_invalid_transactions()),
+            "duplicate_transactions": (t.to_dict() for t in self.processor.get_duplicate_transactions()),
+        }
+        if self.processor.near_duplicate_window is not None:
+            sections["near_duplicate_transactions"] = iter(self.processor.get_near_duplicates())
+        return sections
+    
+    def build_cache(self) -> ReportCache:
+        writer = JsonStreamWriter(None, self.json_format)
+        with self.profiler.stage("report_cache") as stage:
+            cache = ReportCache(
+                summary=self.get_summary(),
+                error_sections={name: writer.encode_section(name, items)
+                                for name, items in self._error_sections().items()},
+            )
+            stage.rows = sum(len(section) for section in cache.error_sections.values())
+        return cache
+    
+    def print_console_report(self) -> None:
+        stats = self.get_summary()
         
         lines = []
         lines.append("=" * 64)
@@ -37,22 +116,46 @@ class ReportGenerator:
         lines.append("FINANCIAL SUMMARY:")
         lines.append(f"Total amount (USD): ${stats['total_amount_usd']:,.2f}")
         lines.append(f"Total amount (EUR): €{stats['total_amount_eur']:,.2f}")
+        for currency, amount in stats["amount_by_currency"].items():
+            if currency not in ("USD", "EUR"):
+                lines.append(f"Total amount ({currency}): {amount:,.2f}")
         lines.append("")
         
+        if "reporting_currency" in stats:
+            converted = stats["reporting_currency"]
+            lines.append(f"CONSOLIDATED IN {converted['currency']} (at transaction date rates):")
+            lines.append(f"Consolidated total: {converted['consolidated_total']:,.2f}")
+            for currency, amount in converted["by_currency"].items():
+                lines.append(f"  from {currency}: {amount:,.2f}")
+            for currency, amount in converted["unconverted"].items():
+                lines.append(f"  not converted, no rate ({currency}): {amount:,.2f}")
+            lines.append("")
+        
         lines.append("TRANSACTION STATUS BREAKDOWN:")
         lines.append(f"Completed transactions: {stats['completed_count']:,}")
         lines.append(f"Failed transactions: {stats['failed_count']:,}")
         lines.append(f"Pending transactions: {stats['pending_count']:,}")
         lines.append(f"Cancelled transactions: {stats['cancelled_count']:,}")
         
+        if "near_duplicate_count" in stats:
+            lines.append("")
+            lines.append(f"NEAR-DUPLICATE SUSPECTS (same customer, amount and currency "
+                         f"within {stats['near_duplicate_window_days']} days):")
+            lines.append(f"Suspected replays: {stats['near_duplicate_count']:,}")
+        
+        if stats["error_histogram"]:
+            lines.append("")
+            lines.append("VALIDATION ERRORS (rows per error code):")
+            for name, count in stats["error_histogram"].items():
+                lines.append(f"{name}: {count:,}")
+        
         lines.append("=" * 64)
         
         print("\n".join(lines))
     
-    def generate_json_report(self, filename: Optional[str] = None) -> str:
+    def generate_json_report(self, filename: Optional[str] = None, cache: Optional[ReportCache] = None) -> str:
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"transaction_report_{timestamp}.json"
+            filename = self._json_filename("transaction_report")
         
         report_path = self.output_dir / filename
         
@@ -62,50 +165,52 @@ class ReportGenerator:
                 "generator_version": "1.0.0",
                 "report_type": "transaction_analysis",
             },
-            "summary": self.processor.get_summary_statistics(),
-            "valid_transactions": [t.to_dict() for t in self.processor.get_valid_transactions()],
-            "invalid_transactions": self.processor.get_invalid_transactions(),
-            "duplicate_transactions": [t.to_dict() for t in self.processor.get_duplicate_transactions()],
+            "summary": cache.summary if cache is not None else self.get_summary(),
+            "valid_transactions": self.processor.iter_valid_dicts(),
+            **self._error_sections(cache),
         }
         
         try:
-            with open(report_path, "w", encoding="utf-8") as f:
-                json.dump(report_data, f, indent=2, default=str)
+            with self.profiler.stage("report_json") as stage:
+                stage.rows = self._write_json(report_path, report_data)["records"]
             self.logger.info(f"JSON report generated: {report_path}")
             return str(report_path)
         except Exception as e:
             self.logger.error(f"Error generating JSON report: {e}")
             raise
     
-    def generate_csv_summary(self, filename: Optional[str] = None) -> str:
+    def generate_csv_summary(self, filename: Optional[str] = None,
+                             transactions: Optional[Iterable[Transaction]] = None) -> str:
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"transaction_summary_{timestamp}.csv"
         
         report_path = self.output_dir / filename
         
-        valid_transactions = self.processor.get_valid_transactions()
+        # A stream of transactions is written as it is consumed, so the rows
+        # never have to be held by the processor.
+        if transactions is None:
+            records = self.processor.iter_valid_dicts()
+        else:
+            records = (transaction.to_dict() for transaction in transactions)
         
         try:
-            with open(report_path, "w", newline="", encoding="utf-8") as f:
-                if valid_transactions:
-                    writer = csv.DictWriter(f, fieldnames=[
-                        "transaction_id", "customer_id", "date", "amount", "currency", "status"
+            # A stream is cleaned and validated as it is written; those stages are timed
+            # on their own, so this one is the writing alone
+            with self.profiler.stage("report_csv") as stage, open(report_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["transaction_id", "customer_id", "date", "amount", "currency", "status"])
+                
+                for record in records:
+                    writer.writerow([
+                        record["transaction_id"],
+                        record["customer_id"],
+                        record["date"],
+                        record["amount"],
+                        record["currency"],
+                        record["status"],
                     ])
-                    writer.writeheader()
-                    
-                    for transaction in valid_transactions:
-                        writer.writerow({
-                            "transaction_id": transaction.transaction_id,
-                            "customer_id": transaction.customer_id,
-                            "date": transaction.date.isoformat(),
-                            "amount": float(transaction.amount),
-                            "currency": transaction.currency.value,
-                            "status": transaction.status.value,
-                        })
-                else:
-                    writer = csv.writer(f)
-                    writer.writerow(["transaction_id", "customer_id", "date", "amount", "currency", "status"])
+                stage.rows = self.processor.valid_totals.count
             
             self.logger.info(f"CSV summary report generated: {report_path}")
             return str(report_path)
@@ -113,10 +218,9 @@ class ReportGenerator:
             self.logger.error(f"Error generating CSV summary: {e}")
             raise
     
-    def generate_error_report(self, filename: Optional[str] = None) -> str:
+    def generate_error_report(self, filename: Optional[str] = None, cache: Optional[ReportCache] = None) -> str:
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"error_report_{timestamp}.json"
+            filename = self._json_filename("error_report")
         
         report_path = self.output_dir / filename
         
@@ -129,22 +233,139 @@ class ReportGenerator:
                 "total_invalid_transactions": len(self.processor.get_invalid_transactions()),
                 "total_duplicate_transactions": len(self.processor.get_duplicate_transactions()),
             },
-            "invalid_transactions": self.processor.get_invalid_transactions(),
-            "duplicate_transactions": [t.to_dict() for t in self.processor.get_duplicate_transactions()],
+            **self._error_sections(cache),
         }
+        if self.processor.near_duplicate_window is not None:
+            error_data["summary"]["total_near_duplicate_transactions"] = len(self.processor.near_duplicates)
         
         try:
-            with open(report_path, "w", encoding="utf-8") as f:
-                json.dump(error_data, f, indent=2, default=str)
+            with self.profiler.stage("report_errors") as stage:
+                stage.rows = self._write_json(report_path, error_data)["records"]
             self.logger.info(f"Error report generated: {report_path}")
             return str(report_path)
         except Exception as e:
             self.logger.error(f"Error generating error report: {e}")
             raise
     
-    def generate_all_reports(self) -> Dict[str, str]:
-        reports = {}
-        reports["json"] = self.generate_json_report()
-        reports["csv"] = self.generate_csv_summary()
-        reports["errors"] = self.generate_error_report()
+    def generate_rollup_csv(self, filename: Optional[str] = None) -> str:
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"rollup_{timestamp}.csv"
+        
+        report_path = self.output_dir / filename
+        
+        try:
+            with self.profiler.stage("report_rollup_csv", len(self.processor.valid_rollup)), \
+                    open(report_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["date", "currency", "status", "count", "amount"])
+                for day, currency, status, count, amount in self.processor.valid_rollup.cells():
+                    writer.writerow([day.isoformat(), currency.value, status.value, count, amount])
+            
+            self.logger.info(f"Rollup CSV report generated: {report_path}")
+            return str(report_path)
+        except Exception as e:
+            self.logger.error(f"Error generating rollup CSV report: {e}")
+            raise
+    
+    def generate_rollup_json_report(self, filename: Optional[str] = None) -> str:
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"rollup_report_{timestamp}.json"
+        
+        report_path = self.output_dir / filename
+        
+        try:
+            with self.profiler.stage("report_rollup_json", len(self.processor.valid_rollup)), \
+                    open(report_path, "w", encoding="utf-8") as f:
+                json.dump(self._rollup_data(), f, indent=2, default=str)
+            self.logger.info(f"Rollup JSON report generated: {report_path}")
+            return str(report_path)
+        except Exception as e:
+            self.logger.error(f"Error generating rollup JSON report: {e}")
+            raise
+    
+    def _rollup_data(self) -> Dict[str, Any]:
+        cube = self.processor.valid_rollup
+        failed = TransactionStatus.FAILED.value
+        failed_by_date = {row["date"]: row["count"] for row in cube.rollup(["date", "status"]) if row["status"] == failed}
+        pending = TransactionStatus.PENDING.value
+        
+        return {
+            "report_metadata": {
+                "generated_at": datetime.now().isoformat(),
+                "report_type": "rollup",
+            },
+            "daily_volume_by_currency": cube.rollup(["date", "currency"]),
+            "failure_rate_by_day": [
+                {
+                    "date": row["date"],
+                    "count": row["count"],
+                    "failed_count": failed_by_date.get(row["date"], 0),
+                    "failure_rate": failed_by_date.get(row["date"], 0) / row["count"],
+                }
+                for row in cube.rollup(["date"])
+            ],
+            "pending_backlog_by_date": [
+                {"date": row["date"], "currency": row["currency"], "count": row["count"], "amount": row["amount"]}
+                for row in cube.rollup(["date", "currency", "status"]) if row["status"] == pending
+            ],
+            # Same layout as RollupCube.save, so RollupCube.load reads this file back
+            "version": ROLLUP_VERSION,
+            "cells": cube.to_state(),
+        }
+    
+    def generate_sqlite_report(self, database: Optional[str] = None,
+                               transactions: Optional[Iterable[Transaction]] = None,
+                               source: Optional[str] = None) -> str:
+        # Appends this run to a SQLite database, by default in the output
+        # directory. As with generate_csv_summary, valid rows may come from a
+        # stream instead of the processor.
+        database_path = Path(database) if database else self.output_dir / DEFAULT_DATABASE_NAME
+        
+        try:
+            with self.profiler.stage("report_sqlite") as stage, SQLiteSink(str(database_path)) as sink:
+                run_id = sink.write(self.processor, self.get_summary, transactions, source)
+                stage.rows = self.processor.valid_totals.count
+            self.logger.info(f"SQLite report generated: {database_path} (run {run_id})")
+            return str(database_path)
+        except Exception as e:
+            self.logger.error(f"Error generating SQLite report: {e}")
+            raise
+    
+    def generate_all_reports(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        # Report paths by name, plus "timings": seconds per report. Shared
+        # parts are serialized once, then the writers run in a thread pool so
+        # their disk I/O overlaps; workers=1 writes them one after another.
+        start = time.perf_counter()
+        cache = self.build_cache()
+        timings = {"cache": time.perf_counter() - start}
+        
+        writers: Dict[str, Callable[[], str]] = {
+            "json": lambda: self.generate_json_report(cache=cache),
+            "csv": self.generate_csv_summary,
+            "errors": lambda: self.generate_error_report(cache=cache),
+            "rollup_json": self.generate_rollup_json_report,
+            "rollup_csv": self.generate_rollup_csv,
+        }
+        
+        def timed(write: Callable[[], str]):
+            write_start = time.perf_counter()
+            return write(), time.perf_counter() - write_start
+        
+        workers = workers or len(writers)
+        if workers == 1:
+            results = {name: timed(write) for name, write in writers.items()}
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {name: executor.submit(timed, write) for name, write in writers.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        
+        reports: Dict[str, Any] = {}
+        for name, (path, seconds) in results.items():
+            reports[name] = path
+            timings[name] = seconds
+        timings["total"] = time.perf_counter() - start
+        reports["timings"] = timings
+        self.logger.info("Report timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
         return reports
\ No newline at end of file
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Use absolute imports
+from services.transaction_processor import TransactionProcessor
+from utils.gc_pause import gc_paused
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+ENTRY_SUFFIX = ".result"
+
+_HEADER = struct.Struct("<8sI")
+_MAGIC = b"ACMERSLT"
+# Fast rather than tight: the columns already compress several times over
+_COMPRESSION_LEVEL = 1
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    # Processed results of whole files, keyed by the SHA-256 of the file's
+    # bytes and a hash of the pipeline configuration, so an edited file or a
+    # changed rule never reuses a result. Each entry is one file holding the
+    # processor's columns (TransactionProcessor.to_bytes), zlib-compressed.
+    # A hit touches the entry's mtime; once the directory grows past
+    # max_bytes the least recently used entries are deleted.
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, file_path: str, config: Dict[str, Any]) -> str:
+        # The content hash leads so invalidate() can find a file's entries under any configuration
+        described = json.dumps({"version": RESULT_CACHE_VERSION, **config}, sort_keys=True)
+        return f"{file_sha256(file_path)}-{hashlib.sha256(described.encode('utf-8')).hexdigest()[:16]}"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[TransactionProcessor]:
+        path = self._path(key)
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version = _HEADER.unpack_from(data)
+            if magic != _MAGIC or version != RESULT_CACHE_VERSION:
+                raise ValueError(f"unsupported format {magic!r} version {version}")
+            with gc_paused():
+                processor = TransactionProcessor.from_bytes(zlib.decompress(memoryview(data)[_HEADER.size:]))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError, struct.error, zlib.error) as e:
+            self.logger.warning(f"Dropping unreadable result cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        self.logger.info(f"Result cache hit {path.name}: {len(data) / (1 << 20):.1f} MB loaded in "
+                         f"{time.perf_counter() - start:.2f}s")
+        return processor
+
+    def put(self, key: str, processor: TransactionProcessor) -> Optional[Path]:
+        start = time.perf_counter()
+        data = _HEADER.pack(_MAGIC, RESULT_CACHE_VERSION) + zlib.compress(processor.to_bytes(), _COMPRESSION_LEVEL)
+        if len(data) > self.max_bytes:
+            self.logger.warning(f"Result of {len(data):,} bytes exceeds the cache size of {self.max_bytes:,}, not cached")
+            return None
+
+        # Write then rename so readers never see a torn entry; the pid keeps
+        # concurrent writers of the same key apart
+        path = self._path(key)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self.logger.info(f"Result cached as {path.name}: {len(data) / (1 << 20):.1f} MB in "
+                         f"{time.perf_counter() - start:.2f}s")
+        self.evict(keep=path)
+        return path
+
+    def _entries(self) -> List[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file()]
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        # Oldest use first until the entries fit in max_bytes
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and Path(path) == keep:
+                continue
+            Path(path).unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            self.logger.info(f"Evicted {evicted} result cache entries, {total:,} bytes kept")
+        return evicted
+
+    def invalidate(self, file_path: str) -> int:
+        # Every entry for the file's current content, whatever the configuration
+        prefix = f"{file_sha256(file_path)}-"
+        removed = 0
+        for entry in self._entries():
+            if entry.name.startswith(prefix):
+                Path(entry.path).unlink(missing_ok=True)
+                removed += 1
+        self.logger.info(f"Invalidated {removed} result cache entries for {file_path}")
+        return removed
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for entry in entries:
+            Path(entry.path).unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = []
+        for entry in self._entries():
+            try:
+                sizes.append(entry.stat().st_size)
+            except FileNotFoundError:
+                continue
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,167 @@
+import json
+import os
+import logging
+from datetime import date
+from decimal import Decimal, localcontext
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Use absolute imports
+from models.transaction import Transaction
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from services.summary_aggregates import EXACT_CONTEXT
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_VERSION = 1
+DIMENSIONS = ("date", "currency", "status")
+
+_ZERO = Decimal(0)
+_CURRENCY_ORDER = {currency: index for index, currency in enumerate(Currency)}
+_STATUS_ORDER = {status: index for index, status in enumerate(TransactionStatus)}
+_CURRENCIES = list(Currency)
+_STATUSES = list(TransactionStatus)
+
+CellKey = Tuple[int, Currency, TransactionStatus]
+
+
+def column_cells(columns: Mapping[str, Tuple[np.ndarray, np.ndarray]]) -> List[Tuple[CellKey, int, Decimal]]:
+    # Count and exact amount per cell of rows given as factorized columns, as
+    # ColumnarDataCleaner builds them, for add_cell. Rows must have a date,
+    # currency and status. Rows are grouped by cell with one NumPy sort and
+    # each cell's amounts are summed from zero under EXACT_CONTEXT: exact
+    # sums do not depend on order, so the total, exponent included, is the
+    # one adding the rows one by one gives.
+    cell_codes = _row_codes(columns["date"], date.toordinal) * len(_CURRENCIES)
+    cell_codes += _row_codes(columns["currency"], _CURRENCY_ORDER.get)
+    cell_codes *= len(_STATUSES)
+    cell_codes += _row_codes(columns["status"], _STATUS_ORDER.get)
+    if not len(cell_codes):
+        return []
+    order = np.argsort(cell_codes)
+    sorted_codes = cell_codes[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+    counts = np.diff(np.append(starts, len(sorted_codes)))
+
+    keys, values = columns["amount"]
+    amounts = iter(values[keys[order]].tolist())
+    totals = []
+    with localcontext(EXACT_CONTEXT):
+        for cell, count in zip(sorted_codes[starts].tolist(), counts.tolist()):
+            ordinal, codes = divmod(cell, len(_CURRENCIES) * len(_STATUSES))
+            currency, status = divmod(codes, len(_STATUSES))
+            key = (ordinal, _CURRENCIES[currency], _STATUSES[status])
+            totals.append((key, count, sum(islice(amounts, count), _ZERO)))
+    return totals
+
+
+def _row_codes(column: Tuple[np.ndarray, np.ndarray], code) -> np.ndarray:
+    keys, values = column
+    return np.array([0 if value is None else code(value) for value in values], dtype=np.int64)[keys]
+
+
+class RollupCube:
+    # Count and exact amount per (date ordinal, currency, status), updated as
+    # transactions are added. Transactions carry a date but no time, so days
+    # are the finest bucket. Any report grouped by a subset of the dimensions
+    # is answered from the cells, whose number depends on distinct days, not rows.
+    def __init__(self):
+        self._cells: Dict[CellKey, List] = {}
+        self.count = 0
+
+    def add(self, transaction: Transaction) -> None:
+        self.add_cell((transaction.date.toordinal(), transaction.currency, transaction.status), 1, transaction.amount)
+
+    def add_cell(self, key: CellKey, count: int, amount: Decimal) -> None:
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = [0, _ZERO]
+        cell[0] += count
+        cell[1] = EXACT_CONTEXT.add(cell[1], amount)
+        self.count += count
+
+    def merge(self, other: "RollupCube") -> None:
+        for key, (count, amount) in other._cells.items():
+            self.add_cell(key, count, amount)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, RollupCube):
+            return self._cells == other._cells
+        return NotImplemented
+
+    __hash__ = None
+
+    def cells(self) -> Iterator[Tuple[date, Currency, TransactionStatus, int, Decimal]]:
+        # Ordered by date, then by the enum order of currency and status
+        keys = sorted(self._cells, key=lambda k: (k[0], _CURRENCY_ORDER[k[1]], _STATUS_ORDER[k[2]]))
+        for ordinal, currency, status in keys:
+            count, amount = self._cells[ordinal, currency, status]
+            yield date.fromordinal(ordinal), currency, status, count, amount
+
+    def rollup(self, dimensions: Sequence[str]) -> List[Dict[str, Any]]:
+        # Counts and amounts grouped by the given dimensions, in cell order
+        unknown = [dimension for dimension in dimensions if dimension not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown rollup dimensions {unknown}; expected a subset of {DIMENSIONS}")
+        positions = [DIMENSIONS.index(dimension) for dimension in dimensions]
+        groups: Dict[Tuple, List] = {}
+        for cell in self.cells():
+            group = tuple(cell[position] for position in positions)
+            totals = groups.get(group)
+            if totals is None:
+                totals = groups[group] = [0, _ZERO]
+            totals[0] += cell[3]
+            totals[1] = EXACT_CONTEXT.add(totals[1], cell[4])
+        return [
+            {**{dimension: self._label(value) for dimension, value in zip(dimensions, group)},
+             "count": count, "amount": amount}
+            for group, (count, amount) in groups.items()
+        ]
+
+    @staticmethod
+    def _label(value: Any) -> Any:
+        return value.isoformat() if isinstance(value, date) else value.value
+
+    def amounts_by_date(self) -> Dict[Tuple[Currency, int], Decimal]:
+        amounts: Dict[Tuple[Currency, int], Decimal] = {}
+        for (ordinal, currency, _), (_, amount) in self._cells.items():
+            key = (currency, ordinal)
+            amounts[key] = EXACT_CONTEXT.add(amounts.get(key, _ZERO), amount)
+        return amounts
+
+    def to_state(self) -> List[List[Any]]:
+        return [[day.isoformat(), currency.value, status.value, count, str(amount)]
+                for day, currency, status, count, amount in self.cells()]
+
+    @classmethod
+    def from_state(cls, state: List[List[Any]]) -> "RollupCube":
+        cube = cls()
+        for day, currency, status, count, amount in state:
+            key = (date.fromisoformat(day).toordinal(), Currency(currency), TransactionStatus(status))
+            cube.add_cell(key, count, Decimal(amount))
+        return cube
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": ROLLUP_VERSION, "cells": self.to_state()}, f)
+        os.replace(temp_path, path)
+        logger.info(f"Rollup saved: {path} ({len(self):,} cells)")
+
+    @classmethod
+    def load(cls, path: Path) -> "RollupCube":
+        # Reads files written by save() and rollup JSON reports alike
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != ROLLUP_VERSION:
+            raise ValueError(f"{path}: unsupported rollup version {data.get('version')}")
+        return cls.from_state(data["cells"])
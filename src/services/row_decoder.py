@@ -0,0 +1,29 @@
+from typing import Callable, List, Sequence
+
+# Use absolute imports
+from models.transaction import RawTransaction
+
+RowDecoder = Callable[[List[str]], RawTransaction]
+
+
+def compile_row_decoder(field_indices: Sequence[int]) -> RowDecoder:
+    # field_indices holds the column of each RawTransaction field in
+    # declaration order, -1 for a field the file does not have. The generated
+    # function reads columns by position; only rows shorter than the widest
+    # mapped column take the bounds-checked branch.
+    present = [index for index in field_indices if index >= 0]
+    width = max(present) + 1 if present else 0
+
+    full_args = ", ".join(f"row[{i}]" if i >= 0 else "None" for i in field_indices)
+    short_args = ", ".join(f"row[{i}] if length > {i} else None" if i >= 0 else "None" for i in field_indices)
+
+    source = (
+        "def decode(row):\n"
+        f"    length = len(row)\n"
+        f"    if length >= {width}:\n"
+        f"        return RawTransaction({full_args})\n"
+        f"    return RawTransaction({short_args})\n"
+    )
+    namespace = {"RawTransaction": RawTransaction}
+    exec(compile(source, f"<row decoder {tuple(field_indices)}>", "exec"), namespace)
+    return namespace["decode"]
@@ -0,0 +1,208 @@
+import json
+import sqlite3
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Use absolute imports
+from models.transaction import Transaction
+from constants.error_codes import describe_errors
+from services.transaction_store import (
+    AMOUNT_SCALE, CURRENCY_VALUES, STATUS_VALUES, EncodedRow, encode_row
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_DATABASE_NAME = "transactions.db"
+
+# Transaction columns shared by every row table. amount is decimal text
+# normalized to cents ("1200.5" is stored as "1200.50", as the store reads
+# it back), or the exact text of amounts that do not fit in hundredths;
+# amount_minor is the same amount in hundredths as an INTEGER, for exact
+# sums and comparisons, or NULL when it does not fit.
+_TRANSACTION_COLUMNS = (
+    "transaction_id TEXT NOT NULL, customer_id TEXT NOT NULL, date TEXT NOT NULL, "
+    "amount TEXT NOT NULL, amount_minor INTEGER, currency TEXT NOT NULL, status TEXT NOT NULL"
+)
+
+_TABLES = {
+    "runs": (
+        "run_id INTEGER PRIMARY KEY, created_at TEXT NOT NULL, source TEXT, "
+        "total_processed INTEGER NOT NULL, valid_count INTEGER NOT NULL, invalid_count INTEGER NOT NULL, "
+        "duplicate_count INTEGER NOT NULL, near_duplicate_count INTEGER, row_count INTEGER NOT NULL, "
+        "summary TEXT NOT NULL"
+    ),
+    "valid_transactions": f"run_id INTEGER NOT NULL, {_TRANSACTION_COLUMNS}",
+    "invalid_transactions": f"run_id INTEGER NOT NULL, {_TRANSACTION_COLUMNS}, "
+                            "error_codes INTEGER NOT NULL, errors TEXT NOT NULL",
+    "duplicate_transactions": f"run_id INTEGER NOT NULL, {_TRANSACTION_COLUMNS}",
+    "near_duplicate_transactions": f"run_id INTEGER NOT NULL, {_TRANSACTION_COLUMNS}, "
+                                   "matched_transaction_id TEXT NOT NULL, matched_date TEXT NOT NULL, "
+                                   "days_apart INTEGER NOT NULL",
+}
+
+_INDEXES = {
+    "valid_transactions_run": "valid_transactions (run_id)",
+    "valid_transactions_id": "valid_transactions (transaction_id)",
+    "valid_transactions_customer_date": "valid_transactions (customer_id, date)",
+    "valid_transactions_date": "valid_transactions (date)",
+    "invalid_transactions_run": "invalid_transactions (run_id)",
+    "invalid_transactions_id": "invalid_transactions (transaction_id)",
+    "duplicate_transactions_run": "duplicate_transactions (run_id)",
+    "duplicate_transactions_id": "duplicate_transactions (transaction_id)",
+    "near_duplicate_transactions_run": "near_duplicate_transactions (run_id)",
+}
+
+
+
+def _code_case(parameter: str, values) -> str:
+    return f"CASE {parameter} " + " ".join(f"WHEN {code} THEN '{value}'" for code, value in enumerate(values)) + " END"
+
+
+# The transaction columns computed from an EncodedRow bound as ?2..?8 (?1 is
+# the run_id), so rows go from the store's columns to SQLite without Python
+# formatting dates, amounts or codes. 1721424.5 turns a proleptic Gregorian
+# ordinal into the Julian day date() expects.
+_TRANSACTION_VALUES = (
+    "?2, ?3, date(?4 + 1721424.5), "
+    f"COALESCE(?6, printf('%s%d.%0{AMOUNT_SCALE}d', CASE WHEN ?5 < 0 THEN '-' ELSE '' END, "
+    f"abs(?5 / {10 ** AMOUNT_SCALE}), abs(?5 % {10 ** AMOUNT_SCALE}))), "
+    "CASE WHEN ?6 IS NULL THEN ?5 END, "
+    f"{_code_case('?7', CURRENCY_VALUES)}, {_code_case('?8', STATUS_VALUES)}"
+)
+
+
+class SQLiteSink:
+    # Processing results appended to a SQLite database, one run per write().
+    # Each write is one transaction of executemany() calls fed by iterators,
+    # so rows are never collected in memory. When a write brings more rows
+    # than the database holds, the indexes are dropped first and rebuilt
+    # after the load, which is much faster than maintaining them row by row.
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.logger = logging.getLogger(__name__)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Room for index builds to sort in memory
+        self._conn.execute("PRAGMA cache_size=-262144")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self._conn.close()
+            raise ValueError(f"{self.path}: unsupported schema version {version}")
+        for table, columns in _TABLES.items():
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def __enter__(self) -> "SQLiteSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, processor, get_summary: Callable[[], Dict[str, Any]],
+              transactions: Optional[Iterable[Transaction]] = None, source: Optional[str] = None) -> int:
+        # Valid rows come from transactions when given (e.g. a stream), else
+        # from the processor when it retains them. get_summary is called once
+        # they are loaded, as a stream only completes the processor's totals
+        # when it is consumed. Returns the new run_id.
+        start = time.perf_counter()
+        expected_rows = len(processor.invalid_transactions) + len(processor.duplicates) + len(processor.near_duplicates)
+        if transactions is not None:
+            valid_rows: Iterable[EncodedRow] = (encode_row(t) for t in transactions)
+        elif processor.retain_transactions:
+            valid_rows = processor.transactions.iter_encoded_rows()
+            expected_rows += len(processor.transactions)
+        else:
+            self.logger.warning("Valid transactions are not retained, only the summary and rejected rows are written")
+            valid_rows = ()
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Read under the write lock, so a concurrent append cannot grow
+            # the table between the choice and the load
+            existing_rows = self._conn.execute("SELECT COALESCE(SUM(row_count), 0) FROM runs").fetchone()[0]
+            rebuild_indexes = existing_rows == 0 or expected_rows > existing_rows
+            if rebuild_indexes:
+                for name in _INDEXES:
+                    self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+            run_id = self._conn.execute(
+                "INSERT INTO runs (created_at, source, total_processed, valid_count, invalid_count, duplicate_count, "
+                "row_count, summary) VALUES (?, ?, 0, 0, 0, 0, 0, '{}')",
+                (datetime.now().isoformat(), source),
+            ).lastrowid
+
+            counts = {
+                "valid_transactions": self._insert("valid_transactions", 0, run_id, valid_rows),
+                "invalid_transactions": self._insert("invalid_transactions", 2, run_id, self._invalid_rows(processor)),
+                "duplicate_transactions": self._insert(
+                    "duplicate_transactions", 0, run_id, (encode_row(t) for t in processor.duplicates)
+                ),
+                "near_duplicate_transactions": self._insert(
+                    "near_duplicate_transactions", 3, run_id, self._near_duplicate_rows(processor)
+                ),
+            }
+            summary = get_summary()
+            self._conn.execute(
+                "UPDATE runs SET total_processed = ?, valid_count = ?, invalid_count = ?, duplicate_count = ?, "
+                "near_duplicate_count = ?, row_count = ?, summary = ? WHERE run_id = ?",
+                (summary["total_processed"], summary["valid_count"], summary["invalid_count"],
+                 summary["duplicate_count"], summary.get("near_duplicate_count"), sum(counts.values()),
+                 json.dumps(summary, default=str), run_id),
+            )
+
+            index_start = time.perf_counter()
+            for name, target in _INDEXES.items():
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+            index_seconds = time.perf_counter() - index_start
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        seconds = max(time.perf_counter() - start, 1e-9)
+        rows = sum(counts.values())
+        self.logger.info(
+            f"SQLite run {run_id} written to {self.path}: "
+            + ", ".join(f"{count:,} {table}" for table, count in counts.items())
+            + f" in {seconds:.2f}s ({rows / seconds:,.0f} rows/s, indexes "
+            + (f"rebuilt in {index_seconds:.2f}s)" if rebuild_indexes else "maintained)")
+        )
+        return run_id
+
+    def _insert(self, table: str, extra_columns: int, run_id: int, rows: Iterable[Tuple]) -> int:
+        # rows are EncodedRows followed by extra_columns table-specific values
+        extra = "".join(f", ?{9 + i}" for i in range(extra_columns))
+        before = self._conn.total_changes
+        self._conn.executemany(f"INSERT INTO {table} VALUES (?1, {_TRANSACTION_VALUES}{extra})",
+                               ((run_id, *row) for row in rows))
+        return self._conn.total_changes - before
+
+    @staticmethod
+    def _invalid_rows(processor) -> Iterator[Tuple]:
+        # Messages only interpolate the currency and status, so each
+        # combination with the error codes is described and encoded once
+        messages: Dict[Tuple[int, Any, Any], str] = {}
+        for transaction, error_codes in processor.invalid_transactions:
+            key = (error_codes, transaction.currency, transaction.status)
+            errors = messages.get(key)
+            if errors is None:
+                errors = messages[key] = json.dumps(describe_errors(error_codes, transaction.__dict__))
+            yield (*encode_row(transaction), error_codes, errors)
+
+    @staticmethod
+    def _near_duplicate_rows(processor) -> Iterator[Tuple]:
+        for transaction, matched_id, matched_date in processor.near_duplicates:
+            days_apart = abs((transaction.date - matched_date).days)
+            yield (*encode_row(transaction), matched_id, matched_date.isoformat(), days_apart)
+
+    def run_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,82 @@
+from decimal import Context, Decimal, Inexact, MAX_EMAX, MAX_PREC, MIN_EMIN
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Use absolute imports
+from models.transaction import Transaction
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+
+# Additions in this context are exact; losing a digit raises instead of rounding
+EXACT_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN, traps=[Inexact])
+
+_ZERO = Decimal(0)
+
+
+class SummaryAggregates:
+    # Count and exact amount per (currency, status) cell, updated in O(1) per
+    # transaction. There are at most len(Currency) * len(TransactionStatus)
+    # cells, so every total read from them is constant time.
+    def __init__(self):
+        self._cells: Dict[Tuple[Currency, TransactionStatus], List] = {}
+        self.count = 0
+
+    def add(self, transaction: Transaction) -> None:
+        key = (transaction.currency, transaction.status)
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = [0, _ZERO]
+        cell[0] += 1
+        cell[1] = EXACT_CONTEXT.add(cell[1], transaction.amount)
+        self.count += 1
+
+    def add_cell(self, key: Tuple[Currency, TransactionStatus], count: int, amount: Decimal) -> None:
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = [0, _ZERO]
+        cell[0] += count
+        cell[1] = EXACT_CONTEXT.add(cell[1], amount)
+        self.count += count
+
+    def merge(self, other: "SummaryAggregates") -> None:
+        for key, (count, amount) in other._cells.items():
+            self.add_cell(key, count, amount)
+
+    def amount(self, currency: Currency) -> Decimal:
+        total = _ZERO
+        for (cell_currency, _), (_, amount) in self._cells.items():
+            if cell_currency == currency:
+                total = EXACT_CONTEXT.add(total, amount)
+        return total
+
+    def status_count(self, status: TransactionStatus) -> int:
+        return sum(count for (_, cell_status), (count, _) in self._cells.items() if cell_status == status)
+
+    def amounts_by_currency(self) -> Dict[Currency, Decimal]:
+        totals: Dict[Currency, Decimal] = {}
+        for (currency, _), (_, amount) in self._cells.items():
+            totals[currency] = EXACT_CONTEXT.add(totals.get(currency, _ZERO), amount)
+        return {currency: totals[currency] for currency in Currency if currency in totals}
+
+    def cells(self) -> Iterator[Tuple[Currency, TransactionStatus, int, Decimal]]:
+        for currency in Currency:
+            for status in TransactionStatus:
+                cell = self._cells.get((currency, status))
+                if cell is not None:
+                    yield currency, status, cell[0], cell[1]
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {"currency": currency.value, "status": status.value, "count": count, "amount": amount}
+            for currency, status, count, amount in self.cells()
+        ]
+
+    def to_state(self) -> List[List[Any]]:
+        return [[currency.value, status.value, count, str(amount)] for currency, status, count, amount in self.cells()]
+
+    @classmethod
+    def from_state(cls, state: List[List[Any]]) -> "SummaryAggregates":
+        aggregates = cls()
+        for currency, status, count, amount in state:
+            aggregates._cells[(Currency(currency), TransactionStatus(status))] = [count, Decimal(amount)]
+            aggregates.count += count
+        return aggregates
@@ -0,0 +1,75 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TransactionIndex:
+    # Secondary indexes over TransactionStore row numbers: customer id -> rows,
+    # distinct date ordinals kept sorted for binary search with the rows of
+    # each date, and one bitmap per currency and status code. Row lists are in
+    # insertion order, so results keep it. Appending a row does not touch the
+    # index; update() indexes every row appended since the last call at once.
+    def __init__(self, currency_count: int, status_count: int):
+        self.customer_rows: Dict[str, array] = {}
+        self.date_rows: Dict[int, array] = {}
+        self.sorted_ordinals: List[int] = []
+        self.currency_bitmaps = [bytearray() for _ in range(currency_count)]
+        self.status_bitmaps = [bytearray() for _ in range(status_count)]
+        self.rows = 0
+
+    def update(self, customer_ids: List[str], ordinals: array, currency_codes: array, status_codes: array) -> None:
+        # Indexes the rows of the columns from self.rows on, column-wise: rows
+        # are grouped by a stable sort of their factorized keys, and each
+        # group is appended to its key's row list.
+        start, end = self.rows, len(customer_ids)
+        if start >= end:
+            return
+        for keys, target in ((np.asarray(customer_ids[start:], dtype=object), self.customer_rows),
+                             (np.frombuffer(ordinals, dtype=np.int32)[start:], self.date_rows)):
+            codes, uniques = pd.factorize(keys)
+            order = (np.argsort(codes, kind="stable") + start).astype(np.int32).tobytes()
+            ends = (np.cumsum(np.bincount(codes, minlength=len(uniques))) * 4).tolist()
+            for key, group_start, group_end in zip(uniques.tolist(), [0] + ends, ends):
+                rows = target.get(key)
+                if rows is None:
+                    target[key] = array('i', order[group_start:group_end])
+                else:
+                    rows.frombytes(order[group_start:group_end])
+        if len(self.sorted_ordinals) != len(self.date_rows):
+            self.sorted_ordinals = sorted(self.date_rows)
+        # Bitmaps are rewritten from the byte holding the first new row
+        first_byte = start >> 3
+        for bitmaps, column in ((self.currency_bitmaps, currency_codes), (self.status_bitmaps, status_codes)):
+            tail = np.frombuffer(column, dtype=np.int8)[first_byte << 3:end]
+            for code, bitmap in enumerate(bitmaps):
+                bitmap[first_byte:] = np.packbits(tail == code, bitorder="little").tobytes()
+        self.rows = end
+
+    def rows_for_customer(self, customer_id: str) -> np.ndarray:
+        rows = self.customer_rows.get(customer_id)
+        return np.array(rows, dtype=np.int32) if rows else np.zeros(0, dtype=np.int32)
+
+    def rows_for_dates(self, start: Optional[date], end: Optional[date]) -> np.ndarray:
+        lo = 0 if start is None else bisect_left(self.sorted_ordinals, start.toordinal())
+        hi = len(self.sorted_ordinals) if end is None else bisect_right(self.sorted_ordinals, end.toordinal())
+        # Views: concatenate copies them
+        parts = [np.frombuffer(self.date_rows[ordinal], dtype=np.int32) for ordinal in self.sorted_ordinals[lo:hi]]
+        if not parts:
+            return np.zeros(0, dtype=np.int32)
+        # Dates interleave in the file, so restore insertion order
+        return np.sort(np.concatenate(parts), kind="stable")
+
+    def rows_for_codes(self, currency_code: Optional[int], status_code: Optional[int]) -> np.ndarray:
+        # The packed bitmaps are ANDed before the one unpacking
+        packed = None
+        for bitmaps, code in ((self.currency_bitmaps, currency_code), (self.status_bitmaps, status_code)):
+            if code is not None:
+                bits = np.frombuffer(bitmaps[code], dtype=np.uint8)
+                packed = bits if packed is None else packed & bits
+        if packed is None:
+            return np.arange(self.rows)
+        return np.flatnonzero(np.unpackbits(packed, count=self.rows, bitorder="little"))
@@ -1,81 +1,303 @@
+from datetime import date
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 # Use absolute imports
 from models.transaction import Transaction, ProcessedTransaction
 from constants.status import TransactionStatus
 from constants.currencies import Currency
+from constants.error_codes import ERROR_CODES, ErrorCode, count_error_codes, describe_errors
+from services.summary_aggregates import SummaryAggregates
+from services.rollup_cube import RollupCube, column_cells
+from services.transaction_store import TransactionStore
+from utils.sequence_view import MappedSequenceView, SequenceView
+from utils.spill_list import SpillList
+from utils.binary_blocks import pack_blocks, pack_json, pack_strings, unpack_blocks, unpack_json, unpack_strings
 
 class TransactionProcessor:
-    def __init__(self):
-        self.transactions: List[Transaction] = []
-        self.duplicates: List[Transaction] = []
-        self.invalid_transactions: List[Dict[str, Any]] = []
+    def __init__(self, retain_transactions: bool = True):
+        # With retain_transactions=False valid rows are only folded into running
+        # totals, which keeps memory flat when they are streamed to a report.
+        self.retain_transactions = retain_transactions
+        self.transactions = TransactionStore()
+        # Rejected rows are listed in the reports whether or not valid rows are
+        # retained; without retention they spill to a temporary file past a
+        # small buffer, so dirty input grows disk use rather than memory.
+        rejected = list if retain_transactions else SpillList
+        self.duplicates: Sequence[Transaction] = rejected()
+        # Invalid rows with their ErrorCode bits; messages are built when read
+        self.invalid_transactions: Sequence[Tuple[Transaction, int]] = rejected()
+        # Rows per error code, counted over exactly the rows reported in
+        # invalid_transactions
+        self.error_histogram: Dict[ErrorCode, int] = {}
+        # Ids of retained and duplicate transactions, kept in step with the lists
+        self._transaction_ids = set()
+        self._duplicate_ids = set()
+        # Running exact totals per currency and status, whether or not rows are retained
+        self.valid_totals = SummaryAggregates()
+        self.duplicate_totals = SummaryAggregates()
+        self.invalid_totals = SummaryAggregates()
+        # Valid transactions per date, currency and status, for reports by day
+        # and conversion at the transaction date without revisiting the rows
+        self.valid_rollup = RollupCube()
+        # Valid rows repeating an earlier row's customer, currency and amount
+        # within near_duplicate_window days under another id, with the id and
+        # date of the row they repeat. The window is None when not checked.
+        self.near_duplicate_window: Optional[int] = None
+        self.near_duplicates: Sequence[Tuple[Transaction, str, date]] = rejected()
     
     def add_transaction(self, transaction: Transaction) -> bool:
         if self._is_duplicate(transaction):
-            self.duplicates.append(transaction)
+            self.add_duplicate_transaction(transaction)
             return False
-        self.transactions.append(transaction)
+        if self.retain_transactions:
+            self.transactions.append(transaction)
+            self._transaction_ids.add(transaction.transaction_id)
+        self.valid_totals.add(transaction)
+        self.valid_rollup.add(transaction)
         return True
     
-    def add_invalid_transaction(self, transaction: Transaction, errors: List[str]) -> None:
-        self.invalid_transactions.append({
+    def add_transaction_columns(self, columns: Mapping[str, Tuple[np.ndarray, np.ndarray]]) -> None:
+        # add_transaction for rows given as factorized columns, as
+        # ColumnarDataCleaner builds them, whose ids are new to this processor:
+        # the store takes them column-wise and totals are added per cell
+        if self.retain_transactions:
+            start = len(self.transactions)
+            self.transactions.extend_columns(columns)
+            self._transaction_ids.update(self.transactions.transaction_ids[start:])
+        for key, count, amount in column_cells(columns):
+            self.valid_rollup.add_cell(key, count, amount)
+            self.valid_totals.add_cell(key[1:], count, amount)
+    
+    def update_index(self) -> None:
+        # Called once per ingested chunk, so queries find the index built
+        self.transactions.update_index()
+    
+    def add_duplicate_transaction(self, transaction: Transaction) -> None:
+        self.duplicates.append(transaction)
+        # Valid ids are not tracked without retention either, so neither set grows
+        if self.retain_transactions:
+            self._duplicate_ids.add(transaction.transaction_id)
+        self.duplicate_totals.add(transaction)
+    
+    def merge(self, other: 'TransactionProcessor') -> None:
+        if other.retain_transactions:
+            for transaction in other.transactions:
+                self.add_transaction(transaction)
+            self.update_index()
+        else:
+            self.valid_totals.merge(other.valid_totals)
+            self.valid_rollup.merge(other.valid_rollup)
+        for transaction in other.duplicates:
+            self.add_duplicate_transaction(transaction)
+        self.invalid_transactions.extend(other.invalid_transactions)
+        self.invalid_totals.merge(other.invalid_totals)
+        for code, count in other.error_histogram.items():
+            self.error_histogram[code] = self.error_histogram.get(code, 0) + count
+        if other.near_duplicate_window is not None:
+            self.near_duplicate_window = other.near_duplicate_window
+        self.near_duplicates.extend(other.near_duplicates)
+    
+    def add_invalid_transaction(self, transaction: Transaction, error_codes: int) -> None:
+        # The histogram counts the rows of the invalid list, so the two always agree
+        self.invalid_transactions.append((transaction, error_codes))
+        self.invalid_totals.add(transaction)
+        count_error_codes(self.error_histogram, error_codes)
+    
+    def add_near_duplicate(self, transaction: Transaction, matched_id: str, matched_date: date) -> None:
+        # Suspects stay valid; they are only listed for review
+        self.near_duplicates.append((transaction, matched_id, matched_date))
+    
+    @staticmethod
+    def _invalid_record(entry: Tuple[Transaction, int]) -> Dict[str, Any]:
+        transaction, error_codes = entry
+        return {"transaction": transaction.to_dict(), "errors": describe_errors(error_codes, transaction.__dict__)}
+    
+    @staticmethod
+    def _near_duplicate_record(entry: Tuple[Transaction, str, date]) -> Dict[str, Any]:
+        transaction, matched_id, matched_date = entry
+        return {
             "transaction": transaction.to_dict(),
-            "errors": errors
-        })
+            "matched_transaction_id": matched_id,
+            "matched_date": matched_date.isoformat(),
+            "days_apart": abs((transaction.date - matched_date).days),
+        }
     
     def _is_duplicate(self, transaction: Transaction) -> bool:
-        existing_ids = {t.transaction_id for t in self.transactions}
-        duplicate_ids = {t.transaction_id for t in self.duplicates}
-        return (transaction.transaction_id in existing_ids or 
-                transaction.transaction_id in duplicate_ids)
+        return (transaction.transaction_id in self._transaction_ids or
+                transaction.transaction_id in self._duplicate_ids)
+    
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "retain_transactions": self.retain_transactions,
+            "transactions": [self._transaction_state(t) for t in self.transactions],
+            "duplicates": [self._transaction_state(t) for t in self.duplicates],
+            "invalid_transactions": [[self._transaction_state(t), codes] for t, codes in self.invalid_transactions],
+            "error_histogram": [[code.name, count] for code, count in self.error_histogram.items()],
+            "valid_totals": self.valid_totals.to_state(),
+            "duplicate_totals": self.duplicate_totals.to_state(),
+            "invalid_totals": self.invalid_totals.to_state(),
+            "valid_rollup": self.valid_rollup.to_state(),
+            "near_duplicate_window": self.near_duplicate_window,
+            "near_duplicates": [
+                [self._transaction_state(t), matched_id, matched_date.isoformat()]
+                for t, matched_id, matched_date in self.near_duplicates
+            ],
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'TransactionProcessor':
+        processor = cls(retain_transactions=state["retain_transactions"])
+        processor.transactions.extend(cls._transaction_from_state(t) for t in state["transactions"])
+        processor.duplicates = [cls._transaction_from_state(t) for t in state["duplicates"]]
+        processor._transaction_ids = {t.transaction_id for t in processor.transactions}
+        processor._duplicate_ids = {t.transaction_id for t in processor.duplicates}
+        processor.invalid_transactions = [
+            (cls._transaction_from_state(t), codes) for t, codes in state["invalid_transactions"]
+        ]
+        processor.error_histogram = {ErrorCode[name]: count for name, count in state["error_histogram"]}
+        processor.valid_totals = SummaryAggregates.from_state(state["valid_totals"])
+        processor.duplicate_totals = SummaryAggregates.from_state(state["duplicate_totals"])
+        processor.invalid_totals = SummaryAggregates.from_state(state["invalid_totals"])
+        processor.valid_rollup = RollupCube.from_state(state["valid_rollup"])
+        processor.near_duplicate_window = state["near_duplicate_window"]
+        processor.near_duplicates = [
+            (cls._transaction_from_state(t), matched_id, date.fromisoformat(matched_date))
+            for t, matched_id, matched_date in state["near_duplicates"]
+        ]
+        return processor
     
-    def get_valid_transactions(self) -> List[Transaction]:
-        return self.transactions.copy()
+    def to_bytes(self) -> bytes:
+        # Same content as to_state in a binary form that loads much faster:
+        # every transaction list is written as TransactionStore columns
+        rejected = [TransactionStore(indexed=False) for _ in range(3)]
+        rejected[0].extend(self.duplicates)
+        rejected[1].extend(t for t, _ in self.invalid_transactions)
+        rejected[2].extend(t for t, _, _ in self.near_duplicates)
+        meta = {
+            "retain_transactions": self.retain_transactions,
+            "invalid_error_codes": [codes for _, codes in self.invalid_transactions],
+            "error_histogram": [[code.name, count] for code, count in self.error_histogram.items()],
+            "valid_totals": self.valid_totals.to_state(),
+            "duplicate_totals": self.duplicate_totals.to_state(),
+            "invalid_totals": self.invalid_totals.to_state(),
+            "valid_rollup": self.valid_rollup.to_state(),
+            "near_duplicate_window": self.near_duplicate_window,
+            "near_duplicate_dates": [matched_date.toordinal() for _, _, matched_date in self.near_duplicates],
+        }
+        return pack_blocks([
+            pack_json(meta),
+            pack_strings([matched_id for _, matched_id, _ in self.near_duplicates]),
+            self.transactions.to_bytes(),
+            *(store.to_bytes() for store in rejected),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TransactionProcessor':
+        meta, matched_ids, transactions, duplicates, invalid, near_duplicates = unpack_blocks(data)
+        meta = unpack_json(meta)
+        processor = cls(retain_transactions=meta["retain_transactions"])
+        processor.transactions = TransactionStore.from_bytes(transactions)
+        processor.duplicates = list(TransactionStore.from_bytes(duplicates))
+        processor._transaction_ids = set(processor.transactions.transaction_ids)
+        processor._duplicate_ids = {t.transaction_id for t in processor.duplicates}
+        invalid = TransactionStore.from_bytes(invalid)
+        _check_length("invalid error codes", meta["invalid_error_codes"], len(invalid))
+        processor.invalid_transactions = list(zip(invalid, meta["invalid_error_codes"]))
+        processor.error_histogram = {ErrorCode[name]: count for name, count in meta["error_histogram"]}
+        processor.valid_totals = SummaryAggregates.from_state(meta["valid_totals"])
+        processor.duplicate_totals = SummaryAggregates.from_state(meta["duplicate_totals"])
+        processor.invalid_totals = SummaryAggregates.from_state(meta["invalid_totals"])
+        processor.valid_rollup = RollupCube.from_state(meta["valid_rollup"])
+        processor.near_duplicate_window = meta["near_duplicate_window"]
+        near_duplicate_dates = meta["near_duplicate_dates"]
+        near_duplicates = TransactionStore.from_bytes(near_duplicates)
+        _check_length("near-duplicate dates", near_duplicate_dates, len(near_duplicates))
+        processor.near_duplicates = list(zip(
+            near_duplicates,
+            unpack_strings(matched_ids, len(near_duplicate_dates)),
+            map(date.fromordinal, near_duplicate_dates),
+        ))
+        return processor
+    
+    @staticmethod
+    def _transaction_state(transaction: Transaction) -> Dict[str, Any]:
+        # Unlike to_dict the amount is kept as a string so it round-trips exactly
+        state = transaction.to_dict()
+        state["amount"] = str(transaction.amount)
+        return state
+    
+    @staticmethod
+    def _transaction_from_state(state: Dict[str, Any]) -> Transaction:
+        return Transaction(
+            transaction_id=state["transaction_id"],
+            customer_id=state["customer_id"],
+            date=date.fromisoformat(state["date"]),
+            amount=Decimal(state["amount"]),
+            currency=Currency(state["currency"]),
+            status=TransactionStatus(state["status"]),
+            validation_errors=state["validation_errors"],
+        )
+    
+    def has_transaction_id(self, transaction_id: str) -> bool:
+        return transaction_id in self._transaction_ids
+    
+    def get_valid_transactions(self) -> Sequence[Transaction]:
+        return SequenceView(self.transactions)
+    
+    def iter_valid_dicts(self) -> Iterator[Dict[str, Any]]:
+        return self.transactions.iter_dicts()
     
-    def get_invalid_transactions(self) -> List[Dict[str, Any]]:
-        return self.invalid_transactions.copy()
+    def query(self, customer_id: Optional[str] = None, start_date: Optional[date] = None,
+              end_date: Optional[date] = None, status: Union[TransactionStatus, str, None] = None,
+              currency: Union[Currency, str, None] = None, limit: Optional[int] = None) -> List[Transaction]:
+        # Valid transactions matching every given predicate, in insertion order;
+        # start_date and end_date are inclusive.
+        if not self.retain_transactions:
+            raise ValueError("query needs retain_transactions=True")
+        return self.transactions.query(customer_id=customer_id, start_date=start_date, end_date=end_date,
+                                       status=status, currency=currency, limit=limit)
     
-    def get_duplicate_transactions(self) -> List[Transaction]:
-        return self.duplicates.copy()
+    def get_invalid_transactions(self) -> Sequence[Dict[str, Any]]:
+        return MappedSequenceView(self.invalid_transactions, self._invalid_record)
+    
+    def get_duplicate_transactions(self) -> Sequence[Transaction]:
+        return SequenceView(self.duplicates)
+    
+    def get_near_duplicates(self) -> Sequence[Dict[str, Any]]:
+        return MappedSequenceView(self.near_duplicates, self._near_duplicate_record)
     
     def get_summary_statistics(self) -> Dict[str, Any]:
-        if not self.transactions:
-            return {
-                "total_processed": len(self.invalid_transactions) + len(self.duplicates),
-                "valid_count": 0,
-                "invalid_count": len(self.invalid_transactions),
-                "duplicate_count": len(self.duplicates),
-                "total_amount_usd": 0.0,
-                "total_amount_eur": 0.0,
-                "completed_count": 0,
-                "failed_count": 0,
-                "pending_count": 0,
-                "cancelled_count": 0,
-            }
-        
-        total_amount_usd = sum(float(t.amount) for t in self.transactions if t.currency == Currency.USD)
-        total_amount_eur = sum(float(t.amount) for t in self.transactions if t.currency == Currency.EUR)
-        
-        status_counts = {
-            TransactionStatus.COMPLETED: 0,
-            TransactionStatus.FAILED: 0,
-            TransactionStatus.PENDING: 0,
-            TransactionStatus.CANCELLED: 0
-        }
-        for t in self.transactions:
-            status_counts[t.status] = status_counts.get(t.status, 0) + 1
-        
-        return {
-            "total_processed": len(self.transactions) + len(self.invalid_transactions) + len(self.duplicates),
-            "valid_count": len(self.transactions),
+        valid = self.valid_totals
+        stats = {
+            "total_processed": valid.count + len(self.invalid_transactions) + len(self.duplicates),
+            "valid_count": valid.count,
             "invalid_count": len(self.invalid_transactions),
             "duplicate_count": len(self.duplicates),
-            "total_amount_usd": total_amount_usd,
-            "total_amount_eur": total_amount_eur,
-            "completed_count": status_counts[TransactionStatus.COMPLETED],
-            "failed_count": status_counts[TransactionStatus.FAILED],
-            "pending_count": status_counts[TransactionStatus.PENDING],
-            "cancelled_count": status_counts[TransactionStatus.CANCELLED],
-        }
\ No newline at end of file
+            "total_amount_usd": float(valid.amount(Currency.USD)),
+            "total_amount_eur": float(valid.amount(Currency.EUR)),
+            "completed_count": valid.status_count(TransactionStatus.COMPLETED),
+            "failed_count": valid.status_count(TransactionStatus.FAILED),
+            "pending_count": valid.status_count(TransactionStatus.PENDING),
+            "cancelled_count": valid.status_count(TransactionStatus.CANCELLED),
+            "amount_by_currency": {currency.value: amount for currency, amount in valid.amounts_by_currency().items()},
+            "breakdown": {
+                "valid": valid.to_dict(),
+                "duplicate": self.duplicate_totals.to_dict(),
+                "invalid": self.invalid_totals.to_dict(),
+            },
+            "error_histogram": {
+                code.name.lower(): self.error_histogram[code] for code in ERROR_CODES if code in self.error_histogram
+            },
+        }
+        if self.near_duplicate_window is not None:
+            stats["near_duplicate_count"] = len(self.near_duplicates)
+            stats["near_duplicate_window_days"] = self.near_duplicate_window
+        return stats
+
+
+def _check_length(name: str, values: List[Any], expected: int) -> None:
+    if len(values) != expected:
+        raise ValueError(f"expected {expected} {name}, found {len(values)}")
@@ -0,0 +1,328 @@
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+# Use absolute imports
+from models.transaction import Transaction
+from services.transaction_index import TransactionIndex
+from utils.gc_pause import gc_paused
+from utils.binary_blocks import pack_blocks, pack_json, pack_strings, unpack_blocks, unpack_json, unpack_strings
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+
+AMOUNT_SCALE = 2
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+_CURRENCIES = list(Currency)
+_STATUSES = list(TransactionStatus)
+_CURRENCY_CODES = {currency: code for code, currency in enumerate(_CURRENCIES)}
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+# The values behind the one-byte codes, in code order
+CURRENCY_VALUES = [currency.value for currency in _CURRENCIES]
+STATUS_VALUES = [status.value for status in _STATUSES]
+
+# (id, customer id, date ordinal, minor units, exact amount text or None,
+# currency code, status code). The text is only set for amounts that do not
+# fit in minor units, whose minor units are then 0.
+EncodedRow = Tuple[str, str, int, int, Optional[str], int, int]
+
+
+def minor_units(amount: Decimal) -> Optional[int]:
+    # The amount in int64 units of 10**-AMOUNT_SCALE, or None when it does not fit exactly
+    # The exact ratio is one C call and raises for NaN and infinities;
+    # Decimal comparisons would cost more than the rest of an append
+    try:
+        value, denominator = amount.scaleb(AMOUNT_SCALE).as_integer_ratio()
+    except (OverflowError, ValueError):
+        return None
+    if denominator == 1 and _INT64_MIN <= value <= _INT64_MAX:
+        return value
+    return None
+
+
+def encode_row(transaction: Transaction) -> EncodedRow:
+    # The row TransactionStore.iter_encoded_rows gives for this transaction once stored
+    minor = minor_units(Decimal(transaction.amount))
+    return (transaction.transaction_id, transaction.customer_id, transaction.date.toordinal(),
+            minor or 0, str(transaction.amount) if minor is None else None,
+            _CURRENCY_CODES[transaction.currency], _STATUS_CODES[transaction.status])
+
+
+def _distinct(values: np.ndarray, convert, dtype=object) -> np.ndarray:
+    # convert applied to each distinct value; missing values, which rows
+    # stored here never use, become 0
+    if dtype is object:
+        converted = np.empty(len(values), dtype=object)
+        converted[:] = [None if value is None else convert(value) for value in values]
+        return converted
+    return np.array([0 if value is None else convert(value) for value in values], dtype=dtype)
+
+
+class TransactionStore(Sequence):
+    # Valid transactions kept column by column: id strings, date ordinals,
+    # amounts in int64 minor units and one-byte currency/status codes.
+    # Customer ids are interned; transaction ids are unique, so interning them
+    # would only add an intern table entry. Transaction objects are built when
+    # a row is read and are snapshots: changing one does not change the store.
+    # The query index is maintained during ingestion: extend() and
+    # update_index() index the rows appended since the last update in one
+    # column-wise pass, so a caller that updates once per ingested chunk
+    # leaves queries nothing to build. Rows appended one at a time are only
+    # picked up by the next update, or by the next query if none comes.
+    # Stores used only as compact row lists skip it (indexed=False).
+    def __init__(self, indexed: bool = True):
+        self.transaction_ids: List[str] = []
+        self.customer_ids: List[str] = []
+        self.date_ordinals = array('i')
+        self.amounts = array('q')
+        self.currency_codes = array('b')
+        self.status_codes = array('b')
+        # Amounts with more than AMOUNT_SCALE decimals or beyond int64, by row
+        self.amount_overflow: Dict[int, Decimal] = {}
+        self._dates: Dict[int, date] = {}
+        self._iso_dates: Dict[int, str] = {}
+        self._index = TransactionIndex(len(_CURRENCIES), len(_STATUSES)) if indexed else None
+
+    def append(self, transaction: Transaction) -> None:
+        row = len(self.transaction_ids)
+        amount = Decimal(transaction.amount)
+        minor = minor_units(amount)
+        if minor is not None:
+            self.amounts.append(minor)
+        else:
+            self.amounts.append(0)
+            self.amount_overflow[row] = amount
+
+        self.transaction_ids.append(transaction.transaction_id)
+        self.customer_ids.append(sys.intern(transaction.customer_id))
+        self.date_ordinals.append(transaction.date.toordinal())
+        self.currency_codes.append(_CURRENCY_CODES[transaction.currency])
+        self.status_codes.append(_STATUS_CODES[transaction.status])
+
+    def extend(self, transactions) -> None:
+        for transaction in transactions:
+            self.append(transaction)
+        self.update_index()
+
+    def extend_columns(self, columns: Mapping[str, Tuple[np.ndarray, np.ndarray]]) -> None:
+        # extend() for rows given as factorized columns, as ColumnarDataCleaner
+        # builds them: each field maps to one code per row into an object array
+        # of distinct values. Every distinct value is converted once and the
+        # stored columns are gathered with NumPy takes, so no Transaction is
+        # built. Rows must have every field, as valid rows do.
+        start = len(self)
+        keys, values = columns["transaction_id"]
+        self.transaction_ids.extend(values[keys].tolist())
+        keys, values = columns["customer_id"]
+        self.customer_ids.extend(_distinct(values, sys.intern)[keys].tolist())
+        keys, values = columns["date"]
+        self.date_ordinals.frombytes(_distinct(values, date.toordinal, np.int32)[keys].tobytes())
+        keys, values = columns["currency"]
+        self.currency_codes.frombytes(_distinct(values, _CURRENCY_CODES.get, np.int8)[keys].tobytes())
+        keys, values = columns["status"]
+        self.status_codes.frombytes(_distinct(values, _STATUS_CODES.get, np.int8)[keys].tobytes())
+
+        keys, values = columns["amount"]
+        minor = [None if amount is None else minor_units(amount) for amount in values]
+        overflowing = np.array([units is None for units in minor], dtype=bool)[keys]
+        self.amounts.frombytes(np.array([units or 0 for units in minor], dtype=np.int64)[keys].tobytes())
+        for row in np.flatnonzero(overflowing).tolist():
+            self.amount_overflow[start + row] = values[keys[row]]
+        self.update_index()
+
+    def update_index(self) -> None:
+        if self._index is not None and self._index.rows < len(self):
+            self._index.update(self.customer_ids, self.date_ordinals, self.currency_codes, self.status_codes)
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+    @property
+    def index(self) -> Optional[TransactionIndex]:
+        self.update_index()
+        return self._index
+
+    def to_bytes(self) -> bytes:
+        # The columns as they are held, for from_bytes; the index is rebuilt on load
+        overflow = {str(row): str(amount) for row, amount in self.amount_overflow.items()}
+        return pack_blocks([
+            pack_json({"rows": len(self), "indexed": self._index is not None, "amount_overflow": overflow}),
+            pack_strings(self.transaction_ids),
+            pack_strings(self.customer_ids),
+            self.date_ordinals.tobytes(),
+            self.amounts.tobytes(),
+            self.currency_codes.tobytes(),
+            self.status_codes.tobytes(),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TransactionStore':
+        meta, transaction_ids, customer_ids, *columns = unpack_blocks(data)
+        meta = unpack_json(meta)
+        rows = meta["rows"]
+        store = cls(indexed=meta["indexed"])
+        store.transaction_ids = unpack_strings(transaction_ids, rows)
+        store.customer_ids = [sys.intern(customer_id) for customer_id in unpack_strings(customer_ids, rows)]
+        for column, block in zip((store.date_ordinals, store.amounts, store.currency_codes, store.status_codes),
+                                 columns):
+            column.frombytes(block)
+            if len(column) != rows:
+                raise ValueError(f"expected {rows} values, found {len(column)}")
+        store.amount_overflow = {int(row): Decimal(amount) for row, amount in meta["amount_overflow"].items()}
+        store.update_index()
+        return store
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._rows(np.arange(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for index in range(len(self)):
+            yield self._row(index)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (TransactionStore, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def amount(self, index: int) -> Decimal:
+        overflow = self.amount_overflow.get(index)
+        if overflow is not None:
+            return overflow
+        return Decimal(self.amounts[index]).scaleb(-AMOUNT_SCALE)
+
+    def _date(self, ordinal: int) -> date:
+        value = self._dates.get(ordinal)
+        if value is None:
+            value = self._dates[ordinal] = date.fromordinal(ordinal)
+        return value
+
+    def _row(self, index: int) -> Transaction:
+        return Transaction(
+            transaction_id=self.transaction_ids[index],
+            customer_id=self.customer_ids[index],
+            date=self._date(self.date_ordinals[index]),
+            amount=self.amount(index),
+            currency=_CURRENCIES[self.currency_codes[index]],
+            status=_STATUSES[self.status_codes[index]],
+        )
+
+    def _rows(self, rows: np.ndarray) -> List[Transaction]:
+        # _row for many rows, gathering each column in one NumPy take
+        columns = zip(rows.tolist(),
+                      np.frombuffer(self.date_ordinals, dtype=np.int32)[rows].tolist(),
+                      np.frombuffer(self.amounts, dtype=np.int64)[rows].tolist(),
+                      np.frombuffer(self.currency_codes, dtype=np.int8)[rows].tolist(),
+                      np.frombuffer(self.status_codes, dtype=np.int8)[rows].tolist())
+        transaction_ids, customer_ids, overflow = self.transaction_ids, self.customer_ids, self.amount_overflow
+        dates, scale = self._dates, -AMOUNT_SCALE
+        transactions = []
+        # Positional arguments, in field order: keywords cost more than the rest of the row
+        with gc_paused():
+            for row, ordinal, minor, currency, status in columns:
+                amount = overflow.get(row)
+                transactions.append(Transaction(
+                    transaction_ids[row], customer_ids[row], dates.get(ordinal) or self._date(ordinal),
+                    Decimal(minor).scaleb(scale) if amount is None else amount,
+                    _CURRENCIES[currency], _STATUSES[status],
+                ))
+        return transactions
+
+    def iter_encoded_rows(self) -> Iterator[EncodedRow]:
+        # One EncodedRow per row, zipped straight from the columns so that
+        # without overflowing amounts no Python code runs per row
+        rows = zip(self.transaction_ids, self.customer_ids, self.date_ordinals, self.amounts,
+                   repeat(None), self.currency_codes, self.status_codes)
+        if not self.amount_overflow:
+            return rows
+        return self._with_overflow(rows)
+
+    def _with_overflow(self, rows: Iterator[EncodedRow]) -> Iterator[EncodedRow]:
+        overflow = self.amount_overflow
+        for index, row in enumerate(rows):
+            amount = overflow.get(index)
+            yield row if amount is None else (*row[:4], str(amount), *row[5:])
+
+    def find_rows(self, customer_id: Optional[str] = None, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None, currency: Union[Currency, str, None] = None,
+                  status: Union[TransactionStatus, str, None] = None) -> np.ndarray:
+        # Start from the most selective index the predicates allow (customer,
+        # then date range, then the currency/status bitmaps) and check the
+        # remaining predicates against the code columns of the candidate rows.
+        index = self.index
+        if index is None:
+            raise ValueError("find_rows needs an indexed store")
+        currency_code = None if currency is None else _CURRENCY_CODES[Currency(currency)]
+        status_code = None if status is None else _STATUS_CODES[TransactionStatus(status)]
+        has_dates = start_date is not None or end_date is not None
+
+        if customer_id is not None:
+            rows = index.rows_for_customer(customer_id)
+        elif has_dates:
+            rows = index.rows_for_dates(start_date, end_date)
+        else:
+            return index.rows_for_codes(currency_code, status_code)
+
+        # Candidate rows are checked against views of the columns, never copies of them
+        if len(rows) and customer_id is not None and has_dates:
+            ordinals = np.frombuffer(self.date_ordinals, dtype=np.int32)[rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if start_date is not None:
+                keep &= ordinals >= start_date.toordinal()
+            if end_date is not None:
+                keep &= ordinals <= end_date.toordinal()
+            rows = rows[keep]
+        for column, code in ((self.currency_codes, currency_code), (self.status_codes, status_code)):
+            if len(rows) and code is not None:
+                rows = rows[np.frombuffer(column, dtype=np.int8)[rows] == code]
+        return rows
+
+    def query(self, limit: Optional[int] = None, **predicates) -> List[Transaction]:
+        rows = self.find_rows(**predicates)
+        if limit is not None:
+            rows = rows[:limit]
+        return self._rows(rows)
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        # Same output as Transaction.to_dict, straight from the columns.
+        # Minor units below 2**53 are exact floats, and IEEE division is
+        # correctly rounded, so amount / 100 equals float(Decimal amount).
+        scale = 10 ** AMOUNT_SCALE
+        exact_limit = 1 << 53
+        overflow = self.amount_overflow
+        iso_dates = self._iso_dates
+        currency_values = [currency.value for currency in _CURRENCIES]
+        status_values = [status.value for status in _STATUSES]
+        columns = zip(self.transaction_ids, self.customer_ids, self.date_ordinals, self.amounts,
+                      self.currency_codes, self.status_codes)
+        for index, (transaction_id, customer_id, ordinal, minor, currency, status) in enumerate(columns):
+            iso_date = iso_dates.get(ordinal)
+            if iso_date is None:
+                iso_date = iso_dates[ordinal] = self._date(ordinal).isoformat()
+            if -exact_limit < minor < exact_limit and index not in overflow:
+                amount = minor / scale
+            else:
+                amount = float(self.amount(index))
+            yield {
+                "transaction_id": transaction_id,
+                "customer_id": customer_id,
+                "date": iso_date,
+                "amount": amount,
+                "currency": currency_values[currency],
+                "status": status_values[status],
+                "validation_errors": [],
+            }
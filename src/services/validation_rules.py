@@ -0,0 +1,215 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Use absolute imports
+from constants.currencies import Currency, VALID_CURRENCIES
+from constants.status import VALID_STATUSES
+from constants.error_codes import ErrorCode
+
+FIELDS = ("transaction_id", "customer_id", "date", "amount", "currency", "status")
+
+_NO_LIMIT = Decimal("Infinity")
+_ZERO = Decimal(0)
+_ONE = Decimal(1)
+
+
+@dataclass(frozen=True)
+class Rule:
+    # A check that sets `code` when `condition`, a Python expression over the
+    # fields it names in `columns`, is true. `constants` are names the
+    # expression may use. Rules hold only data so they pickle to workers.
+    # `column_condition` is the same check as a NumPy expression over object
+    # arrays of those fields, returning a boolean array; it may also use the
+    # COLUMN_FUNCTIONS below.
+    code: ErrorCode
+    condition: str
+    columns: Tuple[str, ...]
+    constants: Mapping[str, Any] = field(default_factory=dict)
+    column_condition: Optional[str] = None
+
+
+BUILTIN_RULES = [
+    Rule(ErrorCode.MISSING_TRANSACTION_ID, "not transaction_id", ("transaction_id",),
+         column_condition="~truthy(transaction_id)"),
+    Rule(ErrorCode.MISSING_CUSTOMER_ID, "not customer_id", ("customer_id",),
+         column_condition="~truthy(customer_id)"),
+    Rule(ErrorCode.INVALID_DATE, "not date", ("date",), column_condition="~truthy(date)"),
+    Rule(ErrorCode.INVALID_AMOUNT, "amount is None", ("amount",), column_condition="is_none(amount)"),
+    Rule(ErrorCode.NON_POSITIVE_AMOUNT, "amount is not None and amount <= 0", ("amount",),
+         {"ZERO": _ZERO, "ONE": _ONE}, column_condition="fill_none(amount, ONE) <= ZERO"),
+    Rule(ErrorCode.MISSING_CURRENCY, "not currency", ("currency",), column_condition="~truthy(currency)"),
+    Rule(ErrorCode.INVALID_CURRENCY, "currency and currency not in VALID_CURRENCIES", ("currency",),
+         {"VALID_CURRENCIES": frozenset(VALID_CURRENCIES)},
+         column_condition="truthy(currency) & ~isin(currency, VALID_CURRENCIES)"),
+    Rule(ErrorCode.MISSING_STATUS, "not status", ("status",), column_condition="~truthy(status)"),
+    Rule(ErrorCode.INVALID_STATUS, "status and status not in VALID_STATUSES", ("status",),
+         {"VALID_STATUSES": frozenset(VALID_STATUSES)},
+         column_condition="truthy(status) & ~isin(status, VALID_STATUSES)"),
+]
+
+
+def amount_limit_rule(limits: Mapping[Currency, Decimal]) -> Rule:
+    # Amounts above the limit of their currency; currencies without one are not limited
+    return Rule(
+        ErrorCode.AMOUNT_OVER_LIMIT,
+        "amount is not None and amount > AMOUNT_LIMITS.get(currency, NO_LIMIT)",
+        ("amount", "currency"),
+        {"AMOUNT_LIMITS": {Currency(c): Decimal(v) for c, v in limits.items()}, "NO_LIMIT": _NO_LIMIT,
+         "ZERO": _ZERO},
+        column_condition="~is_none(amount) & (fill_none(amount, ZERO) > lookup(currency, AMOUNT_LIMITS, NO_LIMIT))",
+    )
+
+
+def customer_id_pattern_rule(pattern: str) -> Rule:
+    # Present customer ids must match the whole pattern; missing ones are reported separately
+    return Rule(
+        ErrorCode.CUSTOMER_ID_PATTERN,
+        "bool(customer_id) and CUSTOMER_ID_PATTERN.fullmatch(customer_id) is None",
+        ("customer_id",),
+        {"CUSTOMER_ID_PATTERN": re.compile(pattern)},
+        column_condition="truthy(customer_id) & ~fullmatch(CUSTOMER_ID_PATTERN, customer_id)",
+    )
+
+
+# Functions column conditions may call. Each takes object arrays and returns
+# a boolean array, or an object array for fill_none and lookup.
+def _truthy(values: np.ndarray) -> np.ndarray:
+    return values.astype(bool)
+
+
+def _is_none(values: np.ndarray) -> np.ndarray:
+    return np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+
+
+def _fill_none(values: np.ndarray, fill: Any) -> np.ndarray:
+    filled = values.copy()
+    filled[_is_none(values)] = fill
+    return filled
+
+
+def _isin(values: np.ndarray, allowed: Sequence[Any]) -> np.ndarray:
+    return pd.Series(values, dtype=object).isin(list(allowed)).to_numpy()
+
+
+def _fullmatch(pattern: "re.Pattern[str]", values: np.ndarray) -> np.ndarray:
+    # Values that are not strings do not match
+    return pd.Series(values, dtype=object).str.fullmatch(pattern).eq(True).to_numpy()
+
+
+def _lookup(values: np.ndarray, mapping: Mapping[Any, Any], default: Any) -> np.ndarray:
+    # Values missing from the mapping get code -1, which indexes the trailing default
+    table = np.empty(len(mapping) + 1, dtype=object)
+    table[:-1] = list(mapping.values())
+    table[-1] = default
+    return table[pd.Index(list(mapping), dtype=object).get_indexer(values)]
+
+
+COLUMN_FUNCTIONS = {
+    "truthy": _truthy,
+    "is_none": _is_none,
+    "fill_none": _fill_none,
+    "isin": _isin,
+    "fullmatch": _fullmatch,
+    "lookup": _lookup,
+}
+
+
+def _canonical(value: Any) -> Any:
+    # A JSON-able form of a rule constant that does not depend on set order or hash seeds
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, re.Pattern):
+        return {"pattern": value.pattern, "flags": value.flags}
+    if isinstance(value, Mapping):
+        return sorted([_canonical(k), _canonical(v)] for k, v in value.items())
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value if isinstance(value, (int, float, str, bool, type(None))) else str(value)
+
+
+def rules_fingerprint(rules: Sequence[Rule]) -> str:
+    # Equal for rule lists that validate alike, across processes and runs
+    described = [
+        [rule.code.name, rule.condition, list(rule.columns), _canonical(rule.constants), rule.column_condition]
+        for rule in rules
+    ]
+    return hashlib.sha256(json.dumps(described, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class RuleEngine:
+    # Compiles a rule list once. check() is one generated function that runs
+    # every condition over a row and returns the OR of the failing codes.
+    # check_columns() runs the column conditions over the factorized columns
+    # of a whole batch, as ColumnarDataCleaner produces them.
+    def __init__(self, rules: Sequence[Rule] = BUILTIN_RULES):
+        self.rules = list(rules)
+        for rule in self.rules:
+            unknown = [column for column in rule.columns if column not in FIELDS]
+            if unknown:
+                raise ValueError(f"Rule {rule.code.name} uses unknown columns {unknown}")
+        self.check = self._compile_row_check()
+        # Columns are only usable when every rule can be checked over them
+        self.columnar = all(rule.column_condition is not None for rule in self.rules)
+        self._column_checks = [(rule, self._compile_column_condition(rule)) for rule in self.rules
+                               if rule.column_condition is not None]
+
+    def _namespace(self) -> Dict[str, Any]:
+        namespace: Dict[str, Any] = {}
+        for rule in self.rules:
+            for name, value in rule.constants.items():
+                if name in namespace and namespace[name] != value:
+                    raise ValueError(f"Rule {rule.code.name} redefines constant {name}")
+                namespace[name] = value
+        return namespace
+
+    def _compile_row_check(self) -> Callable[[Any], int]:
+        lines = ["def check(row):"]
+        lines += [f"    {name} = row.{name}" for name in FIELDS
+                  if any(name in rule.columns for rule in self.rules)]
+        lines.append("    codes = 0")
+        for rule in self.rules:
+            lines.append(f"    if {rule.condition}:")
+            lines.append(f"        codes |= {int(rule.code)}")
+        lines.append("    return codes")
+        namespace = self._namespace()
+        exec(compile("\n".join(lines) + "\n", f"<validation rules {len(self.rules)}>", "exec"), namespace)
+        return namespace["check"]
+
+    def _compile_column_condition(self, rule: Rule) -> Callable[..., np.ndarray]:
+        source = f"def condition({', '.join(rule.columns)}):\n    return {rule.column_condition}\n"
+        namespace = {**COLUMN_FUNCTIONS, **rule.constants}
+        exec(compile(source, f"<rule {rule.code.name} columns>", "exec"), namespace)
+        return namespace["condition"]
+
+    def check_columns(self, columns: Mapping[str, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        # columns maps each field to (codes, values): one code per row into an
+        # object array of distinct values. Returns one error code per row.
+        if not self.columnar:
+            missing = [rule.code.name for rule in self.rules if rule.column_condition is None]
+            raise ValueError(f"Rules {missing} have no column condition")
+        rows = len(next(iter(columns.values()))[0]) if columns else 0
+        codes = np.zeros(rows, dtype=np.uint32)
+        row_values: Dict[str, np.ndarray] = {}
+        for rule, condition in self._column_checks:
+            if len(rule.columns) == 1:
+                # Checked once per distinct value, then spread to the rows
+                keys, values = columns[rule.columns[0]]
+                failing = np.asarray(condition(values), dtype=bool)[keys]
+            else:
+                for name in rule.columns:
+                    if name not in row_values:
+                        keys, values = columns[name]
+                        row_values[name] = values[keys]
+                failing = np.asarray(condition(*[row_values[name] for name in rule.columns]), dtype=bool)
+            codes[failing] |= int(rule.code)
+        return codes
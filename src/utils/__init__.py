@@ -0,0 +1,11 @@
+from .lru_cache import LRUCache
+from .compressed_io import detect_compression, open_text
+from .sequence_view import SequenceView, MappedSequenceView
+from .spill_list import SpillList
+from .bloom_filter import BloomFilter
+from .json_stream import EncodedSection, JsonStreamWriter
+from .binary_blocks import pack_blocks, unpack_blocks
+from .gc_pause import gc_paused
+from .profiling import StageProfiler, NULL_PROFILER
+
+__all__ = ['LRUCache', 'detect_compression', 'open_text', 'SequenceView', 'MappedSequenceView', 'SpillList', 'BloomFilter', 'EncodedSection', 'JsonStreamWriter', 'pack_blocks', 'unpack_blocks', 'gc_paused', 'StageProfiler', 'NULL_PROFILER']
@@ -0,0 +1,63 @@
+import json
+import struct
+from typing import Any, List, Sequence
+
+_COUNT = struct.Struct("<I")
+_LENGTH = struct.Struct("<Q")
+# Separator for string columns; columns containing it fall back to JSON
+_SEPARATOR = "\x00"
+
+
+def pack_blocks(blocks: Sequence[bytes]) -> bytes:
+    # Block count, then each block's length, then the blocks back to back
+    header = _COUNT.pack(len(blocks)) + b"".join(_LENGTH.pack(len(block)) for block in blocks)
+    return header + b"".join(blocks)
+
+
+def unpack_blocks(data: bytes) -> List[memoryview]:
+    # Views into data, so unpacking copies nothing
+    view = memoryview(data)
+    if len(view) < _COUNT.size:
+        raise ValueError("truncated block header")
+    (count,) = _COUNT.unpack_from(view, 0)
+    offset = _COUNT.size + count * _LENGTH.size
+    if len(view) < offset:
+        raise ValueError("truncated block header")
+    blocks = []
+    for index in range(count):
+        (length,) = _LENGTH.unpack_from(view, _COUNT.size + index * _LENGTH.size)
+        if len(view) < offset + length:
+            raise ValueError("truncated block")
+        blocks.append(view[offset:offset + length])
+        offset += length
+    return blocks
+
+
+def pack_strings(values: Sequence[str]) -> bytes:
+    # Joined on a NUL byte and split in C on the way back; a leading byte
+    # tells that apart from the JSON used when a value contains a NUL
+    joined = _SEPARATOR.join(values)
+    if joined.count(_SEPARATOR) == max(len(values) - 1, 0):
+        return b"s" + joined.encode("utf-8")
+    return b"j" + json.dumps(list(values)).encode("utf-8")
+
+
+def unpack_strings(block: bytes, count: int) -> List[str]:
+    kind, payload = bytes(block[:1]), block[1:]
+    if kind == b"j":
+        values = json.loads(bytes(payload))
+    elif kind == b"s":
+        values = str(payload, "utf-8").split(_SEPARATOR) if count else []
+    else:
+        raise ValueError(f"unknown string block kind {kind!r}")
+    if len(values) != count:
+        raise ValueError(f"expected {count} strings, found {len(values)}")
+    return values
+
+
+def pack_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def unpack_json(block: bytes) -> Any:
+    return json.loads(bytes(block))
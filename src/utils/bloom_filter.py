@@ -0,0 +1,76 @@
+import math
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class BloomFilter:
+    # Bit positions come from Python's own string hash split into two 32-bit
+    # halves (Kirsch-Mitzenmacher double hashing), computed for a whole batch
+    # with numpy. The hash is salted per process, so a filter must never be
+    # persisted or shared between processes.
+    def __init__(self, expected_items: int, false_positive_rate: float = 0.001):
+        if expected_items <= 0:
+            raise ValueError(f"expected_items must be positive, got {expected_items}")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(f"false_positive_rate must be between 0 and 1, got {false_positive_rate}")
+        self.expected_items = expected_items
+        self.false_positive_rate = false_positive_rate
+        self.size = max(8, math.ceil(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / expected_items * math.log(2)))
+        self.items = 0
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self.hash_count, dtype=np.uint64)
+
+    def _positions(self, items: Sequence[str]) -> np.ndarray:
+        hashes = np.fromiter((hash(item) for item in items), dtype=np.int64, count=len(items)).view(np.uint64)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        return (h1[:, None] + self._steps[None, :] * h2[:, None]) % np.uint64(self.size)
+
+    def _test(self, positions: np.ndarray) -> np.ndarray:
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        return ((self._bits[positions >> np.uint64(3)] & masks) != 0).all(axis=1)
+
+    def contains_many(self, items: Sequence[str]) -> np.ndarray:
+        if not len(items):
+            return np.zeros(0, dtype=bool)
+        return self._test(self._positions(items))
+
+    def add_many(self, items: Sequence[str]) -> np.ndarray:
+        # Returns, per item, whether it may have been added by an earlier call;
+        # repeats within the same batch are left to the caller.
+        if not len(items):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(items)
+        present = self._test(positions)
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self._bits, (positions >> np.uint64(3)).ravel(), masks.ravel())
+        self.items += int(len(items) - present.sum())
+        return present
+
+    def add(self, item: str) -> bool:
+        return bool(self.add_many([item])[0])
+
+    def __contains__(self, item: str) -> bool:
+        return bool(self.contains_many([item])[0])
+
+    @property
+    def nbytes(self) -> int:
+        return self._bits.nbytes
+
+    def fill_ratio(self) -> float:
+        return int(_POPCOUNT[self._bits].sum(dtype=np.int64)) / self.size
+
+    def stats(self) -> Dict[str, Any]:
+        fill = self.fill_ratio()
+        return {
+            "items": self.items,
+            "bits": self.size,
+            "bytes": self.nbytes,
+            "hash_count": self.hash_count,
+            "fill_ratio": fill,
+            "estimated_fpr": fill ** self.hash_count,
+        }
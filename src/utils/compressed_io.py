@@ -0,0 +1,33 @@
+import bz2
+import gzip
+import lzma
+from typing import IO, Optional
+
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+COMPRESSION_MAGIC = {b'\x1f\x8b': 'gzip', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'xz'}
+
+_OPENERS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    lowered = str(file_path).lower()
+    for suffix, codec in COMPRESSION_SUFFIXES.items():
+        if lowered.endswith(suffix):
+            return codec
+
+    # Drops are sometimes renamed on the way in, so fall back to the header bytes
+    with open(file_path, 'rb') as f:
+        head = f.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_text(file_path: str, encoding: str = 'utf-8', newline: Optional[str] = None) -> IO[str]:
+    # The codecs decompress incrementally as the stream is read, so the file
+    # is never inflated in memory or on disk.
+    codec = detect_compression(file_path)
+    if codec is None:
+        return open(file_path, 'r', encoding=encoding, newline=newline)
+    return _OPENERS[codec](file_path, 'rt', encoding=encoding, newline=newline)
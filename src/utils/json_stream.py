@@ -0,0 +1,129 @@
+import json
+from typing import IO, Any, Dict, Iterable, Mapping, Optional
+
+JSON_FORMATS = ('json', 'compact', 'ndjson')
+
+# Values written whole; any other iterable is a list section streamed item by item
+_WHOLE_VALUES = (dict, str, bytes, int, float, bool, type(None))
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+_CONTAINERS = frozenset((list, dict))
+# ensure_ascii escapes control characters inside strings, so in the C
+# encoder's output these separators can only be its own
+_ITEM_MARK, _KEY_MARK = "\x00", "\x01"
+
+
+class EncodedSection(list):
+    # A list section's items as JsonStreamWriter.encode_section returned them.
+    # Written as is, so a section shared by several reports is encoded once.
+    def __init__(self, name: str, json_format: str, items: Iterable[str] = ()):
+        super().__init__(items)
+        self.name = name
+        self.json_format = json_format
+
+
+class JsonStreamWriter:
+    # Writes a JSON object whose list sections may be iterators, encoding one
+    # record at a time so the document never exists in memory as a whole.
+    # 'json' output is byte for byte what json.dump(..., indent=2, default=str)
+    # writes, 'compact' has no whitespace, and 'ndjson' writes one
+    # {"section": ..., "data": ...} line per record or other section.
+    def __init__(self, file: Optional[IO[str]], json_format: str = 'json'):
+        if json_format not in JSON_FORMATS:
+            raise ValueError(f"Unknown JSON format: {json_format}")
+        self.file = file
+        self.json_format = json_format
+        if json_format == 'json':
+            self._encode = json.JSONEncoder(indent=2, default=str).encode
+            # The indenting encoder is pure Python; flat records, the bulk of
+            # a report, are encoded in C and the layout spliced in instead
+            self._encode_marked = json.JSONEncoder(separators=(_ITEM_MARK, _KEY_MARK), default=str).encode
+        else:
+            self._encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+        self.records = 0
+        self.chars = 0
+
+    def write_document(self, sections: Mapping[str, Any]) -> Dict[str, int]:
+        if self.json_format == 'ndjson':
+            for name, value in sections.items():
+                self._write_ndjson(name, value)
+        else:
+            self._write_object(sections)
+        return {"records": self.records, "chars": self.chars}
+
+    def encode_section(self, name: str, items: Iterable[Any]) -> EncodedSection:
+        # Needs no file; the result can be passed to write_document of any
+        # writer with the same format, under the same section name
+        if self.json_format == 'ndjson':
+            return EncodedSection(name, self.json_format, (self._encode_line(name, item) for item in items))
+        return EncodedSection(name, self.json_format, (self._encode_item(item) for item in items))
+
+    def _write(self, text: str) -> None:
+        self.file.write(text)
+        self.chars += len(text)
+
+    def _write_object(self, sections: Mapping[str, Any]) -> None:
+        if not sections:
+            self._write("{}")
+            return
+        pretty = self.json_format == 'json'
+        # Nested lines are indented the way json.dump indents them
+        key_separator, item_separator = (": ", ",") if pretty else (":", ",")
+        outer, inner = ("\n  ", "\n    ") if pretty else ("", "")
+        self._write("{")
+        for index, (name, value) in enumerate(sections.items()):
+            if index:
+                self._write(item_separator)
+            self._write(outer + self._encode(name) + key_separator)
+            if isinstance(value, _WHOLE_VALUES):
+                self._write(self._encode(value).replace("\n", outer) if pretty else self._encode(value))
+                continue
+            first = True
+            for text in self._encoded_items(name, value):
+                self._write(("[" if first else item_separator) + inner + text)
+                self.records += 1
+                first = False
+            self._write("[]" if first else outer + "]")
+        self._write("\n}" if pretty else "}")
+
+    def _encoded_items(self, name: str, value: Iterable[Any]) -> Iterable[str]:
+        if isinstance(value, EncodedSection):
+            if (value.name, value.json_format) != (name, self.json_format):
+                raise ValueError(f"Section {value.name} encoded as {value.json_format} cannot be written "
+                                 f"as {name} in {self.json_format}")
+            return value
+        return map(self._encode_item, value)
+
+    def _encode_item(self, item: Any) -> str:
+        # One list item at the depth of a section's items
+        if self.json_format != 'json':
+            return self._encode(item)
+        if type(item) is dict and item and self._is_flat(item):
+            return self._encode_flat(item)
+        return self._encode(item).replace("\n", "\n    ")
+
+    def _encode_line(self, name: str, item: Any) -> str:
+        return self._encode({"section": name, "data": item}) + "\n"
+
+    @staticmethod
+    def _is_flat(record: Dict[str, Any]) -> bool:
+        # Scalars and empty containers are laid out alike with or without indent
+        for value in record.values():
+            value_type = type(value)
+            if value_type not in _SCALARS and (value_type not in _CONTAINERS or value):
+                return False
+        return True
+
+    def _encode_flat(self, record: Dict[str, Any]) -> str:
+        # A non-empty dict of scalars at list-item depth, as json.dump indents it
+        body = self._encode_marked(record)[1:-1]
+        return "{\n      " + body.replace(_ITEM_MARK, ",\n      ").replace(_KEY_MARK, ": ") + "\n    }"
+
+    def _write_ndjson(self, name: str, value: Any) -> None:
+        if isinstance(value, EncodedSection):
+            lines = self._encoded_items(name, value)
+        else:
+            items: Iterable[Any] = (value,) if isinstance(value, _WHOLE_VALUES) else value
+            lines = (self._encode_line(name, item) for item in items)
+        for line in lines:
+            self._write(line)
+            self.records += 1
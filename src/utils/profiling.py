@@ -0,0 +1,266 @@
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, so no memory figures
+    resource = None
+
+T = TypeVar("T")
+
+METRIC_PREFIX = "acme_pipeline"
+_END = object()
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_bytes() -> Optional[int]:
+    # The process's resident set high-water mark so far
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+def _children_cpu_seconds() -> float:
+    # CPU time of worker processes, counted once they have been reaped
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def _cpu_seconds() -> float:
+    # This thread's CPU time plus that of workers reaped meanwhile, so stages
+    # running in threads or process pools are both accounted for
+    return time.thread_time() + _children_cpu_seconds()
+
+
+class _NullStage:
+    # What stage() returns when profiling is off: entering and leaving it does nothing
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "rows", "_wall", "_cpu", "_rss", "_child_wall", "_child_cpu")
+
+    def __init__(self, profiler: "StageProfiler", name: str, rows: int):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self) -> "_Stage":
+        self.profiler._stack().append(self)
+        self._child_wall = self._child_cpu = 0.0
+        self._rss = peak_rss_bytes()
+        self._cpu = _cpu_seconds()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall = time.perf_counter() - self._wall
+        cpu = _cpu_seconds() - self._cpu
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1]._child_wall += wall
+            stack[-1]._child_cpu += cpu
+        rss = peak_rss_bytes()
+        self.profiler._record(self.name, self.rows, wall - self._child_wall, cpu - self._child_cpu,
+                              rss, None if rss is None else rss - self._rss)
+        return False
+
+
+class StageProfiler:
+    # Wall time, CPU time, rows and memory per named pipeline stage, summed
+    # over every call, plus hit rates of the caches the run used. Times are
+    # exclusive: a stage opened inside another (as when a streamed report
+    # pulls rows through cleaning and validation) is subtracted from it.
+    # Stages in other threads or processes overlap, so their times can sum
+    # to more than the run's wall time. Memory is the process's peak RSS
+    # when the stage ended and how much the stage raised it.
+    # A disabled profiler hands out one shared no-op stage, so instrumented
+    # code costs one method call per stage, never per row.
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.caches: Dict[str, Dict[str, Any]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time() + _children_cpu_seconds()
+
+    def stage(self, name: str, rows: int = 0):
+        # A context manager; set .rows on it when the count is only known at the end
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def iterate(self, name: str, items: Iterable[T], rows: Callable[[T], int] = len) -> Iterable[T]:
+        # items as they come, timing the production of each one as the stage
+        if not self.enabled:
+            return items
+        return self._iterate(name, items, rows)
+
+    def _iterate(self, name: str, items: Iterable[T], rows: Callable[[T], int]) -> Iterator[T]:
+        iterator = iter(items)
+        while True:
+            with self.stage(name) as stage:
+                item = next(iterator, _END)
+                if item is not _END:
+                    stage.rows = rows(item)
+            if item is _END:
+                return
+            yield item
+
+    def _stack(self) -> List[_Stage]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, name: str, rows: int, wall: float, cpu: float,
+                rss: Optional[int], rss_growth: Optional[int]) -> None:
+        with self._lock:
+            metrics = self.stages.get(name)
+            if metrics is None:
+                metrics = self.stages[name] = {
+                    "calls": 0, "rows": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                    "peak_rss_bytes": None, "peak_rss_growth_bytes": None,
+                }
+            metrics["calls"] += 1
+            metrics["rows"] += rows
+            metrics["wall_seconds"] += wall
+            metrics["cpu_seconds"] += cpu
+            if rss is not None:
+                metrics["peak_rss_bytes"] = max(metrics["peak_rss_bytes"] or 0, rss)
+                metrics["peak_rss_growth_bytes"] = (metrics["peak_rss_growth_bytes"] or 0) + rss_growth
+
+    def record_cache(self, name: str, stats: Dict[str, Any]) -> None:
+        # stats as returned by LRUCache.stats() and the like: hits and misses
+        # (or lookups), plus any other figures, which are kept as they are.
+        # A cache this process never consulted (its work ran in workers) is left out.
+        if not self.enabled:
+            return
+        hits = stats["hits"]
+        misses = stats["misses"] if "misses" in stats else stats["lookups"] - hits
+        lookups = hits + misses
+        if lookups:
+            self.caches[name] = {**stats, "hits": hits, "misses": misses, "hit_rate": hits / lookups}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(metrics) for name, metrics in self.stages.items()}
+        for metrics in stages.values():
+            wall = metrics["wall_seconds"]
+            metrics["rows_per_second"] = metrics["rows"] / wall if metrics["rows"] and wall > 0 else None
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "wall_seconds": time.perf_counter() - self._start_wall,
+            "cpu_seconds": time.process_time() + _children_cpu_seconds() - self._start_cpu,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+            "caches": dict(self.caches),
+        }
+
+    def format_table(self) -> str:
+        metrics = self.to_dict()
+
+        def megabytes(value: Optional[int]) -> str:
+            return "" if value is None else f"{value / (1 << 20):,.1f}"
+
+        lines = ["PROFILE (times exclude nested stages):",
+                 f"{'Stage':<24} {'Calls':>7} {'Rows':>12} {'Wall s':>9} {'CPU s':>9} {'Rows/s':>12} "
+                 f"{'Peak RSS MB':>12} {'+RSS MB':>9}"]
+        for name, stage in metrics["stages"].items():
+            rate = stage["rows_per_second"]
+            lines.append(
+                f"{name:<24} {stage['calls']:>7,} {stage['rows']:>12,} {stage['wall_seconds']:>9.3f} "
+                f"{stage['cpu_seconds']:>9.3f} {'' if rate is None else format(rate, ',.0f'):>12} "
+                f"{megabytes(stage['peak_rss_bytes']):>12} {megabytes(stage['peak_rss_growth_bytes']):>9}"
+            )
+        lines.append(f"{'total':<24} {'':>7} {'':>12} {metrics['wall_seconds']:>9.3f} {metrics['cpu_seconds']:>9.3f} "
+                     f"{'':>12} {megabytes(metrics['peak_rss_bytes']):>12}")
+        if metrics["caches"]:
+            lines.append("")
+            lines.append(f"{'Cache':<24} {'Hits':>12} {'Misses':>12} {'Hit rate':>9}")
+            for name, cache in metrics["caches"].items():
+                lines.append(f"{name:<24} {cache['hits']:>12,} {cache['misses']:>12,} {cache['hit_rate']:>9.1%}")
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        _write_atomically(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        # Text exposition format for node-exporter's textfile collector. The
+        # file is replaced in one rename, as the collector may read it at any time.
+        metrics = self.to_dict()
+        lines: List[str] = []
+
+        def family(name: str, help_text: str, samples: Iterable[tuple]) -> None:
+            samples = [(labels, value) for labels, value in samples if value is not None]
+            if not samples:
+                return
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(label)}"' for key, label in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{METRIC_PREFIX}_{name} {_format_value(value)}")
+
+        family("run_timestamp_seconds", "Unix time the run's metrics were written.", [({}, time.time())])
+        family("run_wall_seconds", "Wall time of the run.", [({}, metrics["wall_seconds"])])
+        family("run_cpu_seconds", "CPU time of the run, worker processes included.", [({}, metrics["cpu_seconds"])])
+        family("run_peak_rss_bytes", "Peak resident set size of the run.", [({}, metrics["peak_rss_bytes"])])
+        stage_fields = [
+            ("calls", "Times the stage ran."),
+            ("rows", "Rows handled by the stage."),
+            ("wall_seconds", "Wall time in the stage, excluding nested stages."),
+            ("cpu_seconds", "CPU time in the stage, excluding nested stages."),
+            ("rows_per_second", "Rows per second of stage wall time."),
+            ("peak_rss_bytes", "Peak resident set size when the stage ended."),
+            ("peak_rss_growth_bytes", "How much the stage raised the peak resident set size."),
+        ]
+        for field, help_text in stage_fields:
+            family(f"stage_{field}", help_text,
+                   (({"stage": stage}, values[field]) for stage, values in metrics["stages"].items()))
+        for field, help_text in (("hits", "Cache hits."), ("misses", "Cache misses."),
+                                 ("hit_rate", "Share of cache lookups that hit.")):
+            family(f"cache_{field}", help_text,
+                   (({"cache": cache}, values[field]) for cache, values in metrics["caches"].items()))
+        _write_atomically(path, "\n".join(lines) + "\n")
+
+
+NULL_PROFILER = StageProfiler(enabled=False)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: Any) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _write_atomically(path: str, text: str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
@@ -0,0 +1,67 @@
+from collections.abc import Sequence
+from typing import Any, Callable, Iterator, List
+
+
+class SequenceView(Sequence):
+    # A read-only window onto a list owned by someone else; it reflects later
+    # appends and costs nothing to hand out.
+    __slots__ = ("_items",)
+
+    def __init__(self, items: List[Any]):
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._items
+
+    def __eq__(self, other: Any) -> bool:
+        # Compares like the list copies the getters used to return
+        if type(other) is SequenceView:
+            return self._items == other._items
+        if isinstance(other, list):
+            return self._items == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SequenceView({self._items!r})"
+
+
+class MappedSequenceView(SequenceView):
+    # A SequenceView whose items are passed through func as they are read, so
+    # a compact stored form is only expanded when someone looks at it.
+    __slots__ = ("_func",)
+
+    def __init__(self, items: List[Any], func: Callable[[Any], Any]):
+        super().__init__(items)
+        self._func = func
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._func(item) for item in self._items[index]]
+        return self._func(self._items[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self._func, self._items)
+
+    def __contains__(self, item: Any) -> bool:
+        return any(value == item for value in self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (SequenceView, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MappedSequenceView({list(self)!r})"
@@ -0,0 +1,75 @@
+import os
+import pickle
+import tempfile
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_BUFFER_ITEMS = 10000
+
+
+class SpillList(Sequence):
+    # An append-only list that keeps at most buffer_items items in memory and
+    # writes the rest in pickled blocks to an anonymous temporary file, so a
+    # long run's items cost disk instead of memory. Iteration reads the
+    # blocks back in order; indexing decodes the block holding the item and
+    # keeps that block for neighbouring reads.
+    def __init__(self, items: Iterable[Any] = (), buffer_items: int = DEFAULT_BUFFER_ITEMS):
+        if buffer_items <= 0:
+            raise ValueError(f"buffer_items must be positive, got {buffer_items}")
+        self.buffer_items = buffer_items
+        self._buffer: List[Any] = []
+        self._file = None
+        # (offset, length) of each spilled block and the index of its first item
+        self._blocks: List[Tuple[int, int]] = []
+        self._block_starts: List[int] = []
+        self._spilled = 0
+        self._cached: Tuple[Optional[int], List[Any]] = (None, [])
+        self.extend(items)
+
+    def append(self, item: Any) -> None:
+        self._buffer.append(item)
+        if len(self._buffer) >= self.buffer_items:
+            self._spill()
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="spill_")
+        data = pickle.dumps(self._buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.seek(0, os.SEEK_END)
+        self._blocks.append((self._file.tell(), len(data)))
+        self._block_starts.append(self._spilled)
+        self._file.write(data)
+        self._spilled += len(self._buffer)
+        self._buffer = []
+
+    def _block(self, number: int) -> List[Any]:
+        if self._cached[0] != number:
+            offset, length = self._blocks[number]
+            self._file.seek(offset)
+            self._cached = (number, pickle.loads(self._file.read(length)))
+        return self._cached[1]
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SpillList index out of range")
+        if index >= self._spilled:
+            return self._buffer[index - self._spilled]
+        number = bisect_right(self._block_starts, index) - 1
+        return self._block(number)[index - self._block_starts[number]]
+
+    def __iter__(self) -> Iterator[Any]:
+        for number in range(len(self._blocks)):
+            yield from self._block(number)
+        yield from self._buffer
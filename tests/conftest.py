@@ -0,0 +1,38 @@
+import csv
+import os
+import random
+import sys
+
+import pytest
+
+# The application imports its packages from src/, as main.py does
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+def write_sample_csv(path, rows: int, seed: int = 7) -> None:
+    # Clean, messy and duplicate rows in the shapes the cleaner handles:
+    # several date formats, currency symbols, thousands separators (quoted),
+    # case variations and missing fields
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["transaction_id", "customer_id", "date", "amount", "currency", "status"])
+        for i in range(rows):
+            day, month = rng.randrange(1, 29), rng.randrange(1, 13)
+            writer.writerow([
+                f"TXN{i:06d}" if rng.random() > 0.03 else f"TXN{rng.randrange(i + 1):06d}",
+                f"CUST{rng.randrange(200):04d}" if rng.random() > 0.02 else "",
+                rng.choice([f"2025-{month:02d}-{day:02d}", f"{month:02d}/{day:02d}/2025",
+                            f"{day:02d}-{month:02d}-2025", "not-a-date"]),
+                rng.choice([f"{rng.randrange(1, 500000) / 100:.2f}", f"${rng.randrange(1, 5000)},{rng.randrange(1000):03d}.50",
+                            f"{rng.randrange(1, 900)}", "-5.00", "abc", ""]),
+                rng.choice(["USD", "EUR", "GBP", "usd", " eur ", "XXX", ""]),
+                rng.choice(["completed", "COMPLETED", "pending", "failed", "cancelled", "unknown", ""]),
+            ])
+
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    path = tmp_path / "sample.csv"
+    write_sample_csv(path, 2000)
+    return str(path)
@@ -0,0 +1,37 @@
+import os
+import re
+import sys
+from typing import Any, Dict
+
+import main
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "data")
+DATA_FILES = sorted(os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR) if name.endswith(".csv"))
+
+
+def result_snapshot(processor) -> Dict[str, Any]:
+    # Everything the reports are built from, in comparable form
+    return {
+        "summary": processor.get_summary_statistics(),
+        "valid": [t.to_dict() for t in processor.transactions],
+        "invalid": list(processor.get_invalid_transactions()),
+        "duplicates": [t.to_dict() for t in processor.get_duplicate_transactions()],
+        "near_duplicates": list(processor.get_near_duplicates()) if processor.near_duplicate_window is not None else [],
+    }
+
+
+def run_main(monkeypatch, *argv) -> int:
+    monkeypatch.setattr(sys, "argv", ["main.py", *argv])
+    return main.main()
+
+
+def report_outputs(output_dir) -> Dict[str, str]:
+    # Report contents by name without the timestamp suffix, generation times blanked
+    outputs = {}
+    for directory, _, names in os.walk(output_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, encoding="utf-8") as f:
+                content = re.sub(r'"generated_at": "[^"]*"', '"generated_at": ""', f.read())
+            outputs[re.sub(r"_\d{8}_\d{6}", "", os.path.relpath(path, output_dir))] = content
+    return outputs
@@ -0,0 +1,49 @@
+import pytest
+
+from models.transaction import RawTransaction
+from services.amount_parser import (
+    CACHE_SAMPLE_SIZE, COMMA_DECIMAL, DOT_DECIMAL, AmountParser, parse_amount_reference,
+)
+from services.data_cleaner import DataCleaner
+
+VALUES = [
+    "100.50", "$1,200.75", "€500.25", "1,234,567.89", "1.234,56", "100,50", "12,34,56", "1.234", "-5", "--5",
+    "$-5", ".5", ",", "00012", "1e5", "USD 1,200.50", "1.200,50 EUR", "abc", "", "   ", "１２３", "9" * 40, None,
+]
+
+
+@pytest.mark.parametrize("convention", [DOT_DECIMAL, COMMA_DECIMAL])
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_parse_matches_the_reference_rules(convention, use_cache):
+    parser = AmountParser()
+    parser.convention = convention
+    parser.use_cache = use_cache
+    for value in VALUES * 2:
+        expected = parse_amount_reference(value)
+        assert str(parser.parse(value)) == str(expected), value
+    assert len(parser.cache) == (len(set(VALUES) - {None}) if use_cache else 0)
+
+
+def test_cache_is_only_used_for_repetitive_amounts():
+    parser = AmountParser()
+    assert parser.choose_cache(f"{i % 100}.50" for i in range(CACHE_SAMPLE_SIZE))
+    assert not parser.choose_cache(f"{i}.50" for i in range(CACHE_SAMPLE_SIZE))
+    assert parser.parse("1,234.50") == parser.parse("1,234.50")
+    assert len(parser.cache) == 0
+
+
+def raw_rows(amounts):
+    return [RawTransaction(f"TXN{i}", "CUST1", "2025-01-01", amount, "USD", "completed")
+            for i, amount in enumerate(amounts)]
+
+
+def test_cleaner_chooses_the_cache_per_batch():
+    cleaner = DataCleaner()
+    cleaned = cleaner.clean(raw_rows(f"{i}.25" for i in range(2000)))
+    assert not cleaner.amount_parser.use_cache
+    assert [str(t.amount) for t in cleaned[:2]] == ["0.25", "1.25"]
+
+    cleaned = cleaner.clean(raw_rows(f"{i % 10}.99" for i in range(2000)))
+    assert cleaner.amount_parser.use_cache
+    assert len(cleaner.amount_parser.cache) == 10
+    assert str(cleaned[-1].amount) == "9.99"
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+
+from helpers import result_snapshot
+from services.csv_processor import CSVProcessor
+from services.near_duplicate_detector import NearDuplicateDetector
+from services.transaction_processor import TransactionProcessor
+from services.transaction_store import TransactionStore
+from utils.binary_blocks import pack_blocks, pack_json, pack_strings, unpack_blocks, unpack_json, unpack_strings
+
+
+@pytest.mark.parametrize("blocks", [[], [b""], [b"abc", b"", b"\x00" * 300, bytes(range(256))]])
+def test_blocks_round_trip(blocks):
+    assert [bytes(block) for block in unpack_blocks(pack_blocks(blocks))] == blocks
+
+
+def test_truncated_blocks_are_rejected():
+    data = pack_blocks([b"abc", b"defgh"])
+    for end in range(1, len(data)):
+        with pytest.raises(ValueError, match="truncated block"):
+            unpack_blocks(data[:end])
+
+
+@pytest.mark.parametrize("values", [
+    [],
+    [""],
+    ["", ""],
+    ["TXN000001", "", "CUST0001", "ünïcødé €"],
+    ["with\x00nul", "plain", ""],
+])
+def test_strings_round_trip(values):
+    assert unpack_strings(pack_strings(values), len(values)) == values
+
+
+def test_strings_check_the_count_and_kind():
+    block = pack_strings(["a", "b"])
+    with pytest.raises(ValueError):
+        unpack_strings(block, 3)
+    with pytest.raises(ValueError):
+        unpack_strings(b"?" + bytes(block)[1:], 2)
+
+
+def test_json_round_trip():
+    value = {"rows": 3, "nested": [[1, "x"], {"k": None}], "text": "ü"}
+    assert unpack_json(pack_json(value)) == value
+
+
+def test_empty_store_round_trips():
+    store = TransactionStore.from_bytes(TransactionStore().to_bytes())
+    assert len(store) == 0
+    assert list(store) == []
+
+
+def numeric_amounts(state):
+    # Stores hold amounts in cents, so "775" comes back as "775.00"
+    if isinstance(state, dict):
+        return {k: Decimal(v) if k == "amount" else numeric_amounts(v) for k, v in state.items()}
+    if isinstance(state, list):
+        return [numeric_amounts(v) for v in state]
+    return state
+
+
+@pytest.mark.parametrize("window", [None, 3])
+def test_processor_round_trips_through_bytes(sample_csv, window):
+    # Upstream replays under new ids, for the near-duplicate lists
+    with open(sample_csv, "a", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(f"RPL{i}A,CUST0001,2025-06-0{i + 1},12.50,USD,completed\n")
+            f.write(f"RPL{i}B,CUST0001,2025-06-0{i + 2},12.50,USD,completed\n")
+    detector = NearDuplicateDetector(window) if window is not None else None
+    processor = CSVProcessor(near_duplicate_detector=detector).process_csv_file(sample_csv)
+    assert bool(processor.near_duplicates) == (window is not None)
+
+    data = processor.to_bytes()
+    loaded = TransactionProcessor.from_bytes(data)
+    assert result_snapshot(loaded) == result_snapshot(processor)
+    assert numeric_amounts(loaded.to_state()) == numeric_amounts(processor.to_state())
+    assert loaded.to_bytes() == data
+
+
+def test_processor_rejects_truncated_bytes(sample_csv):
+    data = CSVProcessor().process_csv_file(sample_csv).to_bytes()
+    with pytest.raises(ValueError):
+        TransactionProcessor.from_bytes(data[:len(data) // 2])
@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+
+from helpers import result_snapshot
+from services.checkpoint import Checkpoint
+from services.csv_processor import CSVProcessor
+from services.near_duplicate_detector import NearDuplicateDetector
+
+
+def split_sample(sample_csv, rename_appended=True):
+    with open(sample_csv, encoding="utf-8") as f:
+        header, *lines = f.readlines()
+    prefix, appended = lines[:1000], lines[1000:]
+    if rename_appended:
+        # New ids, so the appended rows never repeat one reported earlier
+        appended = [line.replace("TXN", "NEW", 1) for line in appended]
+    return header, prefix, appended
+
+
+def full_run(path, **options):
+    return result_snapshot(make_processor(**options).process_csv_file(str(path)))
+
+
+def make_processor(cleaner="row", window=None):
+    detector = NearDuplicateDetector(window) if window is not None else None
+    return CSVProcessor(cleaner=cleaner, near_duplicate_detector=detector)
+
+
+@pytest.mark.parametrize("options", [{}, {"cleaner": "columnar"}, {"window": 30}], ids=["row", "columnar", "near"])
+def test_resumed_run_matches_a_full_run(tmp_path, sample_csv, caplog, options):
+    header, prefix, appended = split_sample(sample_csv)
+    path, checkpoint_path = tmp_path / "feed.csv", tmp_path / "feed.checkpoint.json"
+    path.write_text(header + "".join(prefix), encoding="utf-8")
+
+    first = make_processor(**options).process_csv_file_incremental(str(path), checkpoint_path)
+    assert result_snapshot(first) == full_run(path, **options)
+    assert Checkpoint.load(checkpoint_path).rows == len(prefix)
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(appended)
+    with caplog.at_level(logging.INFO):
+        resumed = make_processor(**options).process_csv_file_incremental(str(path), checkpoint_path)
+    assert "Resumed from checkpoint" in caplog.text
+    assert result_snapshot(resumed) == full_run(path, **options)
+    assert Checkpoint.load(checkpoint_path).rows == len(prefix) + len(appended)
+
+    # Nothing appended since: the checkpoint alone reproduces the result
+    again = make_processor(**options).process_csv_file_incremental(str(path), checkpoint_path)
+    assert result_snapshot(again) == result_snapshot(resumed)
+
+
+def test_appended_ids_repeating_the_prefix_reprocess_in_full(tmp_path, sample_csv, caplog):
+    header, prefix, appended = split_sample(sample_csv, rename_appended=False)
+    path, checkpoint_path = tmp_path / "feed.csv", tmp_path / "feed.checkpoint.json"
+    path.write_text(header + "".join(prefix), encoding="utf-8")
+    make_processor().process_csv_file_incremental(str(path), checkpoint_path)
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(appended)
+    resumed = make_processor().process_csv_file_incremental(str(path), checkpoint_path)
+    assert "reprocessing in full" in caplog.text
+    assert result_snapshot(resumed) == full_run(path)
+
+
+def test_changed_prefix_reprocesses_in_full(tmp_path, sample_csv, caplog):
+    header, prefix, appended = split_sample(sample_csv)
+    path, checkpoint_path = tmp_path / "feed.csv", tmp_path / "feed.checkpoint.json"
+    path.write_text(header + "".join(prefix), encoding="utf-8")
+    make_processor().process_csv_file_incremental(str(path), checkpoint_path)
+
+    path.write_text(header + "".join(prefix[1:] + appended), encoding="utf-8")
+    rerun = make_processor().process_csv_file_incremental(str(path), checkpoint_path)
+    assert "changed before the checkpointed offset" in caplog.text
+    assert result_snapshot(rerun) == full_run(path)
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from constants.error_codes import ErrorCode
+from helpers import DATA_FILES, report_outputs, result_snapshot, run_main
+from services.columnar_cleaner import ColumnarDataCleaner
+from services.csv_processor import CSVProcessor
+from services.data_cleaner import DATE_FORMATS, DataCleaner
+from services.data_validator import DataValidator
+from services.dedupe_index import DedupeIndex
+from services.near_duplicate_detector import NearDuplicateDetector
+from services.validation_rules import BUILTIN_RULES
+
+# Padded and unpadded fields, both day/month orders, two-digit years on
+# both sides of the pivot, leap days, years outside what pandas can hold,
+# Excel serials and garbage
+DATES = [
+    "2025-01-31", "2025-1-5", "2024-02-29", "2025-02-29", "2025-13-01", "0000-01-01", "0001-01-01",
+    "1600-07-04", "1677-09-21", "2262-04-12", "2263-01-01", "9999-12-31",
+    "03/04/2025", "3/4/2025", "13/04/2025", "04/13/2025", "03/04/1600", "03/04/2263",
+    "31-12-2025", "1-2-2025", "31-12-68", "31-12-69", "01/02/70", "20250131", "99991231", "16000101",
+    "45000", "1", "00000", "99999", "123456", "", "   ", " 2025-01-31 ", "2025-01-31T00:00", "n/a", "2025/01/31",
+]
+
+
+@pytest.mark.parametrize("dominant", [None] + DATE_FORMATS)
+def test_dates_match_the_row_cleaner(dominant):
+    row, columnar = DataCleaner(), ColumnarDataCleaner()
+    if dominant is not None:
+        row.date_formats = columnar.date_formats = row._promote_date_format(dominant)
+    parsed = columnar._clean_date_column(pd.Series(DATES, dtype=object)).tolist()
+    assert parsed == [row._clean_date(v) for v in DATES]
+
+
+def test_cleaned_rows_match_the_row_cleaner(sample_csv):
+    raw = CSVProcessor().read_csv_file(sample_csv)
+    expected = [t.to_dict() for t in DataCleaner().clean(raw)]
+    assert [t.to_dict() for t in ColumnarDataCleaner().clean(raw)] == expected
+
+
+def test_columnar_processing_matches_the_row_cleaner(sample_csv):
+    for path in [sample_csv, *DATA_FILES]:
+        row = CSVProcessor().process_csv_file(path)
+        columnar = CSVProcessor(cleaner="columnar").process_csv_file(path)
+        assert result_snapshot(columnar) == result_snapshot(row), path
+
+
+# Options that change how the column pipeline accepts rows: a Bloom
+# prefilter for duplicates, near-duplicate flagging, a dedupe index of
+# earlier runs, and rules letting rows with a missing field through, which
+# sends the file down the row-wise path
+PIPELINE_OPTIONS = {
+    "plain": lambda tmp_path: {},
+    "bloom": lambda tmp_path: {"validator": DataValidator(bloom_false_positive_rate=0.01)},
+    "near": lambda tmp_path: {"near_duplicate_detector": NearDuplicateDetector(30)},
+    "dedupe": lambda tmp_path: {"dedupe_index": DedupeIndex(str(tmp_path / "seen.sqlite"))},
+    "lenient": lambda tmp_path: {"validator": DataValidator(
+        rules=[rule for rule in BUILTIN_RULES if rule.code != ErrorCode.MISSING_CUSTOMER_ID])},
+}
+
+
+@pytest.mark.parametrize("name", list(PIPELINE_OPTIONS))
+def test_column_pipeline_matches_the_row_pipeline(tmp_path, capsys, sample_csv, name):
+    # Exact amounts, totals and printed duplicates, across files of one run,
+    # the sample twice so that its second pass repeats every id
+    results = {}
+    for cleaner in ["row", "columnar"]:
+        directory = tmp_path / cleaner
+        directory.mkdir()
+        processor = CSVProcessor(cleaner=cleaner, **PIPELINE_OPTIONS[name](directory))
+        states = [processor.process_csv_file(path).to_state()
+                  for path in [sample_csv, *DATA_FILES, sample_csv]]
+        results[cleaner] = states, capsys.readouterr().out
+    assert results["columnar"] == results["row"]
+    assert "Duplicate" in results["row"][1]
+
+
+def test_cleaner_flag_writes_the_row_cleaner_reports(tmp_path, monkeypatch, sample_csv):
+    inputs = [sample_csv, *DATA_FILES]
+    assert run_main(monkeypatch, *inputs, "--all-reports", "-o", str(tmp_path / "row")) == 0
+    assert run_main(monkeypatch, *inputs, "--all-reports", "--cleaner", "columnar", "-o", str(tmp_path / "columnar")) == 0
+    row = report_outputs(tmp_path / "row")
+    assert row
+    assert report_outputs(tmp_path / "columnar") == row
@@ -0,0 +1,78 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from helpers import run_main
+from services.dedupe_index import SECONDS_PER_DAY, DedupeIndex
+
+
+def committed_ids(path):
+    with sqlite3.connect(str(path)) as conn:
+        return {row[0] for row in conn.execute("SELECT transaction_id FROM seen_ids")}
+
+
+def test_ids_are_seen_within_the_run_and_stored_on_commit(tmp_path):
+    path = tmp_path / "ids.sqlite"
+    index = DedupeIndex(str(path))
+    index.add_many(["TXN1", "TXN2"])
+    assert index.contains_many(["TXN1", "TXN3", "TXN1"]) == {"TXN1"}
+    assert committed_ids(path) == set()
+
+    index.commit()
+    index.close()
+    assert committed_ids(path) == {"TXN1", "TXN2"}
+    with DedupeIndex(str(path)) as index:
+        assert index.contains_many(["TXN2", "TXN3"]) == {"TXN2"}
+        assert len(index) == 2
+
+
+def test_uncommitted_ids_are_dropped(tmp_path):
+    path = tmp_path / "ids.sqlite"
+    index = DedupeIndex(str(path))
+    index.add_many(["TXN1"])
+    index.rollback()
+    assert index.contains_many(["TXN1"]) == set()
+    index.add_many(["TXN2"])
+    index.close()
+    assert committed_ids(path) == set()
+
+
+def test_concurrent_runs_do_not_lock_each_other_out(tmp_path):
+    path = str(tmp_path / "ids.sqlite")
+    first, second = DedupeIndex(path), DedupeIndex(path)
+    first.add_many(["TXN1", "TXN2"])
+    # The second run writes while the first is still adding ids
+    second.add_many(["TXN2", "TXN3"])
+    second.commit()
+    first.add_many(["TXN4"])
+    first.commit()
+    first.close()
+    second.close()
+    assert committed_ids(path) == {"TXN1", "TXN2", "TXN3", "TXN4"}
+
+
+def test_retention_drops_old_ids(tmp_path):
+    path = str(tmp_path / "ids.sqlite")
+    with DedupeIndex(path) as index:
+        index.add_many(["OLD"])
+        index.run_time -= 10 * SECONDS_PER_DAY
+    with DedupeIndex(path) as index:
+        index.add_many(["NEW"])
+    with DedupeIndex(path, retention_days=5) as index:
+        assert index.contains_many(["OLD", "NEW"]) == {"NEW"}
+    with pytest.raises(ValueError):
+        DedupeIndex(path, retention_days=0)
+
+
+def test_main_records_ids_only_for_successful_runs(tmp_path, monkeypatch, sample_csv):
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(sample_csv, "good.csv")
+    with open("bad.csv", "wb") as f:
+        f.write(b"\xff\xfe\x00not a csv")
+
+    assert run_main(monkeypatch, "good.csv", "bad.csv", "--dedupe-db", "ids.sqlite", "-o", "out") == 1
+    assert committed_ids(tmp_path / "ids.sqlite") == set()
+
+    assert run_main(monkeypatch, "good.csv", "--dedupe-db", "ids.sqlite", "-o", "out") == 0
+    assert committed_ids(tmp_path / "ids.sqlite")
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from constants.error_codes import ERROR_CODES
+from services.csv_processor import CSVProcessor
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "data")
+
+
+@pytest.mark.parametrize("file_name", ["messy_transactions.csv", "clean_transactions.csv"])
+def test_histogram_counts_the_reported_invalid_rows(file_name):
+    processor = CSVProcessor().process_csv_file(os.path.join(DATA_DIR, file_name))
+    expected = {}
+    for _, codes in processor.invalid_transactions:
+        for code in ERROR_CODES:
+            if codes & code:
+                expected[code] = expected.get(code, 0) + 1
+    assert processor.error_histogram == expected
+
+
+def test_rows_missing_required_fields_are_not_counted(sample_csv):
+    processor = CSVProcessor().process_csv_file(sample_csv)
+    stats = processor.get_summary_statistics()
+    assert max(stats["error_histogram"].values()) <= stats["invalid_count"]
+    assert sum(processor.error_histogram.values()) >= stats["invalid_count"]
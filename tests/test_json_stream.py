@@ -0,0 +1,98 @@
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from utils.json_stream import JSON_FORMATS, JsonStreamWriter
+
+RECORDS = [
+    {"transaction_id": "TXN1", "amount": 12.5, "valid": True, "note": None, "count": 3},
+    {"amount": Decimal("0.10"), "date": date(2025, 1, 31), "text": "ünï\x00\x01\"quoted\"\n€"},
+    {"empty_list": [], "empty_dict": {}},
+    {"errors": ["missing_amount", "invalid_date"], "nested": {"a": {"b": [1, {"c": None}]}}},
+    {},
+    [],
+    [1, [2, 3], {"k": "v"}],
+    "plain string",
+    42,
+    None,
+]
+
+DOCUMENTS = {
+    "empty": {},
+    "scalars_only": {"version": "1.0.0", "count": 0, "ratio": 0.5, "flag": False, "none": None},
+    "report": {
+        "report_metadata": {"generated_at": "2025-01-01T00:00:00", "report_type": "transaction_analysis"},
+        "summary": {"total": 3, "amount_by_currency": {"USD": Decimal("1.50")}},
+        "valid_transactions": RECORDS,
+        "empty_section": [],
+        "tuple_section": (1, "two", date(2025, 2, 1)),
+        "text": "multi\nline",
+    },
+}
+
+
+def write(json_format, document, stream=False):
+    # With stream, list sections are passed as iterators
+    if stream:
+        document = {k: iter(v) if isinstance(v, (list, tuple)) else v for k, v in document.items()}
+    out = io.StringIO()
+    stats = JsonStreamWriter(out, json_format).write_document(document)
+    assert stats["chars"] == len(out.getvalue())
+    return out.getvalue(), stats
+
+
+@pytest.mark.parametrize("name", list(DOCUMENTS))
+@pytest.mark.parametrize("stream", [False, True])
+def test_json_matches_json_dump(name, stream):
+    document = DOCUMENTS[name]
+    expected = io.StringIO()
+    json.dump(document, expected, indent=2, default=str)
+    text, stats = write("json", document, stream)
+    assert text == expected.getvalue()
+    assert stats["records"] == sum(len(v) for v in document.values() if isinstance(v, (list, tuple)))
+
+
+@pytest.mark.parametrize("name", list(DOCUMENTS))
+def test_compact_matches_json_dumps(name):
+    document = DOCUMENTS[name]
+    text, _ = write("compact", document, stream=True)
+    assert text == json.dumps(document, separators=(",", ":"), default=str)
+
+
+def test_ndjson_writes_a_line_per_record():
+    document = DOCUMENTS["report"]
+    text, stats = write("ndjson", document, stream=True)
+    lines = [json.loads(line) for line in text.splitlines()]
+    expected = []
+    for name, value in document.items():
+        items = value if isinstance(value, (list, tuple)) else [value]
+        expected.extend({"section": name, "data": json.loads(json.dumps(item, default=str))} for item in items)
+    assert lines == expected
+    assert stats["records"] == len(expected)
+
+
+@pytest.mark.parametrize("json_format", JSON_FORMATS)
+def test_encoded_sections_are_written_as_is(json_format):
+    document = DOCUMENTS["report"]
+    expected, _ = write(json_format, document)
+
+    section = JsonStreamWriter(None, json_format).encode_section("valid_transactions", iter(RECORDS))
+    # One encoding serves several documents
+    for _ in range(2):
+        text, _ = write(json_format, {**document, "valid_transactions": section})
+        assert text == expected
+
+
+def test_encoded_sections_must_match_name_and_format():
+    section = JsonStreamWriter(None, "json").encode_section("valid", RECORDS)
+    for json_format, name in [("json", "invalid"), ("compact", "valid"), ("ndjson", "valid")]:
+        with pytest.raises(ValueError):
+            JsonStreamWriter(io.StringIO(), json_format).write_document({name: section})
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        JsonStreamWriter(io.StringIO(), "yaml")
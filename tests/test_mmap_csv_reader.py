@@ -0,0 +1,67 @@
+import csv
+
+import pytest
+
+from helpers import DATA_FILES, report_outputs, result_snapshot, run_main
+from services.csv_processor import CSVProcessor
+from services.mmap_csv_reader import MmapCSVReader
+
+CONTENTS = {
+    "plain": "id,name\n1,a\n2,b\n",
+    "crlf": "id,name\r\n1,a\r\n2,b\r\n",
+    "no_final_newline": "id,name\n1,a\n2,b",
+    "quoted_newlines": 'id,name\n1,"multi\nline, quoted"\n2,"doubled ""quotes""\nhere"\n3,c\n',
+    "unicode": "id,name\n1,ünïcødé €\n2,日本語\n",
+    "blank_lines": "\n\nid,name\n\n1,a\n",
+}
+
+
+@pytest.mark.parametrize("name", list(CONTENTS))
+@pytest.mark.parametrize("chunk_bytes", [1, 7, 1 << 20])
+def test_rows_match_the_csv_module(tmp_path, name, chunk_bytes):
+    path = tmp_path / "input.csv"
+    path.write_bytes(CONTENTS[name].encode("utf-8"))
+    with open(path, encoding="utf-8", newline="") as f:
+        expected = list(csv.reader(f))
+    with MmapCSVReader(str(path), chunk_bytes) as reader:
+        assert list(reader.iter_rows(",")) == expected
+        ranges = list(reader.iter_record_ranges())
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+
+
+def test_header_skips_leading_blank_lines(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text(CONTENTS["blank_lines"], encoding="utf-8")
+    with MmapCSVReader(str(path)) as reader:
+        header, header_end = reader.read_header(",")
+        assert header == ["id", "name"]
+        assert list(reader.iter_rows(",", header_end)) == [[], ["1", "a"]]
+
+
+def test_empty_file_yields_nothing(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b"")
+    with MmapCSVReader(str(path)) as reader:
+        assert reader.read_header(",") == (None, 0)
+        assert list(reader.iter_rows(",")) == []
+        assert reader.ends_with_newline()
+
+
+@pytest.mark.parametrize("cleaner", ["row", "columnar"])
+def test_mmap_backend_matches_the_text_backend(tmp_path, sample_csv, cleaner):
+    crlf = tmp_path / "crlf.csv"
+    with open(sample_csv, encoding="utf-8") as f:
+        crlf.write_bytes(f.read().replace("\n", "\r\n").encode("utf-8"))
+    for path in [sample_csv, str(crlf), *DATA_FILES]:
+        text = CSVProcessor(cleaner=cleaner).process_csv_file(path)
+        mmap = CSVProcessor(reader_backend="mmap", cleaner=cleaner).process_csv_file(path)
+        assert result_snapshot(mmap) == result_snapshot(text), path
+
+
+def test_reader_flag_writes_the_text_backend_reports(tmp_path, monkeypatch, sample_csv):
+    inputs = [sample_csv, *DATA_FILES]
+    assert run_main(monkeypatch, *inputs, "--all-reports", "-o", str(tmp_path / "text")) == 0
+    assert run_main(monkeypatch, *inputs, "--all-reports", "--reader", "mmap", "-o", str(tmp_path / "mmap")) == 0
+    text = report_outputs(tmp_path / "text")
+    assert text
+    assert report_outputs(tmp_path / "mmap") == text
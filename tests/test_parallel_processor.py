@@ -0,0 +1,63 @@
+import shutil
+
+import pytest
+
+import services.parallel_processor as parallel_processor
+from helpers import DATA_FILES, report_outputs, result_snapshot, run_main
+from services.csv_processor import CSVProcessor
+from services.data_validator import DataValidator
+from services.parallel_processor import split_byte_ranges
+
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    # Files here are far below one range's minimum; this cuts them into many
+    monkeypatch.setattr(parallel_processor, "MIN_RANGE_BYTES", 1)
+
+
+@pytest.fixture
+def multiline_csv(tmp_path, sample_csv):
+    # Quoted fields spanning lines, which a range must never cut through
+    path = tmp_path / "multiline.csv"
+    shutil.copy(sample_csv, path)
+    with open(path, "a", encoding="utf-8") as f:
+        for i in range(200):
+            f.write(f'ML{i:04d},"CUST\n{i:04d}",2025-01-02,"1,{i:03d}.00",USD,"comp\nleted"\n')
+    return str(path)
+
+
+def test_ranges_cover_the_file_on_record_boundaries(multiline_csv, small_ranges):
+    with open(multiline_csv, "rb") as f:
+        data = f.read()
+    header_end = data.index(b"\n") + 1
+    ranges = split_byte_ranges(multiline_csv, header_end, 16)
+    assert len(ranges) > 1
+    assert ranges[0][0] == header_end
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[:end].count(b'"') % 2 == 0
+
+
+@pytest.mark.parametrize("cleaner", ["row", "columnar"])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_run_matches_the_serial_run(sample_csv, multiline_csv, small_ranges, cleaner, workers):
+    for path in [sample_csv, multiline_csv, *DATA_FILES]:
+        serial = CSVProcessor(cleaner=cleaner).process_csv_file(path)
+        parallel = CSVProcessor(cleaner=cleaner).process_csv_file_parallel(path, workers)
+        assert result_snapshot(parallel) == result_snapshot(serial), path
+
+
+def test_bloom_prefilter_gives_the_same_parallel_result(sample_csv, small_ranges):
+    serial = CSVProcessor().process_csv_file(sample_csv)
+    parallel = CSVProcessor(DataValidator(bloom_false_positive_rate=0.01)).process_csv_file_parallel(sample_csv, 2)
+    assert result_snapshot(parallel) == result_snapshot(serial)
+
+
+def test_workers_flag_writes_the_serial_reports(tmp_path, monkeypatch, sample_csv, small_ranges):
+    inputs = [sample_csv, *DATA_FILES]
+    assert run_main(monkeypatch, *inputs, "--all-reports", "-o", str(tmp_path / "serial")) == 0
+    assert run_main(monkeypatch, *inputs, "--all-reports", "--workers", "3", "-o", str(tmp_path / "parallel")) == 0
+    serial = report_outputs(tmp_path / "serial")
+    assert serial
+    assert report_outputs(tmp_path / "parallel") == serial
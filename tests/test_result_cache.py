@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+import pytest
+
+from helpers import result_snapshot
+from services.csv_processor import CSVProcessor
+from services.result_cache import ResultCache, file_sha256
+from services.transaction_processor import TransactionProcessor
+from utils.binary_blocks import pack_blocks, pack_json, unpack_blocks, unpack_json
+
+
+@pytest.fixture
+def processed(sample_csv):
+    return CSVProcessor().process_csv_file(sample_csv)
+
+
+def test_file_sha256_spans_blocks(tmp_path):
+    path = tmp_path / "data.bin"
+    data = os.urandom((3 << 20) + 17)
+    path.write_bytes(data)
+    assert file_sha256(str(path)) == hashlib.sha256(data).hexdigest()
+
+
+def test_hit_returns_the_processed_result(tmp_path, sample_csv, processed):
+    cache = ResultCache(str(tmp_path / "cache"))
+    first = CSVProcessor(result_cache=cache).process_csv_file(sample_csv)
+    second = CSVProcessor(result_cache=cache).process_csv_file(sample_csv)
+
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["entries"] == 1
+    assert result_snapshot(first) == result_snapshot(processed)
+    assert result_snapshot(second) == result_snapshot(processed)
+
+
+def test_changed_file_or_configuration_misses(tmp_path, sample_csv, processed):
+    cache = ResultCache(str(tmp_path / "cache"))
+    key = cache.key(sample_csv, {"cleaner": "row"})
+    cache.put(key, processed)
+
+    assert cache.key(sample_csv, {"cleaner": "columnar"}) != key
+    with open(sample_csv, "a", encoding="utf-8") as f:
+        f.write("TXNEXTRA,CUST0001,2025-01-01,1.00,USD,completed\n")
+    assert cache.key(sample_csv, {"cleaner": "row"}) != key
+
+
+def test_evicts_least_recently_used(tmp_path, processed):
+    cache = ResultCache(str(tmp_path / "cache"))
+    paths = {key: cache.put(key, processed) for key in ("a", "b", "c")}
+    for age, key in enumerate(("a", "b", "c")):
+        os.utime(paths[key], (1000 + age, 1000 + age))
+    # Using "a" makes "b" the least recently used
+    assert cache.get("a") is not None
+    entry_size = paths["a"].stat().st_size
+
+    cache.max_bytes = 2 * entry_size
+    assert cache.evict() == 1
+    assert not paths["b"].exists()
+    assert paths["a"].exists() and paths["c"].exists()
+    assert cache.stats()["evictions"] == 1
+
+
+def test_put_keeps_the_new_entry(tmp_path, processed):
+    cache = ResultCache(str(tmp_path / "cache"))
+    first = cache.put("first", processed)
+    cache.max_bytes = first.stat().st_size
+    second = cache.put("second", processed)
+    assert second.exists()
+    assert not first.exists()
+
+
+def test_invalidate_drops_every_configuration(tmp_path, sample_csv, processed):
+    cache = ResultCache(str(tmp_path / "cache"))
+    for config in ({"cleaner": "row"}, {"cleaner": "columnar"}):
+        cache.put(cache.key(sample_csv, config), processed)
+    cache.put("unrelated", processed)
+
+    assert cache.invalidate(sample_csv) == 2
+    assert cache.stats()["entries"] == 1
+    assert cache.get(cache.key(sample_csv, {"cleaner": "row"})) is None
+
+
+def test_corrupt_entry_is_dropped(tmp_path, processed):
+    cache = ResultCache(str(tmp_path / "cache"))
+    path = cache.put("key", processed)
+    path.write_bytes(path.read_bytes()[:100])
+    assert cache.get("key") is None
+    assert not path.exists()
+    assert cache.stats()["misses"] == 1
+
+
+def test_from_bytes_rejects_mismatched_columns(processed):
+    blocks = [bytes(block) for block in unpack_blocks(processed.to_bytes())]
+    meta = unpack_json(blocks[0])
+    assert meta["invalid_error_codes"]
+    meta["invalid_error_codes"].pop()
+    with pytest.raises(ValueError, match="invalid error codes"):
+        TransactionProcessor.from_bytes(pack_blocks([pack_json(meta), *blocks[1:]]))
@@ -0,0 +1,49 @@
+import functools
+
+import pytest
+
+import services.transaction_processor as transaction_processor
+from helpers import report_outputs, result_snapshot, run_main
+from services.csv_processor import CSVProcessor
+from services.transaction_processor import TransactionProcessor
+from utils.spill_list import SpillList
+
+
+def test_items_read_back_in_order():
+    items = [("TXN%d" % i, {"n": i}) for i in range(25)]
+    spill = SpillList(items[:10], buffer_items=4)
+    spill.extend(items[10:])
+    assert len(spill) == 25
+    assert list(spill) == items
+    assert spill[0] == items[0] and spill[13] == items[13] and spill[-1] == items[-1]
+    assert spill[3:22:4] == items[3:22:4]
+    assert [spill[i] for i in reversed(range(25))] == items[::-1]
+    with pytest.raises(IndexError):
+        spill[25]
+    with pytest.raises(ValueError):
+        SpillList(buffer_items=0)
+
+
+def test_unretained_processor_spills_rejected_rows(sample_csv, monkeypatch):
+    monkeypatch.setattr(transaction_processor, "SpillList", functools.partial(SpillList, buffer_items=16))
+    csv_processor = CSVProcessor()
+    processor = TransactionProcessor(retain_transactions=False)
+    for _ in csv_processor.stream_csv_file(sample_csv, processor, chunk_size=100):
+        pass
+    assert isinstance(processor.invalid_transactions, SpillList)
+    assert len(processor.invalid_transactions) > 16
+
+    retained = result_snapshot(CSVProcessor().process_csv_file(sample_csv))
+    streamed = result_snapshot(processor)
+    for key in ("invalid", "duplicates"):
+        assert streamed[key] == retained[key]
+
+
+def test_streamed_error_report_matches_a_full_run(tmp_path, monkeypatch, sample_csv):
+    monkeypatch.setattr(transaction_processor, "SpillList", functools.partial(SpillList, buffer_items=16))
+    assert run_main(monkeypatch, sample_csv, "--errors", "-o", str(tmp_path / "full")) == 0
+    assert run_main(monkeypatch, sample_csv, "--errors", "--stream", "--chunk-size", "100",
+                    "-o", str(tmp_path / "stream")) == 0
+    full = report_outputs(tmp_path / "full")
+    assert list(full) == ["error_report.json"]
+    assert report_outputs(tmp_path / "stream") == full
@@ -0,0 +1,100 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.sqlite_sink import _INDEXES, SQLiteSink
+from services.transaction_processor import TransactionProcessor
+
+# (amount, stored text, amount_minor)
+AMOUNTS = [
+    ("1200.5", "1200.50", 120050), ("7", "7.00", 700), ("-0.5", "-0.50", -50), ("0.05", "0.05", 5),
+    ("12.3E2", "1230.00", 123000), ("0.125", "0.125", None), ("1E+20", "1E+20", None),
+    ("92233720368547758.07", "92233720368547758.07", (1 << 63) - 1),
+    ("-92233720368547758.08", "-92233720368547758.08", -(1 << 63)),
+    ("92233720368547758.08", "92233720368547758.08", None),
+]
+
+
+def transactions():
+    return [
+        Transaction(f"TXN{i}", "CUST1", date(2025, 1, 1 + i), Decimal(amount), Currency.USD, TransactionStatus.COMPLETED)
+        for i, (amount, _, _) in enumerate(AMOUNTS)
+    ]
+
+
+def stored_amounts(path):
+    with sqlite3.connect(str(path)) as conn:
+        return conn.execute(
+            "SELECT date, amount, amount_minor FROM valid_transactions ORDER BY date"
+        ).fetchall()
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_amounts_are_normalized_to_cents(tmp_path, streamed):
+    processor = TransactionProcessor()
+    for transaction in transactions():
+        processor.add_transaction(transaction)
+    path = tmp_path / "results.db"
+    with SQLiteSink(str(path)) as sink:
+        sink.write(processor, processor.get_summary_statistics, transactions() if streamed else None)
+
+    rows = stored_amounts(path)
+    assert [(text, minor) for _, text, minor in rows] == [(text, minor) for _, text, minor in AMOUNTS]
+    assert [day for day, _, _ in rows] == [t.date.isoformat() for t in transactions()]
+
+
+def processor_of(rows):
+    processor = TransactionProcessor()
+    for transaction in rows:
+        processor.add_transaction(transaction)
+    return processor
+
+
+def index_names(path):
+    with sqlite3.connect(str(path)) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_indexes_are_rebuilt_only_for_loads_larger_than_the_database(tmp_path, caplog):
+    path = tmp_path / "results.db"
+    caplog.set_level(logging.INFO, logger="services.sqlite_sink")
+    for rows, expected in [(transactions(), "rebuilt"), (transactions()[:2], "maintained")]:
+        caplog.clear()
+        with SQLiteSink(str(path)) as sink:
+            sink.write(processor_of(rows), lambda: processor_of(rows).get_summary_statistics())
+        assert f"indexes {expected}" in caplog.text
+        assert index_names(path) == set(_INDEXES)
+
+
+def test_index_choice_sees_runs_committed_while_waiting_for_the_lock(tmp_path, caplog):
+    path = tmp_path / "results.db"
+    caplog.set_level(logging.INFO, logger="services.sqlite_sink")
+    locked = threading.Event()
+
+    def load_large_run():
+        # Another appender holds the write lock while it loads a large run
+        other = sqlite3.connect(str(path), isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("INSERT INTO runs (created_at, total_processed, valid_count, invalid_count, duplicate_count, "
+                      "row_count, summary) VALUES ('', 0, 0, 0, 0, 1000000, '{}')")
+        locked.set()
+        time.sleep(0.3)
+        other.execute("COMMIT")
+        other.close()
+
+    processor = processor_of(transactions())
+    with SQLiteSink(str(path)) as sink:
+        appender = threading.Thread(target=load_large_run)
+        appender.start()
+        locked.wait()
+        sink.write(processor, processor.get_summary_statistics)
+        appender.join()
+    assert "indexes maintained" in caplog.text
@@ -0,0 +1,159 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from constants.currencies import Currency
+from constants.status import TransactionStatus
+from models.transaction import Transaction
+from services.transaction_store import TransactionStore, minor_units
+
+START = date(2025, 1, 1)
+
+
+def generate(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield Transaction(
+            transaction_id=f"TXN{i:06d}",
+            customer_id=f"CUST{rng.randrange(50):03d}",
+            date=START + timedelta(days=rng.randrange(60)),
+            amount=Decimal(rng.choice(["12.50", "0.01", "1234567.89", "0.005", "1E+20", "99"])),
+            currency=rng.choice(list(Currency)),
+            status=rng.choice(list(TransactionStatus)),
+        )
+
+
+def scan(transactions, customer_id=None, start_date=None, end_date=None, currency=None, status=None):
+    return [
+        t for t in transactions
+        if (customer_id is None or t.customer_id == customer_id)
+        and (start_date is None or t.date >= start_date)
+        and (end_date is None or t.date <= end_date)
+        and (currency is None or t.currency == Currency(currency))
+        and (status is None or t.status == TransactionStatus(status))
+    ]
+
+
+def random_predicates(rng):
+    predicates = {}
+    if rng.random() < 0.5:
+        predicates["customer_id"] = f"CUST{rng.randrange(55):03d}"
+    if rng.random() < 0.5:
+        predicates["start_date"] = START + timedelta(days=rng.randrange(60))
+    if rng.random() < 0.5:
+        predicates["end_date"] = START + timedelta(days=rng.randrange(60))
+    if rng.random() < 0.5:
+        predicates["currency"] = rng.choice(list(Currency)).value
+    if rng.random() < 0.5:
+        predicates["status"] = rng.choice(list(TransactionStatus))
+    return predicates
+
+
+@pytest.mark.parametrize("amount, expected", [
+    ("125.50", 12550), ("-3.1", -310), ("0", 0), ("12.3E2", 123000),
+    ("92233720368547758.07", (1 << 63) - 1), ("-92233720368547758.08", -(1 << 63)),
+    ("92233720368547758.08", None), ("1.005", None), ("1E-10", None), ("Infinity", None), ("NaN", None),
+])
+def test_minor_units(amount, expected):
+    assert minor_units(Decimal(amount)) == expected
+
+
+def test_rows_and_slices_match_the_appended_transactions():
+    transactions = list(generate(500))
+    store = TransactionStore()
+    store.extend(transactions)
+    assert len(store) == len(transactions)
+    assert list(store) == transactions
+    assert store[7] == transactions[7] and store[-1] == transactions[-1]
+    assert store[10:200:7] == transactions[10:200:7]
+    assert store[::-3] == transactions[::-3]
+    assert store[600:] == []
+
+
+def factorize(values):
+    # (codes, distinct values) in the form ColumnarDataCleaner gives columns
+    distinct = list(dict.fromkeys(values))
+    positions = {value: code for code, value in enumerate(distinct)}
+    lookup = np.empty(len(distinct), dtype=object)
+    lookup[:] = distinct
+    return np.array([positions[value] for value in values]), lookup
+
+
+def test_column_batches_store_what_appending_stores():
+    # Amounts that overflow minor units included
+    transactions = list(generate(500))
+    fields = ["transaction_id", "customer_id", "date", "amount", "currency", "status"]
+    columns = {name: factorize([getattr(t, name) for t in transactions[100:]]) for name in fields}
+    appended, batched = TransactionStore(), TransactionStore()
+    for store in (appended, batched):
+        store.extend(transactions[:100])
+    appended.extend(transactions[100:])
+    batched.extend_columns(columns)
+
+    assert batched.amount_overflow
+    assert batched.to_bytes() == appended.to_bytes()
+    assert batched._index.rows == 500
+    assert batched.query(customer_id="CUST001") == scan(transactions, customer_id="CUST001")
+
+
+def test_queries_match_a_scan_while_rows_are_appended():
+    rng = random.Random(3)
+    store, appended = TransactionStore(), []
+    for transaction in generate(1500):
+        store.append(transaction)
+        appended.append(transaction)
+        # Queries between appends index the new rows in batches of varying size
+        if rng.random() < 0.02:
+            for _ in range(10):
+                predicates = random_predicates(rng)
+                assert store.query(**predicates) == scan(appended, **predicates), predicates
+    assert store.query() == appended
+
+
+def test_query_limit_keeps_insertion_order():
+    transactions = list(generate(300))
+    store = TransactionStore()
+    store.extend(transactions)
+    assert store.query(status=TransactionStatus.COMPLETED, limit=5) == \
+        scan(transactions, status=TransactionStatus.COMPLETED)[:5]
+
+
+def test_round_trip_keeps_rows_and_queries():
+    transactions = list(generate(400))
+    store = TransactionStore()
+    store.extend(transactions)
+    store.query(customer_id="CUST001")
+    loaded = TransactionStore.from_bytes(store.to_bytes())
+    assert list(loaded) == transactions
+    rng = random.Random(5)
+    for _ in range(30):
+        predicates = random_predicates(rng)
+        assert loaded.query(**predicates) == scan(transactions, **predicates)
+
+
+def test_unindexed_store_refuses_queries():
+    store = TransactionStore(indexed=False)
+    store.extend(generate(10))
+    assert store.index is None
+    with pytest.raises(ValueError):
+        store.find_rows(customer_id="CUST001")
+
+
+def test_ingestion_indexes_each_chunk_before_any_query(sample_csv):
+    from services.csv_processor import CSVProcessor
+
+    store = CSVProcessor().process_csv_file(sample_csv).transactions
+    assert len(store) and store._index.rows == len(store)
+
+    transactions = list(generate(300))
+    store = TransactionStore()
+    for chunk_start in range(0, 300, 100):
+        for transaction in transactions[chunk_start:chunk_start + 100]:
+            store.append(transaction)
+        store.update_index()
+        assert store._index.rows == chunk_start + 100
+    assert TransactionStore.from_bytes(store.to_bytes())._index.rows == 300
+    assert store.query(customer_id="CUST001") == scan(transactions, customer_id="CUST001")
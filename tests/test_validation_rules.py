@@ -0,0 +1,78 @@
+import pickle
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from constants.currencies import Currency
+from constants.error_codes import ErrorCode
+from helpers import result_snapshot
+from services.columnar_cleaner import ColumnarDataCleaner
+from services.csv_processor import CSVProcessor
+from services.data_validator import DataValidator
+from services.validation_rules import (
+    BUILTIN_RULES, Rule, RuleEngine, amount_limit_rule, customer_id_pattern_rule,
+)
+
+CUSTOM_RULES = BUILTIN_RULES + [
+    amount_limit_rule({Currency.USD: Decimal("500"), Currency.EUR: Decimal("-1")}),
+    customer_id_pattern_rule(r"CUST00[0-9]{2}"),
+]
+
+
+def read_batch(path):
+    return ColumnarDataCleaner().clean(CSVProcessor().read_csv_file(path))
+
+
+@pytest.mark.parametrize("rules", [BUILTIN_RULES, CUSTOM_RULES], ids=["builtin", "custom"])
+def test_check_columns_matches_the_row_check(sample_csv, rules):
+    batch = read_batch(sample_csv)
+    engine = RuleEngine(rules)
+    expected = [engine.check(row) for row in batch]
+    assert engine.check_columns(batch.columns).tolist() == expected
+    # Each column condition is exercised; the cleaner never leaves the others failing
+    not_in_sample = {ErrorCode.MISSING_TRANSACTION_ID, ErrorCode.INVALID_CURRENCY, ErrorCode.INVALID_STATUS}
+    for rule in rules:
+        if rule.code not in not_in_sample:
+            assert any(codes & rule.code for codes in expected), rule.code
+
+
+def test_check_columns_over_values_the_cleaner_never_produces():
+    # Unknown enum values and non-string ids only reach the rules through custom cleaning
+    values = {
+        "transaction_id": ["TXN1", "", None, "TXN1"],
+        "customer_id": ["CUST0001", "cust1", "", None],
+        "date": ["2025-01-01", None, "", "2025-01-01"],
+        "amount": [Decimal("0"), None, Decimal("600"), Decimal("-0.01")],
+        "currency": [Currency.USD, "XXX", None, Currency.EUR],
+        "status": ["completed", "done", None, ""],
+    }
+    columns = {}
+    for name, column in values.items():
+        lookup = np.empty(len(column) + 1, dtype=object)
+        lookup[:-1] = column
+        columns[name] = (np.arange(len(column)), lookup)
+    rows = [type("Row", (), dict(zip(values, fields))) for fields in zip(*values.values())]
+
+    engine = RuleEngine(CUSTOM_RULES)
+    assert engine.check_columns(columns).tolist() == [engine.check(row) for row in rows]
+
+
+def test_validator_uses_columns_only_when_every_rule_has_a_column_condition(sample_csv):
+    row_only = Rule(ErrorCode.NON_POSITIVE_AMOUNT, "amount is not None and amount < 10", ("amount",))
+    engine = RuleEngine([row_only])
+    assert not engine.columnar
+    with pytest.raises(ValueError, match="column condition"):
+        engine.check_columns(read_batch(sample_csv).columns)
+
+    for rules in (CUSTOM_RULES, BUILTIN_RULES + [row_only]):
+        rows = CSVProcessor(DataValidator(rules=rules)).process_csv_file(sample_csv)
+        columnar = CSVProcessor(DataValidator(rules=rules), cleaner="columnar").process_csv_file(sample_csv)
+        assert result_snapshot(columnar) == result_snapshot(rows)
+
+
+def test_batches_pickle_as_plain_rows(sample_csv):
+    batch = read_batch(sample_csv)
+    loaded = pickle.loads(pickle.dumps(batch))
+    assert type(loaded) is list
+    assert [row.to_dict() for row in loaded] == [row.to_dict() for row in batch]